@@ -0,0 +1,161 @@
+import collections
+import json
+import os
+import struct
+import threading
+import time
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40, 'critical': 50}
+LEVEL_NAMES = {v: k for k, v in LEVELS.items()}
+
+# binary log: 정의 레코드 'D' + (event_id, fmt), 로그 레코드 'R' + (ts, level, event_id, args(JSON)),
+# 인자 없는(이미 포맷된) 메시지는 텍스트 레코드 'T' + (ts, level, msg)
+_DEF = struct.Struct('<cII')
+_REC = struct.Struct('<cdBII')
+_TXT = struct.Struct('<cdBI')
+
+
+def format_record(fmt, args):
+    return fmt.format(*args) if args else fmt
+
+
+class AsyncLogger:
+    """로그 호출은 (level, ts, fmt, args) 튜플을 링 버퍼에 넣기만 하고,
+    포맷팅과 파일 쓰기는 백그라운드 스레드가 모아서 처리한다.
+
+    sinks: {level: callable(msg)} (예: sl4p logger 메서드), binlog_path: 바이너리 로그 파일
+    링 버퍼가 가득 차면 가장 오래된 레코드가 버려지고, 버린 개수(dropped)는 다음 drain에서 warning으로 남긴다.
+    """
+
+    def __init__(self, sinks, level='debug', binlog_path=None, capacity=100000, flush_interval=0.05):
+        self.sinks = sinks
+        self.min_level = LEVELS[level]
+        self.ring = collections.deque(maxlen=capacity)  # append/popleft는 GIL 하에서 원자적
+        self.dropped = 0
+        self.reported = 0
+        self.flush_interval = flush_interval
+        self.binlog = open(binlog_path, 'ab') if binlog_path else None
+        self.event_ids = {}
+        self.wake = threading.Event()
+        self.idle = threading.Event()
+        self.th = threading.Thread(target=self._run, daemon=True)
+        self.th.start()
+
+    def log(self, level, fmt, args=()):
+        if LEVELS[level] < self.min_level:  # 포맷팅 전에 걸러냄
+            return
+        if len(self.ring) == self.ring.maxlen:
+            self.dropped += 1
+        self.ring.append((level, time.time(), fmt, args))
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self._drain()
+            self.idle.set()
+
+    def _drain(self):
+        chunks = []
+        dropped = self.dropped - self.reported
+        if dropped:
+            self.reported += dropped
+            msg = f'log buffer full: dropped {dropped} records (total {self.reported})'
+            try:
+                self.sinks['warning'](msg)
+            except Exception:
+                pass
+            if self.binlog is not None:
+                chunks.append(self._encode_text('warning', time.time(), msg))
+        while self.ring:
+            level, ts, fmt, args = self.ring.popleft()
+            try:
+                self.sinks[level](format_record(fmt, args))
+                if self.binlog is not None:
+                    chunks.append(self._encode(level, ts, fmt, args))
+            except Exception as e:  # 잘못된 레코드 하나 때문에 기록 스레드가 죽지 않도록
+                msg = f'log record failed: {fmt!r} {args!r} -> {e!r}'
+                try:
+                    self.sinks['error'](msg)
+                except Exception:
+                    pass
+                if self.binlog is not None:
+                    chunks.append(self._encode_text('error', ts, msg))
+        if chunks:
+            try:
+                self.binlog.write(b''.join(chunks))
+                self.binlog.flush()
+            except OSError:
+                pass
+
+    def _encode_text(self, level, ts, msg):
+        raw = msg.encode(errors='replace')
+        return _TXT.pack(b'T', ts, LEVELS[level], len(raw)) + raw
+
+    def _encode(self, level, ts, fmt, args):
+        if not args:  # 호출부에서 이미 포맷한 메시지는 매번 달라지므로 id를 만들지 않음
+            return self._encode_text(level, ts, fmt)
+        out = b''
+        event_id = self.event_ids.get(fmt)
+        if event_id is None:
+            event_id = self.event_ids[fmt] = len(self.event_ids)
+            raw = fmt.encode()
+            out += _DEF.pack(b'D', event_id, len(raw)) + raw
+        payload = json.dumps(args, ensure_ascii=False, default=str).encode() if args else b''
+        return out + _REC.pack(b'R', ts, LEVELS[level], event_id, len(payload)) + payload
+
+    def flush(self, timeout=5.0):
+        """호출 시점까지 쌓인 로그를 모두 기록할 때까지 대기"""
+        for _ in range(2):  # 진행 중이던 drain 다음 한 번 더 돌려야 전부 처리됨
+            if not self.th.is_alive():
+                return
+            self.idle.clear()
+            self.wake.set()
+            self.idle.wait(timeout)
+
+
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_logger(sinks, binlog_path, **kwargs):
+    """binlog_path별로 프로세스에 하나인 AsyncLogger.
+
+    event id는 logger마다 따로 매기므로 한 파일에는 logger 하나만 써야 한다.
+    프로세스 간에는 binlog_path에 pid를 넣어 파일을 나눈다 (binlog_name).
+    """
+    key = os.path.abspath(binlog_path)
+    with _SHARED_LOCK:
+        logger = _SHARED.get(key)
+        if logger is None:
+            logger = _SHARED[key] = AsyncLogger(sinks, binlog_path=binlog_path, **kwargs)
+        return logger
+
+
+def binlog_name(day):
+    """프로세스별 바이너리 로그 파일 이름 (전략/게이트웨이 프로세스가 같은 파일에 쓰지 않도록)"""
+    return f'{day}_{os.getpid()}.binlog'
+
+
+def read_binlog(path):
+    """바이너리 로그를 (ts, level, message)로 복원"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    fmts = {}
+    pos = 0
+    while pos < len(data):
+        kind = data[pos:pos + 1]
+        if kind == b'D':
+            _, event_id, size = _DEF.unpack_from(data, pos)
+            pos += _DEF.size
+            fmts[event_id] = data[pos:pos + size].decode()
+        elif kind == b'T':
+            _, ts, level, size = _TXT.unpack_from(data, pos)
+            pos += _TXT.size
+            yield ts, LEVEL_NAMES[level], data[pos:pos + size].decode()
+        else:
+            _, ts, level, event_id, size = _REC.unpack_from(data, pos)
+            pos += _REC.size
+            args = json.loads(data[pos:pos + size]) if size else ()
+            yield ts, LEVEL_NAMES[level], format_record(fmts[event_id], args)
+        pos += size
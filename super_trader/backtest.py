@@ -0,0 +1,83 @@
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+
+STAT_COLS = ['total_return', 'sharpe', 'max_drawdown']
+
+
+def _moving_average(close, window):
+    """(T, N) 단순 이동평균. window-1 번째 이전은 nan"""
+    csum = np.cumsum(close, axis=0)
+    ma = np.full_like(close, np.nan)
+    ma[window - 1:] = csum[window - 1:]
+    ma[window:] -= csum[:-window]
+    return ma / window
+
+
+def _stats(port_ret, periods_per_year):
+    """(P, T) 포트폴리오 수익률 -> (P, 3) [총수익률, 샤프, 최대낙폭]"""
+    equity = np.cumprod(1 + port_ret, axis=1)
+    total_return = equity[:, -1] - 1
+    std = port_ret.std(axis=1)
+    sharpe = np.divide(port_ret.mean(axis=1), std, out=np.zeros_like(std), where=std > 0)
+    sharpe *= np.sqrt(periods_per_year)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+    return np.column_stack([total_return, sharpe, drawdown.min(axis=1)])
+
+
+def ma_cross_strategy(close, params, fee_rate=0.00015, periods_per_year=252):
+    """params (P, 2) [fast, slow]. 종목별 fast MA > slow MA이면 보유, 동일 비중 포트폴리오 성과 반환"""
+    ret = np.zeros_like(close)
+    ret[1:] = close[1:] / close[:-1] - 1
+    windows = np.unique(params.astype(np.int64))
+    ma = {w: _moving_average(close, w) for w in windows}  # 같은 window는 한 번만 계산
+
+    port_ret = np.empty((len(params), close.shape[0]))
+    for p, (fast, slow) in enumerate(params.astype(np.int64)):
+        pos = (ma[fast] > ma[slow]).astype(np.float64)  # nan 비교는 False -> 미보유
+        pos[1:] = pos[:-1].copy()  # 전 봉 신호로 다음 봉 보유
+        pos[0] = 0
+        turnover = np.abs(np.diff(pos, axis=0, prepend=0))
+        port_ret[p] = np.nanmean(pos * ret - turnover * fee_rate, axis=1)
+    return _stats(port_ret, periods_per_year)
+
+
+def _worker(args):
+    shm_name, shape, dtype, params, strategy, kwargs = args
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        close = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return strategy(close, params, **kwargs)
+    finally:
+        del close
+        shm.close()
+
+
+def run_grid(close, params, strategy=ma_cross_strategy, n_workers=None, chunk_size=256, **kwargs):
+    """close (T, N) 가격 배열 하나를 shared memory에 올려 두고, 파라미터 묶음을 여러 프로세스에서 평가.
+
+    strategy(close, params_chunk, **kwargs) -> (len(chunk), k) 는 pickle 가능한 모듈 수준 함수여야 한다.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    params = np.asarray(params)
+    n_workers = n_workers or os.cpu_count()
+    shm = shared_memory.SharedMemory(create=True, size=close.nbytes)
+    try:
+        np.ndarray(close.shape, dtype=close.dtype, buffer=shm.buf)[:] = close
+        chunks = [params[i:i + chunk_size] for i in range(0, len(params), chunk_size)]
+        jobs = [(shm.name, close.shape, close.dtype, chunk, strategy, kwargs) for chunk in chunks]
+        if n_workers == 1:
+            results = [_worker(job) for job in jobs]
+        else:
+            with Pool(n_workers) as pool:
+                results = pool.map(_worker, jobs)
+    finally:
+        shm.close()
+        shm.unlink()
+    stats = np.concatenate(results)
+    cols = STAT_COLS if stats.shape[1] == len(STAT_COLS) else list(range(stats.shape[1]))
+    df = pd.DataFrame(stats, columns=cols)
+    df.insert(0, 'params', [tuple(p) for p in params])
+    return df
@@ -0,0 +1,54 @@
+import numpy as np
+
+from .snapshot_cache import SnapshotCache
+
+# CpTd6033 header/data index
+BALANCE_HEADER = {'acc_name': 0, 'total_asset': 3, 'total_profit': 4, 'total_rtn': 8,
+                  'cash': 9, 'stock_asset': 11}
+BALANCE_FIELDS = {'name': 0, 'today_buy_cnt': 6, 'qty': 7, 'asset': 9, 'profit': 10,
+                  'rtn': 11, 'code': 12, 'sellable': 15, 'avg_price': 18}
+
+
+class BalanceSnapshot:
+    """계좌 잔고 스냅샷. 종목별 값은 필드별 배열로 두고 code -> 행 번호로 색인"""
+
+    def __init__(self, header, rows):
+        self.header = header
+        cols = list(zip(*rows)) if rows else [()] * len(BALANCE_FIELDS)
+        data = dict(zip(BALANCE_FIELDS, cols))
+        self.codes = np.array(data['code'], dtype=object)
+        self.names = np.array(data['name'], dtype=object)
+        self.qty = np.array(data['qty'], dtype=np.int64)
+        self.sellable = np.array(data['sellable'], dtype=np.int64)  # 미체결 매도 주문 수량 제외
+        self.today_buy_cnt = np.array(data['today_buy_cnt'], dtype=np.int64)
+        self.asset = np.array(data['asset'], dtype=np.int64)
+        self.profit = np.array(data['profit'], dtype=np.int64)
+        self.rtn = np.array(data['rtn'], dtype=np.float64)
+        self.avg_price = np.array(data['avg_price'], dtype=np.float64)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def total_asset(self):
+        return self.header['total_asset']
+
+    @property
+    def cash(self):
+        return self.header['cash']
+
+    def get_qty(self, code):
+        i = self.index.get(code)
+        return 0 if i is None else int(self.qty[i])
+
+    def get_sellable(self, code):
+        i = self.index.get(code)
+        return 0 if i is None else int(self.sellable[i])
+
+    def to_list(self):
+        return [{'code': code, 'qty': int(qty)} for code, qty in zip(self.codes, self.qty)]
+
+
+class BalanceCache(SnapshotCache):
+    """load()로 받은 BalanceSnapshot을 ttl 동안 재사용"""
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Optional
+
+CONFIG_PATH = 'config.json'
+
+
+@dataclass(frozen=True)
+class SlackConfig:
+    token: str
+    channel: str
+
+
+@dataclass(frozen=True)
+class BinanceConfig:
+    api_key: str
+    secret: str
+
+
+@dataclass(frozen=True)
+class CreonConfig:
+    id: str
+    pwd: str
+    pwdcert: str
+
+
+@dataclass(frozen=True)
+class TraderConfig:
+    path: str
+    mtime: float
+    slack: Optional[SlackConfig]
+    binance: Optional[BinanceConfig]
+    creon: Optional[CreonConfig]
+    db: Mapping
+    holidays: FrozenSet[int]  # YYYYMMDD
+
+    def require(self, section):
+        value = getattr(self, section)
+        if value is None:
+            raise ValueError(f"config.json must contain '{section}' key.")
+        return value
+
+    def is_holiday(self, yyyymmdd):
+        return int(yyyymmdd) in self.holidays
+
+
+def _section(raw, name, cls):
+    if name not in raw:
+        return None
+    info = raw[name]
+    required_keys = list(cls.__dataclass_fields__)
+    if not all(key in info for key in required_keys):
+        keys = ', '.join(f"'{key}'" for key in required_keys)
+        raise ValueError(f"{name} in config.json must contain {keys} key.")
+    return cls(**{key: info[key] for key in required_keys})
+
+
+def parse_config(raw, path='', mtime=0.0):
+    holidays = frozenset(int(d) for days in raw.get('holiday', {}).values() for d in days)
+    return TraderConfig(
+        path=path,
+        mtime=mtime,
+        slack=_section(raw, 'slack', SlackConfig),
+        binance=_section(raw, 'binance', BinanceConfig),
+        creon=_section(raw, 'creon', CreonConfig),
+        db=MappingProxyType(dict(raw.get('db', {}))),
+        holidays=holidays,
+    )
+
+
+_configs = {}
+_lock = threading.Lock()
+
+
+def get_config(path=CONFIG_PATH):
+    """프로세스 전체에서 공유하는 설정. 파일 mtime이 바뀌었을 때만 다시 읽는다"""
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError("config.json must exist in the path. ")
+    mtime = os.stat(path).st_mtime
+    with _lock:
+        config = _configs.get(path)
+        if config is None or config.mtime != mtime:
+            with open(path, 'r') as json_file:
+                raw = json.load(json_file)
+            config = parse_config(raw, path, mtime)
+            _configs[path] = config
+        return config
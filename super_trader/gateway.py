@@ -0,0 +1,504 @@
+import collections
+import hmac
+import itertools
+import os
+import pickle
+import secrets
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .request_quota import PRIORITY_LOOKUP, PRIORITY_ORDER
+
+# 프로세스 간 호출 가능한 SuperTrader API. 번호가 곧 protocol의 method id이므로 끝에만 추가할 것
+METHODS = (
+    'price_slots', 'get_cur_price', 'get_ohlcv', 'get_stock_balance', 'get_cur_cash', 'get_cur_total_asset',
+    'get_total_usdt', 'get_position', 'get_holding_position', 'get_unrealized_profit', 'get_leverage',
+    'get_book', 'get_trad_price', 'get_today_order_history', 'get_quota_stats',
+    'buy', 'sell', 'sell_all', 'send_market_order', 'check_order_completion', 'execute_order', 'execute_orders',
+    'end_all_position', 'end_all_positions', 'cancel_open_order', 'set_leverage', 'set_margin_mode',
+    'rebalance',
+)
+METHOD_IDS = {name: i for i, name in enumerate(METHODS)}
+ORDER_METHODS = {
+    'buy', 'sell', 'sell_all', 'send_market_order', 'check_order_completion', 'execute_order', 'execute_orders',
+    'end_all_position', 'end_all_positions', 'cancel_open_order', 'set_leverage', 'set_margin_mode',
+    'rebalance',
+}
+# 체결 대기 등으로 오래 막히는 호출. thread_safe broker면 dispatcher 밖의 worker에서 실행
+LONG_METHODS = {
+    'sell_all', 'check_order_completion', 'execute_order', 'execute_orders', 'end_all_position',
+    'end_all_positions', 'rebalance',
+}
+
+# 요청: (payload 길이, request id, method id), 응답: (payload 길이, request id, status). payload는 pickle
+_REQ = struct.Struct('<IIH')
+_RESP = struct.Struct('<IIB')
+OK, ERROR = 0, 1
+
+# 가격 슬롯: [seq, price, ts]. seq가 홀수면 쓰는 중 (seqlock)
+SLOT_FIELDS = 3
+
+# 접속 직후 client가 보내는 인증 토큰. 토큰 파일은 gateway를 띄운 사용자만 읽을 수 있다
+TOKEN_SIZE = 32
+AUTH_TIMEOUT = 5.0
+
+
+def default_address():
+    """Unix-domain socket을 지원하지 않는 환경(Windows의 Creon 등)에서는 localhost TCP"""
+    if hasattr(socket, 'AF_UNIX'):
+        return 'super_trader.sock'
+    return ('127.0.0.1', 7755)
+
+
+def default_token_path(address):
+    if isinstance(address, str):
+        return address + '.token'
+    return os.path.join(os.path.expanduser('~'), f'.super_trader_gateway_{address[1]}.token')
+
+
+def _write_token(path):
+    token = secrets.token_bytes(TOKEN_SIZE)
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(token)
+    return token
+
+
+def _read_token(path):
+    with open(path, 'rb') as f:
+        return f.read(TOKEN_SIZE)
+
+
+def _family(address):
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError('gateway connection closed')
+        buf += chunk
+    return bytes(buf)
+
+
+class GatewayError(Exception):
+    pass
+
+
+class FairQueue:
+    """우선순위(작을수록 먼저)별로, 같은 우선순위 안에서는 client 간 round-robin으로 꺼내는 큐"""
+
+    def __init__(self, priorities=(PRIORITY_ORDER, PRIORITY_LOOKUP)):
+        self.queues = {p: collections.OrderedDict() for p in sorted(priorities)}  # client -> deque
+        self.cond = threading.Condition()
+
+    def put(self, client, priority, item):
+        with self.cond:
+            self.queues[priority].setdefault(client, collections.deque()).append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """(client, item). timeout 동안 없으면 None"""
+        with self.cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                for clients in self.queues.values():
+                    if clients:
+                        client, q = next(iter(clients.items()))
+                        item = q.popleft()
+                        if q:
+                            clients.move_to_end(client)  # 다음 차례는 다른 client
+                        else:
+                            del clients[client]
+                        return client, item
+                remain = None if deadline is None else deadline - time.monotonic()
+                if remain is not None and remain <= 0:
+                    return None
+                self.cond.wait(remain)
+
+    def drop(self, client):
+        with self.cond:
+            for clients in self.queues.values():
+                clients.pop(client, None)
+
+
+class PriceBoard:
+    """symbol별 최근 가격을 shared memory에 게시. 읽는 쪽은 seq로 쓰는 중인 값을 걸러낸다"""
+
+    def __init__(self, symbols, name=None, create=True):
+        self.symbols = list(symbols)
+        self.slots = {symbol: i for i, symbol in enumerate(self.symbols)}
+        size = max(len(self.symbols), 1) * SLOT_FIELDS * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        if not create:
+            # 붙기만 한 프로세스가 종료될 때 resource_tracker가 블록을 지우지 않도록
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        self.buf = np.ndarray((max(len(self.symbols), 1), SLOT_FIELDS), dtype=np.float64, buffer=self.shm.buf)
+        if create:
+            self.buf[:] = 0.0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, symbol, price, ts=None):
+        row = self.buf[self.slots[symbol]]
+        row[0] += 1
+        row[1] = price
+        row[2] = time.time() if ts is None else ts
+        row[0] += 1
+
+    def read(self, symbol, max_age=None, retries=100):
+        """(price, ts). 게시 전이거나 max_age초보다 오래됐으면 None"""
+        row = self.buf[self.slots[symbol]]
+        for _ in range(retries):
+            seq = row[0]
+            price, ts = row[1], row[2]
+            if seq % 2 == 0 and row[0] == seq:
+                break
+        else:
+            return None
+        if seq == 0 or (max_age is not None and time.time() - ts > max_age):
+            return None
+        return float(price), float(ts)
+
+    def close(self):
+        del self.buf
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class Gateway:
+    """broker 인스턴스 하나를 소유하고 여러 전략 프로세스의 요청을 대신 실행하는 데몬.
+
+    broker_factory()는 dispatcher 스레드(COM 초기화됨)에서 호출되고, broker 호출도 기본적으로 그 스레드에서만 실행된다
+    (COM 객체는 생성한 스레드에서 써야 함). 주문 메서드는 조회보다 먼저, 같은 종류끼리는 client 간 번갈아 처리한다.
+    thread_safe broker(Binance)는 LONG_METHODS를 long_workers개 worker에 넘겨, 체결 대기 중에도 다른 요청과
+    가격 게시가 멈추지 않는다. Creon은 COM 스레드 하나에서만 호출할 수 있으므로 긴 호출도 순서대로 실행된다.
+    price_symbols를 주면 publish_interval마다 get_cur_price 결과를 shared memory(PriceBoard)에 게시한다.
+    list_prices: broker의 get_cur_price가 종목 리스트를 받아 DataFrame을 반환하는 경우(Creon). 한 번에 조회해 'price'를 게시
+    client는 접속 직후 token_path 파일의 토큰을 보내야 하고, 토큰이 맞기 전에는 payload를 unpickle하지 않는다.
+    """
+
+    def __init__(self, broker_factory, address=None, price_symbols=(), publish_interval=1.0, log=None,
+                 list_prices=False, token_path=None, thread_safe=False, long_workers=8):
+        self.broker_factory = broker_factory
+        self.thread_safe = thread_safe
+        self.long_workers = long_workers
+        self.long_pool = None
+        self.address = address or default_address()
+        self.list_prices = list_prices
+        self.token_path = token_path or default_token_path(self.address)
+        self.token = None
+        self.price_symbols = list(price_symbols)
+        self.publish_interval = publish_interval
+        self.log = log
+        self.queue = FairQueue()
+        self.board = None
+        self.broker = None
+        self.ready = threading.Event()
+        self.running = False
+        self.server = None
+        self.client_ids = itertools.count()
+        self.stats = collections.Counter()
+
+    def _log(self, msg, *args, log_level='info'):
+        if self.log is not None:
+            self.log(msg, *args, log_level=log_level)
+        elif self.broker is not None:
+            self.broker.send_msg(msg, *args, log_level=log_level)
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._dispatch, daemon=True).start()
+        self.ready.wait()
+        if self.broker is None:
+            raise GatewayError('broker initialization failed')
+
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # 이전 실행에서 남은 socket 파일
+        self.token = _write_token(self.token_path)
+        self.server = socket.socket(_family(self.address), socket.SOCK_STREAM)
+        self.server.bind(self.address)
+        if isinstance(self.address, str):
+            os.chmod(self.address, 0o600)  # 같은 사용자 프로세스만 접속 (payload가 pickle)
+        self.server.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+        self._log('gateway listening on {}', self.address)
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while self.running:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        if self.server is not None:
+            self.server.close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.remove(self.address)
+        if self.token is not None and os.path.exists(self.token_path):
+            os.remove(self.token_path)
+            self.token = None
+
+    def _accept(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            if conn.family == socket.AF_INET:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = (next(self.client_ids), conn, threading.Lock())
+            threading.Thread(target=self._read_client, args=(client,), daemon=True).start()
+
+    def _read_client(self, client):
+        """요청은 응답을 기다리지 않고 계속 읽어 큐에 넣는다 (pipelining)"""
+        _, conn, _ = client
+        try:
+            conn.settimeout(AUTH_TIMEOUT)
+            if not hmac.compare_digest(_recv_exact(conn, TOKEN_SIZE), self.token):
+                self._log('gateway: rejected client with invalid token', log_level='warning')
+                return
+            conn.settimeout(None)
+            while self.running:
+                size, req_id, method_id = _REQ.unpack(_recv_exact(conn, _REQ.size))
+                payload = _recv_exact(conn, size)
+                method = METHODS[method_id] if method_id < len(METHODS) else None
+                priority = PRIORITY_ORDER if method in ORDER_METHODS else PRIORITY_LOOKUP
+                self.queue.put(client, priority, (req_id, method, payload))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.queue.drop(client)
+            conn.close()
+
+    def _dispatch(self):
+        try:
+            import pythoncom  # pywin32는 main 스레드만 COM을 초기화함
+        except ImportError:
+            pythoncom = None
+        if pythoncom is not None:
+            pythoncom.CoInitialize()
+        try:
+            self._serve_jobs()
+        finally:
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def _serve_jobs(self):
+        try:
+            self.broker = self.broker_factory()
+            if self.price_symbols:
+                self.board = PriceBoard(self.price_symbols)
+            if self.thread_safe:
+                self.long_pool = ThreadPoolExecutor(max_workers=self.long_workers, thread_name_prefix='gateway')
+        finally:
+            self.ready.set()
+        if self.broker is None:
+            return
+
+        next_publish = time.monotonic()
+        while self.running:
+            if self.board is not None and time.monotonic() >= next_publish:
+                self._publish_prices()
+                next_publish = time.monotonic() + self.publish_interval
+            timeout = max(next_publish - time.monotonic(), 0.0) if self.board is not None else 0.5
+            job = self.queue.get(timeout)
+            if job is None:
+                continue
+            client, (req_id, method, payload) = job
+            self.stats[method] += 1
+            if self.long_pool is not None and method in LONG_METHODS:
+                self.long_pool.submit(self._run_job, client, req_id, method, payload)
+            else:
+                self._run_job(client, req_id, method, payload)
+        if self.long_pool is not None:
+            self.long_pool.shutdown(wait=False)
+        if self.board is not None:
+            self.board.close()  # 게시하는 스레드에서 정리
+            self.board = None
+
+    def _run_job(self, client, req_id, method, payload):
+        status, result = self._call(method, payload)
+        self._respond(client, req_id, status, result)
+
+    def _call(self, method, payload):
+        try:
+            if method is None:
+                raise GatewayError('unknown method id')
+            args, kwargs = pickle.loads(payload)
+            if method == 'price_slots':
+                if self.board is None:
+                    return OK, (None, [], self.list_prices)
+                return OK, (self.board.name, self.board.symbols, self.list_prices)
+            return OK, getattr(self.broker, method)(*args, **kwargs)
+        except Exception as e:
+            return ERROR, e
+
+    def _respond(self, client, req_id, status, result):
+        _, conn, lock = client
+        try:
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            status, payload = ERROR, pickle.dumps(GatewayError(repr(result)))
+        try:
+            with lock:
+                conn.sendall(_RESP.pack(len(payload), req_id, status) + payload)
+        except OSError:
+            pass  # 끊긴 client
+
+    def _publish_prices(self):
+        if self.list_prices:
+            try:
+                prices = self.broker.get_cur_price(list(self.price_symbols))['price']
+            except Exception as e:
+                self._log('gateway price publish failed: {}', e, log_level='warning')
+                return
+            for symbol, price in prices.items():
+                if symbol in self.board.slots and price == price:  # NaN 제외
+                    self.board.publish(symbol, float(price))
+            return
+        for symbol in self.price_symbols:
+            try:
+                price = self.broker.get_cur_price(symbol)
+            except Exception as e:
+                self._log('gateway price publish failed: {} -> {}', symbol, e, log_level='warning')
+                continue
+            if price is not None:
+                self.board.publish(symbol, float(price))
+
+
+class GatewayClient:
+    """Gateway에 접속해 SuperTrader 메서드를 그대로 호출하는 proxy.
+
+    client.get_cur_price('BTC/USDT')처럼 동기 호출하거나, submit()으로 Future를 받아 여러 요청을 한꺼번에 보낼 수 있다.
+    게이트웨이가 게시하는 symbol의 get_cur_price는 shared memory에서 바로 읽는다 (price_max_age초 이내 값만).
+    """
+
+    def __init__(self, address=None, timeout=None, price_max_age=5.0, token_path=None):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self.price_max_age = price_max_age
+        token = _read_token(token_path or default_token_path(self.address))
+        self.sock = socket.socket(_family(self.address), socket.SOCK_STREAM)
+        self.sock.connect(self.address)
+        if self.sock.family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(token)
+        self.req_ids = itertools.count(1)
+        self.pending = {}
+        self.send_lock = threading.Lock()
+        self.closed = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+        shm_name, symbols, self.list_prices = self.call('price_slots')
+        self.board = PriceBoard(symbols, name=shm_name, create=False) if shm_name else None
+
+    def submit(self, method, *args, **kwargs):
+        """응답을 기다리지 않고 요청 전송. 결과는 Future로 받는다"""
+        fut = Future()
+        req_id = next(self.req_ids) & 0xFFFFFFFF
+        payload = pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        self.pending[req_id] = fut
+        with self.send_lock:
+            self.sock.sendall(_REQ.pack(len(payload), req_id, METHOD_IDS[method]) + payload)
+        return fut
+
+    def call(self, method, *args, **kwargs):
+        return self.submit(method, *args, **kwargs).result(self.timeout)
+
+    def _read(self):
+        try:
+            while True:
+                size, req_id, status = _RESP.unpack(_recv_exact(self.sock, _RESP.size))
+                result = pickle.loads(_recv_exact(self.sock, size))
+                fut = self.pending.pop(req_id, None)
+                if fut is None:
+                    continue
+                if status == OK:
+                    fut.set_result(result)
+                else:
+                    fut.set_exception(result if isinstance(result, BaseException) else GatewayError(result))
+        except (ConnectionError, OSError) as e:
+            for fut in list(self.pending.values()):
+                if not fut.done():
+                    fut.set_exception(GatewayError(f'gateway disconnected: {e}'))
+            self.pending.clear()
+
+    def get_cur_price(self, code, *args, **kwargs):
+        if self.board is not None and isinstance(code, str) and code in self.board.slots:
+            res = self.board.read(code, self.price_max_age)
+            if res is not None:
+                return res[0]
+        if self.list_prices and isinstance(code, str):  # Creon은 종목 리스트 -> DataFrame
+            return float(self.call('get_cur_price', [code], *args, **kwargs)['price'].iloc[0])
+        return self.call('get_cur_price', code, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name not in METHOD_IDS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.board is not None:
+            self.board.close()
+        self.sock.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='super_trader broker gateway')
+    parser.add_argument('broker', choices=['binance', 'creon'])
+    parser.add_argument('--future', action='store_true', help='binance futures')
+    parser.add_argument('--address', default=None, help='unix socket path (또는 host:port)')
+    parser.add_argument('--symbols', nargs='*', default=[], help='shared memory로 가격을 게시할 symbol')
+    parser.add_argument('--publish-interval', type=float, default=1.0)
+    opts = parser.parse_args()
+
+    address = opts.address
+    if address and ':' in address and not address.endswith('.sock'):
+        host, port = address.rsplit(':', 1)
+        address = (host, int(port))
+
+    def factory():
+        if opts.broker == 'binance':
+            from .trader_binance import BinanceTrader
+            broker = BinanceTrader(is_future=opts.future)
+            if opts.symbols:
+                broker.start_market_data(opts.symbols)
+            return broker
+        from .trader_creonplus import CreonPlusTrader
+        broker = CreonPlusTrader()
+        if opts.symbols:
+            broker.subscribe_quotes(opts.symbols)
+        return broker
+
+    Gateway(factory, address, opts.symbols, opts.publish_interval,
+            list_prices=opts.broker == 'creon', thread_safe=opts.broker == 'binance').serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import threading
+
+
+class LazyDispatch:
+    """클래스 속성으로 선언한 COM 객체를 처음 접근할 때 Dispatch.
+
+    Creon 객체는 STA라 만든 스레드 밖에서 쓰면 안 되므로 스레드마다 따로 만든다
+    (같은 스레드의 인스턴스끼리는 공유). 접근하는 스레드는 미리 CoInitialize 되어 있어야 한다.
+    """
+
+    def __init__(self, prog_id):
+        self.prog_id = prog_id
+        self.local = threading.local()
+
+    def __get__(self, instance, owner):
+        obj = getattr(self.local, 'obj', None)
+        if obj is None:
+            import win32com.client
+            obj = self.local.obj = win32com.client.Dispatch(self.prog_id)
+        return obj
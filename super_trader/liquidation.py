@@ -0,0 +1,224 @@
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+
+# CpConclusion 체결 플래그
+FILLED, CONFIRMED, REJECTED, ACCEPTED = '1', '2', '3', '4'
+SIDE_SELL, SIDE_BUY = '1', '2'
+
+
+class ConclusionSource(metaclass=ABCMeta):
+    """주문 체결 이벤트 공급원. 이벤트마다 on_conclusion(code, flag, qty, side) 호출"""
+
+    @abstractmethod
+    def subscribe(self, on_conclusion):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self):
+        pass
+
+    def pump(self):
+        """이벤트 전달이 대기 스레드의 메시지 펌프에 의존하는 경우 여기서 처리"""
+        pass
+
+
+class _ConclusionEvent:
+    def set_params(self, client, on_conclusion):
+        self.client = client
+        self.on_conclusion = on_conclusion
+
+    def OnReceived(self):
+        c = self.client
+        # 9: 종목코드, 14: 체결플래그, 3: 체결수량, 12: 매매구분
+        self.on_conclusion(c.GetHeaderValue(9), str(c.GetHeaderValue(14)),
+                           c.GetHeaderValue(3), str(c.GetHeaderValue(12)))
+
+
+class CreonConclusionSource(ConclusionSource):
+    def __init__(self):
+        self.client = None
+
+    def subscribe(self, on_conclusion):
+        import win32com.client
+        self.client = win32com.client.Dispatch('DsCbo1.CpConclusion')
+        handler = win32com.client.WithEvents(self.client, _ConclusionEvent)
+        handler.set_params(self.client, on_conclusion)
+        self.client.Subscribe()
+
+    def unsubscribe(self):
+        if self.client is not None:
+            self.client.Unsubscribe()
+            self.client = None
+
+    def pump(self):
+        import pythoncom
+        pythoncom.PumpWaitingMessages()
+
+
+class ManualConclusionSource(ConclusionSource):
+    """emit()으로 체결 이벤트를 직접 넣는 공급원 (테스트용)"""
+
+    def __init__(self):
+        self.on_conclusion = None
+
+    def subscribe(self, on_conclusion):
+        self.on_conclusion = on_conclusion
+
+    def unsubscribe(self):
+        self.on_conclusion = None
+
+    def emit(self, code, flag, qty, side=SIDE_SELL):
+        if self.on_conclusion is not None:
+            self.on_conclusion(code, flag, qty, side)
+
+
+class FillWaiter:
+    """side 주문의 체결 수량을 체결 이벤트로 모아, 기대 수량이 모두 체결되거나 거부될 때까지 대기.
+
+    주문을 보내기 전에 start()로 구독해야 바로 체결된 이벤트를 놓치지 않는다.
+    """
+
+    def __init__(self, source, side=SIDE_SELL, poll_interval=0.1):
+        self.source = source
+        self.side = side
+        self.poll_interval = poll_interval
+        self.cond = threading.Condition()
+        self.remaining = {}
+
+    def start(self, expected):
+        """expected: {code: qty}"""
+        with self.cond:
+            self.remaining = {code: qty for code, qty in expected.items() if qty > 0}
+        self.source.subscribe(self.on_conclusion)
+
+    def on_conclusion(self, code, flag, qty, side):
+        if side != self.side:
+            return
+        with self.cond:
+            if code not in self.remaining:
+                return
+            if flag == FILLED:
+                self.remaining[code] = max(0, self.remaining[code] - qty)
+            elif flag == REJECTED:
+                self.remaining[code] = 0  # 더 기다릴 체결이 없음
+            self.cond.notify_all()
+
+    def cancel(self, code):
+        """주문 전송이 실패한 종목은 기다리지 않음"""
+        with self.cond:
+            self.remaining.pop(code, None)
+            self.cond.notify_all()
+
+    def wait(self, timeout):
+        """체결되지 않고 남은 {code: qty} 반환 (모두 체결되면 빈 dict). 반환 후 구독 해제"""
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                with self.cond:
+                    left = {code: qty for code, qty in self.remaining.items() if qty > 0}
+                if not left or time.monotonic() >= deadline:
+                    return left
+                self.source.pump()
+                with self.cond:
+                    self.cond.wait(min(self.poll_interval, max(deadline - time.monotonic(), 0.0)))
+        finally:
+            self.source.unsubscribe()
+
+
+class Liquidator:
+    """보유 종목 전량 매도.
+
+    매도 주문을 모두 보낸 뒤 체결 이벤트로 남은 수량을 추적한다. 첫 주문과 재주문 모두 잔고를 새로 조회해
+    매도가능수량(미체결 주문 제외)만큼만 낸다. 거부됐거나 order_timeout 안에 체결되지 않은 종목은 다시 주문하고,
+    매도가능수량이 0이면 이전 주문이 아직 살아 있으므로 기다린다. 종목별로 max_resubmit회까지 시도한다.
+    """
+
+    def __init__(self, trader, source, order_timeout=30.0, max_resubmit=3, poll_interval=0.1):
+        self.trader = trader
+        self.source = source
+        self.order_timeout = order_timeout
+        self.max_resubmit = max_resubmit
+        self.poll_interval = poll_interval
+        self.cond = threading.Condition()
+        self.remaining = {}
+        self.rejected = set()
+
+    def on_conclusion(self, code, flag, qty, side):
+        if side != SIDE_SELL:
+            return
+        with self.cond:
+            if code not in self.remaining:
+                return
+            if flag == FILLED:
+                self.remaining[code] = max(0, self.remaining[code] - qty)
+            elif flag == REJECTED:
+                self.rejected.add(code)
+            self.cond.notify_all()
+
+    def _refresh_balance(self):
+        """주문/체결 직후라 캐시를 버리고 잔고를 다시 조회"""
+        self.trader.balance_cache.invalidate()
+        return self.trader.balance_cache.snapshot()
+
+    def _submit(self, code, qty):
+        if not self.trader.sell(code, 'market', qty):
+            with self.cond:
+                self.rejected.add(code)
+
+    def run(self, holdings):
+        """holdings: [{'code', 'qty'}]. {'sold', 'failed', 'resubmits', 'elapsed'} 반환"""
+        start = time.monotonic()
+        initial = {h['code']: h['qty'] for h in holdings if h['qty'] > 0}
+        self.remaining = dict(initial)
+        self.rejected = set()
+        sent_at = {}
+        resubmits = {code: 0 for code in initial}
+        attempts = {code: 0 for code in initial}
+        failed = {}
+
+        self.source.subscribe(self.on_conclusion)
+        try:
+            balance = self._refresh_balance()
+            for code, qty in initial.items():
+                sent_at[code] = time.monotonic()
+                qty = min(balance.get_sellable(code), qty)  # 이미 나가 있는 매도 주문 수량은 제외
+                if qty > 0:
+                    self._submit(code, qty)
+
+            while True:
+                with self.cond:
+                    open_codes = [c for c, q in self.remaining.items() if q > 0 and c not in failed]
+                if not open_codes:
+                    break
+                now = time.monotonic()
+                for code in open_codes:
+                    with self.cond:
+                        rejected = code in self.rejected
+                        self.rejected.discard(code)
+                    if not rejected and now - sent_at[code] < self.order_timeout:
+                        continue
+                    if attempts[code] >= self.max_resubmit:
+                        failed[code] = self.remaining[code]
+                        continue
+                    attempts[code] += 1
+                    # 거부 전에 일부 체결됐거나 체결 이벤트를 놓쳤을 수 있으므로 남은 수량은 잔고 기준
+                    balance = self._refresh_balance()
+                    with self.cond:
+                        self.remaining[code] = balance.get_qty(code)
+                    qty = min(balance.get_sellable(code), self.remaining[code])
+                    if qty == 0:  # 다 팔렸거나, 미체결 주문이 남은 수량을 모두 잡고 있음
+                        sent_at[code] = time.monotonic()
+                        continue
+                    resubmits[code] += 1
+                    sent_at[code] = time.monotonic()
+                    self._submit(code, qty)
+                self.source.pump()
+                with self.cond:
+                    self.cond.wait(self.poll_interval)
+        finally:
+            self.source.unsubscribe()
+
+        sold = {code: initial[code] - failed.get(code, 0) for code in initial}
+        return {'sold': sold, 'failed': failed, 'resubmits': resubmits,
+                'elapsed': time.monotonic() - start}
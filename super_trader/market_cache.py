@@ -0,0 +1,35 @@
+import json
+import os
+import time
+
+CACHE_VERSION = 1
+
+
+def load_markets_cached(exchange, path, ttl=24 * 60 * 60, lib_version=None):
+    """ccxt market 정보를 디스크 캐시에서 읽고, 없거나 오래됐으면 거래소에서 받아 저장.
+
+    캐시 형식/ccxt 버전(lib_version, 기본은 설치된 ccxt)/거래소/마켓 타입이 바뀌면 다시 받는다.
+    'cache' 또는 'exchange' 반환
+    """
+    if lib_version is None:
+        import ccxt
+        lib_version = ccxt.__version__
+    version = f"{CACHE_VERSION}:{lib_version}:{exchange.id}:{exchange.options.get('defaultType')}"
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                cached = json.load(f)
+            if cached['version'] == version and time.time() - cached['saved_at'] < ttl:
+                exchange.set_markets(cached['markets'], cached['currencies'])
+                return 'cache'
+        except (ValueError, KeyError):
+            pass  # 깨진 캐시는 다시 받음
+
+    exchange.load_markets()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'version': version, 'saved_at': time.time(),
+                   'markets': exchange.markets, 'currencies': exchange.currencies}, f)
+    os.replace(tmp, path)
+    return 'exchange'
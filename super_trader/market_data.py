@@ -0,0 +1,237 @@
+import threading
+import time
+
+import numpy as np
+
+from .metrics import REGISTRY
+
+TICKER_FIELDS = ['bid', 'bid_qty', 'ask', 'ask_qty', 'last', 'ts']
+BID, BID_QTY, ASK, ASK_QTY, LAST, TS = range(len(TICKER_FIELDS))
+
+
+def market_data_url(market_ids, is_future=False, depth_speed='100ms'):
+    """depth diff + bookTicker + aggTrade combined stream URL"""
+    base = 'wss://fstream.binance.com/stream?streams=' if is_future \
+        else 'wss://stream.binance.com:9443/stream?streams='
+    streams = []
+    for market_id in market_ids:
+        name = market_id.lower()
+        streams += [f'{name}@depth@{depth_speed}', f'{name}@bookTicker', f'{name}@aggTrade']
+    return base + '/'.join(streams)
+
+
+def to_levels(levels):
+    if not len(levels):
+        return np.empty((0, 2), dtype=np.float64)
+    return np.asarray(levels, dtype=np.float64)[:, :2]  # 거래소 응답은 문자열
+
+
+def _merge(px, qty, levels, keep_high, max_levels):
+    """가격 오름차순 (px, qty)에 (price, qty) 갱신 반영. qty 0이면 해당 가격 삭제"""
+    if not len(levels):
+        return px, qty
+    keep = ~np.isin(px, levels[:, 0])
+    add = levels[levels[:, 1] > 0]
+    px = np.concatenate([px[keep], add[:, 0]])
+    qty = np.concatenate([qty[keep], add[:, 1]])
+    order = np.argsort(px, kind='stable')
+    px, qty = px[order], qty[order]
+    if len(px) > max_levels:  # 최우선 호가에서 먼 쪽을 버림
+        sl = slice(-max_levels, None) if keep_high else slice(None, max_levels)
+        px, qty = px[sl], qty[sl]
+    return px, qty
+
+
+class OrderBook:
+    """가격 오름차순 numpy 배열로 관리하는 L2 호가. bids는 배열 끝이 최우선 호가"""
+
+    def __init__(self, max_levels=1000):
+        self.max_levels = max_levels
+        self.update_id = 0
+        self.load(0, [], [])
+
+    def load(self, update_id, bids, asks):
+        """REST snapshot으로 초기화"""
+        empty = np.empty(0, dtype=np.float64)
+        self.bid_px, self.bid_qty = _merge(empty, empty, to_levels(bids), True, self.max_levels)
+        self.ask_px, self.ask_qty = _merge(empty, empty, to_levels(asks), False, self.max_levels)
+        self.update_id = update_id
+
+    def apply(self, update_id, bids, asks):
+        self.bid_px, self.bid_qty = _merge(self.bid_px, self.bid_qty, to_levels(bids), True, self.max_levels)
+        self.ask_px, self.ask_qty = _merge(self.ask_px, self.ask_qty, to_levels(asks), False, self.max_levels)
+        self.update_id = update_id
+
+    def top(self, depth):
+        """(bids, asks) 각각 (depth, 2) [price, qty]. bids는 내림차순, asks는 오름차순"""
+        bids = np.column_stack([self.bid_px[:-depth - 1:-1], self.bid_qty[:-depth - 1:-1]])
+        asks = np.column_stack([self.ask_px[:depth], self.ask_qty[:depth]])
+        return bids, asks
+
+
+class MarketDataCache:
+    """Binance market-data stream으로 symbol별 ticker와 L2 호가를 메모리에 유지.
+
+    depth는 REST snapshot + diff 이벤트로 동기화하고, update id가 끊기면 버퍼링하면서 snapshot을 다시 받는다.
+    market_ids: 거래소 심볼 id 목록 (예: 'BTCUSDT'), fetch_snapshot(market_id) -> (last_update_id, bids, asks)
+    transport: stream.StreamTransport (WebSocketTransport, 테스트용 QueueTransport 등)
+    """
+
+    def __init__(self, market_ids, fetch_snapshot, transport, max_levels=1000, resync_delay=0.5, log=None):
+        self.index = {market_id: i for i, market_id in enumerate(market_ids)}
+        self.fetch_snapshot = fetch_snapshot
+        self.transport = transport
+        self.resync_delay = resync_delay
+        self.log = log
+        self.tickers = np.full((len(market_ids), len(TICKER_FIELDS)), np.nan)
+        self.ticker_ids = np.zeros(len(market_ids), dtype=np.int64)  # bookTicker update id
+        self.books = {market_id: OrderBook(max_levels) for market_id in market_ids}
+        self.synced = dict.fromkeys(market_ids, False)
+        self.bridging = dict.fromkeys(market_ids, True)  # snapshot 직후 첫 이벤트 대기 중
+        self.buffers = {market_id: [] for market_id in market_ids}
+        self.resyncing = set()
+        self.lock = threading.Lock()
+        self.gaps = REGISTRY.counter('market_data_gaps', 'binance')
+        self.resyncs = REGISTRY.counter('market_data_resyncs', 'binance')
+
+    def start(self):
+        self.transport.start(self.on_message)
+        for market_id in self.index:
+            self._start_resync(market_id)
+
+    def stop(self):
+        self.transport.stop()
+
+    def on_message(self, msg):
+        msg = msg.get('data', msg)  # combined stream은 {'stream', 'data'}로 감싸서 옴
+        market_id = msg.get('s')
+        if market_id not in self.index:
+            return
+        event = msg.get('e')
+        if event == 'depthUpdate':
+            self._on_depth(market_id, msg)
+        elif event in ('aggTrade', 'trade'):
+            self._set_ticker(market_id, LAST, float(msg['p']))
+        elif event == '24hrTicker':
+            self._set_ticker(market_id, LAST, float(msg['c']))
+        elif event == 'bookTicker' or (event is None and 'b' in msg and 'a' in msg):  # spot bookTicker는 'e'가 없음
+            self._on_book_ticker(market_id, msg)
+
+    def _set_ticker(self, market_id, field, value):
+        row = self.tickers[self.index[market_id]]
+        with self.lock:
+            row[field] = value
+            row[TS] = time.time()
+
+    def _on_book_ticker(self, market_id, msg):
+        i = self.index[market_id]
+        with self.lock:
+            if msg['u'] < self.ticker_ids[i]:
+                return
+            self.ticker_ids[i] = msg['u']
+            self.tickers[i, :TS] = [float(msg['b']), float(msg['B']), float(msg['a']), float(msg['A']),
+                                    self.tickers[i, LAST]]
+            self.tickers[i, TS] = time.time()
+
+    def _accept(self, market_id, msg):
+        """'apply' | 'stale' | 'gap'"""
+        last = self.books[market_id].update_id
+        if self.bridging[market_id]:
+            if msg['u'] < last:
+                return 'stale'
+            return 'apply' if msg['U'] <= last + 1 else 'gap'
+        if msg['u'] <= last:
+            return 'stale'
+        if 'pu' in msg:  # futures: 직전 이벤트의 u
+            return 'apply' if msg['pu'] == last else 'gap'
+        return 'apply' if msg['U'] == last + 1 else 'gap'
+
+    def _on_depth(self, market_id, msg):
+        with self.lock:
+            if not self.synced[market_id]:
+                self.buffers[market_id].append(msg)
+                return
+            result = self._accept(market_id, msg)
+            if result == 'apply':
+                self.books[market_id].apply(msg['u'], msg['b'], msg['a'])
+                self.bridging[market_id] = False
+                return
+            if result == 'stale':
+                return
+            self.gaps.inc()
+            self.synced[market_id] = False
+            self.buffers[market_id] = [msg]
+        if self.log is not None:
+            self.log('market data gap: {} (update id {}) -> resync', market_id, msg['U'], log_level='warning')
+        self._start_resync(market_id)
+
+    def _start_resync(self, market_id):
+        with self.lock:
+            if market_id in self.resyncing:
+                return
+            self.resyncing.add(market_id)
+        threading.Thread(target=self._resync, args=(market_id,), daemon=True).start()
+
+    def _resync(self, market_id):
+        """snapshot을 받아 버퍼된 이벤트를 이어 붙인다. snapshot이 버퍼보다 오래됐으면 다시 받음"""
+        while True:
+            self.resyncs.inc()
+            try:
+                update_id, bids, asks = self.fetch_snapshot(market_id)
+            except Exception as e:
+                if self.log is not None:
+                    self.log('market data snapshot failed: {} -> {}', market_id, e, log_level='warning')
+                time.sleep(self.resync_delay)
+                continue
+            with self.lock:
+                book = self.books[market_id]
+                book.load(update_id, bids, asks)
+                self.bridging[market_id] = True
+                buffered, self.buffers[market_id] = self.buffers[market_id], []
+                for i, msg in enumerate(buffered):
+                    result = self._accept(market_id, msg)
+                    if result == 'apply':
+                        book.apply(msg['u'], msg['b'], msg['a'])
+                        self.bridging[market_id] = False
+                    elif result == 'gap':
+                        self.buffers[market_id] = buffered[i:]
+                        break
+                else:
+                    # 같은 lock 안에서 풀어야 직후의 gap이 resync를 놓치지 않음
+                    self.synced[market_id] = True
+                    self.resyncing.discard(market_id)
+                    return
+            time.sleep(self.resync_delay)
+
+    def is_synced(self, market_id):
+        return self.synced.get(market_id, False)
+
+    def get_price(self, market_id, max_age=None):
+        """최근 체결가 (없으면 bid/ask 중간값). 데이터가 없거나 max_age초보다 오래됐으면 None"""
+        i = self.index.get(market_id)
+        if i is None:
+            return None
+        with self.lock:
+            row = self.tickers[i].copy()
+        if np.isnan(row[TS]) or (max_age is not None and time.time() - row[TS] > max_age):
+            return None
+        if not np.isnan(row[LAST]):
+            return float(row[LAST])
+        if np.isnan(row[BID]):
+            return None
+        return float((row[BID] + row[ASK]) / 2)
+
+    def get_ticker(self, market_id):
+        i = self.index[market_id]
+        with self.lock:
+            row = self.tickers[i].copy()
+        return dict(zip(TICKER_FIELDS, row.tolist()))
+
+    def get_book(self, market_id, depth=10):
+        """{'bids', 'asks', 'update_id'}. 동기화 전이면 None"""
+        with self.lock:
+            if not self.synced[market_id]:
+                return None
+            book = self.books[market_id]
+            bids, asks = book.top(depth)
+            return {'bids': bids, 'asks': asks, 'update_id': book.update_id}
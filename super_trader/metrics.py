@@ -0,0 +1,244 @@
+import functools
+import os
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+SUB_BITS = 3  # 2^3 sub-buckets per power of two (~12% precision)
+N_BUCKETS = 320
+FOLD_SIZE = 1024  # 버퍼에 이만큼 쌓이면 버킷에 반영
+EXPORT_BOUNDS_SEC = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0)
+
+
+def bucket_index(ns):
+    if ns < (1 << SUB_BITS):
+        return max(ns, 0)
+    e = ns.bit_length()
+    sub = (ns >> (e - SUB_BITS - 1)) & ((1 << SUB_BITS) - 1)
+    return min((e - SUB_BITS) * (1 << SUB_BITS) + sub, N_BUCKETS - 1)
+
+
+def bucket_indices(ns):
+    """bucket_index의 배열 버전"""
+    ns = np.maximum(np.asarray(ns, dtype=np.int64), 0)
+    e = np.frexp(ns.astype(np.float64))[1]  # 2^53 ns 미만에서는 bit_length와 같음
+    sub = (ns >> np.maximum(e - SUB_BITS - 1, 0)) & ((1 << SUB_BITS) - 1)
+    idx = np.minimum((e - SUB_BITS) * (1 << SUB_BITS) + sub, N_BUCKETS - 1)
+    return np.where(ns < (1 << SUB_BITS), ns, idx)
+
+
+def bucket_upper(idx):
+    """idx 버킷의 상한(ns)"""
+    if idx < (1 << SUB_BITS):
+        return idx + 1
+    e, sub = divmod(idx, 1 << SUB_BITS)
+    e += SUB_BITS
+    return ((1 << SUB_BITS) + sub + 1) << (e - SUB_BITS - 1)
+
+
+class _PerThread:
+    """스레드마다 별도 shard(make()로 생성)를 두어 기록 시 잠금이 없음. 읽을 때만 모든 shard를 모음"""
+
+    def __init__(self, make):
+        self.make = make
+        self.local = threading.local()
+        self.shards = []
+        self.lock = threading.Lock()
+
+    def shard(self):
+        s = getattr(self.local, 's', None)
+        if s is None:
+            s = self.make()
+            with self.lock:
+                self.shards.append(s)
+            self.local.s = s
+        return s
+
+    def all(self):
+        with self.lock:
+            return list(self.shards)
+
+
+class LatencyHistogram:
+    """log-linear(HDR 방식) 지연시간 히스토그램. 마지막 칸은 합계(ns).
+
+    기록은 스레드별 버퍼에 ns를 append만 하고, FOLD_SIZE개마다 또는 읽을 때 잠금 안에서 한 번에 버킷에 반영한다.
+    """
+
+    def __init__(self):
+        self.pending = _PerThread(list)
+        self.folded = np.zeros(N_BUCKETS + 1, dtype=np.int64)
+        self.lock = threading.Lock()
+
+    def record(self, ns):
+        pending = self.pending.shard()
+        pending.append(ns)
+        if len(pending) >= FOLD_SIZE:
+            self.fold()
+
+    def fold(self):
+        with self.lock:
+            items = []
+            for pending in self.pending.all():
+                # 복사한 만큼만 지우므로 그 사이 주인 스레드가 append한 값은 남음
+                copied = pending[:]
+                del pending[:len(copied)]
+                items += copied
+            if not items:
+                return
+            self.folded[:N_BUCKETS] += np.bincount(bucket_indices(items), minlength=N_BUCKETS)
+            self.folded[N_BUCKETS] += sum(items)
+
+    def snapshot(self):
+        self.fold()
+        with self.lock:
+            total = self.folded.tolist()
+        return total[:N_BUCKETS], total[N_BUCKETS]
+
+    def percentile(self, q):
+        """q(0~100) 분위 지연시간(초)"""
+        counts, _ = self.snapshot()
+        n = sum(counts)
+        if n == 0:
+            return 0.0
+        target = n * q / 100
+        acc = 0
+        for idx, cnt in enumerate(counts):
+            acc += cnt
+            if acc >= target:
+                return bucket_upper(idx) / 1e9
+        return bucket_upper(N_BUCKETS - 1) / 1e9
+
+
+class Counter:
+    def __init__(self):
+        self.shards = _PerThread(lambda: [0])
+
+    def inc(self, n=1):
+        self.shards.shard()[0] += n
+
+    def value(self):
+        return sum(s[0] for s in self.shards.all())
+
+
+class Registry:
+    def __init__(self, prefix='super_trader'):
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def histogram(self, metric, name=''):
+        key = (metric, name)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            return self.histograms[key]
+
+    def counter(self, metric, name=''):
+        key = (metric, name)
+        with self.lock:
+            if key not in self.counters:
+                self.counters[key] = Counter()
+            return self.counters[key]
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        seen = set()
+        for (metric, name), hist in histograms:
+            full = f'{self.prefix}_{metric}_seconds'
+            if full not in seen:
+                lines.append(f'# TYPE {full} histogram')
+                seen.add(full)
+            counts, total_ns = hist.snapshot()
+            acc = idx = 0
+            for bound in EXPORT_BOUNDS_SEC:
+                while idx < N_BUCKETS and bucket_upper(idx) <= bound * 1e9:
+                    acc += counts[idx]
+                    idx += 1
+                lines.append(f'{full}_bucket{{name="{name}",le="{bound:g}"}} {acc}')
+            lines.append(f'{full}_bucket{{name="{name}",le="+Inf"}} {sum(counts)}')
+            lines.append(f'{full}_sum{{name="{name}"}} {total_ns / 1e9}')
+            lines.append(f'{full}_count{{name="{name}"}} {sum(counts)}')
+        for (metric, name), counter in counters:
+            full = f'{self.prefix}_{metric}_total'
+            if full not in seen:
+                lines.append(f'# TYPE {full} counter')
+                seen.add(full)
+            lines.append(f'{full}{{name="{name}"}} {counter.value()}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """node_exporter textfile collector 형식으로 저장"""
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """/metrics HTTP endpoint를 백그라운드 스레드로 실행"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+REGISTRY = Registry()
+
+
+def timed(name, registry=REGISTRY):
+    """호출 지연시간(call_latency)과 예외 수(call_errors) 기록"""
+    def decorator(fn):
+        hist = registry.histogram('call_latency', name)
+        errors = registry.counter('call_errors', name)
+        local, shard = hist.pending.local, hist.pending.shard
+        now = time.perf_counter_ns
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = now()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                # hot path: LatencyHistogram.record()를 풀어 씀
+                elapsed = now() - start
+                try:
+                    pending = local.s
+                except AttributeError:  # 이 스레드의 첫 기록
+                    pending = shard()
+                pending.append(elapsed)
+                if len(pending) >= FOLD_SIZE:
+                    hist.fold()
+        return wrapper
+    return decorator
+
+
+def instrument_class(cls):
+    """cls에 정의된 public 메서드를 timed로 감쌈"""
+    for attr, fn in list(vars(cls).items()):
+        if attr.startswith('_') or not isinstance(fn, types.FunctionType):
+            continue
+        setattr(cls, attr, timed(f'{cls.__name__}.{attr}')(fn))
+    return cls
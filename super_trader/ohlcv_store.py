@@ -0,0 +1,190 @@
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+OHLCV_DTYPE = np.dtype([('ts', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                        ('close', '<f8'), ('volume', '<f8')])
+OHLCV_COLS = ['open', 'high', 'low', 'close', 'volume']
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000  # 1970-01-01은 목요일. 주봉은 월요일 0시 시작
+
+
+def to_ms(t):
+    """날짜(YYYYMMDD int/str, datetime, Timestamp) -> epoch ms"""
+    if isinstance(t, (int, np.integer)):
+        t = str(t)
+    return pd.Timestamp(t).value // 10**6
+
+
+def bar_start(ts, timeframe, bar_ms):
+    """ts(ms)가 속한 봉의 시작 시각. 월봉은 달력 월, 주봉은 월요일 기준"""
+    if timeframe.endswith('M'):
+        return int(np.datetime64(ts, 'ms').astype('datetime64[M]').astype('datetime64[ms]').astype(np.int64))
+    if timeframe.endswith('w'):
+        return (ts - WEEK_OFFSET_MS) // bar_ms * bar_ms + WEEK_OFFSET_MS
+    return ts // bar_ms * bar_ms
+
+
+def to_records(rows):
+    """[[ts, o, h, l, c, v], ...] -> OHLCV_DTYPE 배열"""
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+    arr = np.empty(len(rows), dtype=OHLCV_DTYPE)
+    arr['ts'] = rows[:, 0].astype(np.int64)
+    for i, col in enumerate(OHLCV_COLS):
+        arr[col] = rows[:, i + 1]
+    return arr
+
+
+class OHLCVStore:
+    """symbol/timeframe별 월 단위 파티션(.npy) OHLCV 저장소.
+
+    이미 받은 구간(coverage)을 기록해 두고, 조회 시 비어 있는 구간만 fetch로 받아 추가한다.
+    기존 봉은 덮어쓰지 않으므로 같은 데이터를 여러 번 써도 결과가 같다.
+    새 봉이 파티션 끝 이후면 파일 끝에만 이어 쓰고, 겹치는 경우에만 파티션을 다시 쓴다.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def _dir(self, symbol, timeframe):
+        return os.path.join(self.root, symbol.replace('/', '_').replace(':', '_'), timeframe)
+
+    @staticmethod
+    def _partition_keys(ts):
+        return np.asarray(ts).astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+
+    def _coverage_path(self, symbol, timeframe):
+        return os.path.join(self._dir(symbol, timeframe), 'coverage.json')
+
+    def coverage(self, symbol, timeframe):
+        path = self._coverage_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _atomic_write(path, write):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def _add_coverage(self, symbol, timeframe, start, end):
+        intervals = sorted(self.coverage(symbol, timeframe) + [[start, end]])
+        merged = []
+        for s, e in intervals:
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        data = json.dumps(merged).encode()
+        self._atomic_write(self._coverage_path(symbol, timeframe), lambda f: f.write(data))
+
+    def missing(self, symbol, timeframe, start, end):
+        """[start, end) 중 아직 받지 않은 구간 목록"""
+        gaps = []
+        cur = start
+        for s, e in self.coverage(symbol, timeframe):
+            if e <= cur:
+                continue
+            if s >= end:
+                break
+            if s > cur:
+                gaps.append((cur, s))
+            cur = max(cur, e)
+        if cur < end:
+            gaps.append((cur, end))
+        return gaps
+
+    @staticmethod
+    def _append(file, records):
+        """records(정렬됨)가 모두 파티션의 마지막 봉 이후면 끝에 이어 쓰고 헤더의 shape만 고침.
+
+        이어 쓸 수 없으면(겹치는 봉, 헤더 길이가 바뀜 등) 아무것도 쓰지 않고 False
+        """
+        with open(file, 'r+b') as f:
+            if np.lib.format.read_magic(f) != (1, 0):
+                return False
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            offset, n = f.tell(), shape[0]
+            if fortran or dtype != OHLCV_DTYPE:
+                return False
+            if n:
+                f.seek(offset + (n - 1) * dtype.itemsize)
+                if np.frombuffer(f.read(dtype.itemsize), dtype=dtype)['ts'][0] >= records['ts'][0]:
+                    return False
+            header = io.BytesIO()
+            np.lib.format.write_array_header_1_0(header, {
+                'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (n + len(records),)})
+            if header.tell() != offset:
+                return False
+            # 데이터 먼저, 헤더는 나중에. 중간에 죽으면 뒤에 붙은 바이트는 읽히지 않고 coverage도 그대로라 다시 받음
+            f.seek(offset + n * dtype.itemsize)
+            f.write(records.tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(header.getvalue())
+        return True
+
+    def write(self, symbol, timeframe, records):
+        if len(records) == 0:
+            return
+        path = self._dir(symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+        records = records[np.argsort(records['ts'], kind='stable')]
+        records = records[np.r_[True, records['ts'][1:] != records['ts'][:-1]]]
+        keys = self._partition_keys(records['ts'])
+        for key in np.unique(keys):
+            new = records[keys == key]
+            file = os.path.join(path, f'{key}.npy')
+            if os.path.exists(file):
+                if self._append(file, new):
+                    continue
+                old = np.load(file)
+                new = new[~np.isin(new['ts'], old['ts'])]
+                if len(new) == 0:  # 이미 있는 봉뿐이면 파일을 건드리지 않음
+                    continue
+                new = np.concatenate([old, new])
+                new = new[np.argsort(new['ts'], kind='stable')]
+            self._atomic_write(file, lambda f: np.save(f, new))
+
+    def read(self, symbol, timeframe, start, end):
+        """[start, end) 구간이 걸친 파티션만 memory-map으로 읽음"""
+        path = self._dir(symbol, timeframe)
+        months = np.arange(np.datetime64(start, 'ms').astype('datetime64[M]'),
+                           np.datetime64(end - 1, 'ms').astype('datetime64[M]') + 1)
+        parts = []
+        for key in months.astype(str):
+            file = os.path.join(path, f'{key}.npy')
+            if not os.path.exists(file):
+                continue
+            arr = np.load(file, mmap_mode='r')
+            lo, hi = np.searchsorted(arr['ts'], [start, end])
+            parts.append(np.array(arr[lo:hi]))
+        if not parts:
+            return np.empty(0, dtype=OHLCV_DTYPE)
+        return np.concatenate(parts)
+
+    def get(self, symbol, timeframe, start, end, fetch, bar_ms):
+        """[start, end) OHLCV DataFrame. 빠진 구간만 fetch(gap_start, gap_end)로 받아 저장.
+
+        진행 중인 봉은 저장하지 않는다.
+        """
+        with self.lock:
+            complete_end = min(end, bar_start(int(time.time() * 1000), timeframe, bar_ms))
+            for gap_start, gap_end in self.missing(symbol, timeframe, start, complete_end):
+                records = to_records(fetch(gap_start, gap_end))
+                records = records[(records['ts'] >= gap_start) & (records['ts'] < gap_end)]
+                self.write(symbol, timeframe, records)
+                self._add_coverage(symbol, timeframe, gap_start, gap_end)
+            records = self.read(symbol, timeframe, start, end)
+        df = pd.DataFrame(records[OHLCV_COLS], index=pd.to_datetime(records['ts'], unit='ms'))
+        df.index.name = 'date'
+        return df
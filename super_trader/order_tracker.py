@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .metrics import REGISTRY
+
+FINAL_FAILED_STATUS = ('CANCELED', 'REJECTED', 'EXPIRED')
+
+
+class OrderNotFilledError(Exception):
+    pass
+
+
+class _TrackedOrder:
+    def __init__(self, symbol, market_id, order_id, deadline, interval, sent_ns=None):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.key = (market_id, order_id)  # binance order id는 symbol 안에서만 고유
+        self.deadline = deadline
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.polling = False
+        self.created = time.perf_counter_ns() if sent_ns is None else sent_ns  # order_to_fill 기준 시각
+        self.future = Future()
+
+
+class OrderTracker:
+    """주문 체결 추적.
+
+    execution report(푸시)로 체결을 먼저 확인하고, 놓친 주문은 fetchOrder를
+    지수 백오프로 폴링하여 확인한다. track()은 Future를 반환하므로 여러 주문을 동시에 기다릴 수 있다.
+    폴링 시점이 된 주문들은 poll_workers개 스레드에서 동시에 조회하고, rate_limiter(TokenBucket)를 주면 공유한다.
+    """
+
+    def __init__(self, exchange, transport=None, timeout=30.0,
+                 poll_interval=None, max_poll_interval=2.0, log=None, rate_limiter=None, poll_workers=8):
+        self.exchange = exchange
+        self.rate_limiter = rate_limiter
+        self.pool = ThreadPoolExecutor(max_workers=poll_workers, thread_name_prefix='order_poll')
+        self.transport = transport
+        self.timeout = timeout
+        # 푸시가 있으면 폴링은 보조 수단이므로 첫 폴링을 늦춘다.
+        self.poll_interval = poll_interval or (0.5 if transport else 0.02)
+        self.max_poll_interval = max_poll_interval
+        self.log = log
+
+        self.orders = {}
+        self.early_reports = OrderedDict()  # track() 전에 도착한 체결 보고
+        self.cond = threading.Condition()
+        self.poll_th = threading.Thread(target=self._poll_loop, daemon=True)
+        self.poll_th.start()
+        if self.transport is not None:
+            self.transport.start(self.on_report)
+
+    def track(self, symbol, order_id, timeout=None, sent_ns=None):
+        """sent_ns: 주문 전송 직전의 perf_counter_ns(). 주면 order_to_fill을 전송 시점부터 잰다"""
+        order_id = str(order_id)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        order = _TrackedOrder(symbol, self.exchange.market_id(symbol), order_id, deadline, self.poll_interval,
+                              sent_ns)
+        with self.cond:
+            report = self.early_reports.pop(order.key, None)
+            if report is None:
+                self.orders[order.key] = order
+                self.cond.notify()
+        if report is not None:
+            self._resolve(order, report)
+        return order.future
+
+    @staticmethod
+    def wait_all(futures, timeout=None):
+        """Future 목록의 결과를 순서대로 반환 (실패한 주문은 예외 객체)"""
+        results = []
+        end = None if timeout is None else time.monotonic() + timeout
+        for fut in futures:
+            remain = None if end is None else max(0.0, end - time.monotonic())
+            try:
+                results.append(fut.result(timeout=remain))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def on_report(self, msg):
+        info = self.parse_report(msg)
+        if info is None or info['status'] not in ('FILLED',) + FINAL_FAILED_STATUS:
+            return
+        key = (info['symbol'], str(info['orderId']))
+        with self.cond:
+            order = self.orders.pop(key, None)
+            if order is None:
+                self.early_reports[key] = info
+                if len(self.early_reports) > 1000:
+                    self.early_reports.popitem(last=False)
+                return
+        self._resolve(order, info)
+
+    @staticmethod
+    def parse_report(msg):
+        """user-data stream 메시지를 fetchOrder()['info']와 같은 형태로 변환"""
+        event = msg.get('e')
+        if event == 'ORDER_TRADE_UPDATE':  # future
+            o = msg['o']
+            return {
+                'time': o['T'], 'updateTime': o['T'], 'orderId': o['i'], 'status': o['X'],
+                'type': o['o'], 'side': o['S'], 'symbol': o['s'], 'price': o['p'],
+                'avgPrice': o['ap'], 'origQty': o['q'], 'executedQty': o['z'],
+            }
+        if event == 'executionReport':  # spot
+            exec_qty = float(msg['z'])
+            avg_price = float(msg['Z']) / exec_qty if exec_qty else 0.0
+            return {
+                'time': msg['O'], 'updateTime': msg['T'], 'orderId': msg['i'], 'status': msg['X'],
+                'type': msg['o'], 'side': msg['S'], 'symbol': msg['s'], 'price': msg['p'],
+                'avgPrice': str(avg_price), 'origQty': msg['q'], 'executedQty': msg['z'],
+            }
+        return None
+
+    def _resolve(self, order, info):
+        if info['status'] == 'FILLED':
+            REGISTRY.histogram('order_to_fill', 'binance').record(time.perf_counter_ns() - order.created)
+            order.future.set_result(info)
+        else:
+            order.future.set_exception(
+                OrderNotFilledError(f"order {order.order_id} {info['status']}"))
+
+    def _poll_loop(self):
+        while True:
+            with self.cond:
+                while not self.orders:
+                    self.cond.wait()
+                now = time.monotonic()
+                idle = [o for o in self.orders.values() if not o.polling]
+                due = [o for o in idle if o.next_poll <= now or o.deadline <= now]
+                if not due:
+                    wake = min((min(o.next_poll, o.deadline) for o in idle), default=None)
+                    self.cond.wait(None if wake is None else wake - now)
+                    continue
+                for order in due:
+                    order.polling = True
+            for order in due:
+                self.pool.submit(self._poll, order)
+
+    def _poll(self, order):
+        if time.monotonic() >= order.deadline:
+            with self.cond:
+                if self.orders.pop(order.key, None) is None:
+                    return
+            order.future.set_exception(
+                TimeoutError(f'order {order.order_id} not filled before deadline'))
+            return
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        t0 = time.perf_counter_ns()
+        try:
+            info = self.exchange.fetchOrder(symbol=order.symbol, id=order.order_id)['info']
+        except Exception as e:
+            REGISTRY.counter('fetch_order_errors', 'binance').inc()
+            if self.log is not None:
+                self.log(str(e), log_level='error')
+            info = None
+        REGISTRY.histogram('fetch_order', 'binance').record(time.perf_counter_ns() - t0)
+        if info is not None and info['status'] in ('FILLED',) + FINAL_FAILED_STATUS:
+            with self.cond:
+                if self.orders.pop(order.key, None) is None:
+                    return  # 푸시로 이미 처리됨
+            self._resolve(order, info)
+            return
+        order.interval = min(order.interval * 2, self.max_poll_interval)
+        with self.cond:
+            order.next_poll = time.monotonic() + order.interval
+            order.polling = False
+            self.cond.notify()
@@ -0,0 +1,16 @@
+from .snapshot_cache import SnapshotCache
+
+
+class PositionCache(SnapshotCache):
+    """전체 포지션을 한 번에 조회하여 symbol(market id)별로 색인하는 스냅샷 캐시"""
+
+    def __init__(self, fetch, ttl=1.0):
+        self.fetch = fetch  # () -> ccxt positions list
+        super().__init__(self._load, ttl=ttl)
+
+    def _load(self):
+        return {p['info']['symbol']: p for p in self.fetch()}
+
+    def get(self, market_id):
+        """포지션이 없으면 None"""
+        return self.snapshot().get(market_id)
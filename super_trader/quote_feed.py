@@ -0,0 +1,156 @@
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+QUOTE_FIELDS = ('price', 'ask', 'bid', 'vol')
+
+
+class QuoteSource(metaclass=ABCMeta):
+    """실시간 시세 이벤트 공급원. 틱마다 on_tick(code, price, ask, bid, vol) 호출"""
+
+    @abstractmethod
+    def subscribe(self, codes, on_tick):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self):
+        pass
+
+
+class QuoteBook:
+    """종목 인덱스별 [price, ask, bid, vol]를 미리 할당한 배열에 유지"""
+
+    def __init__(self, codes):
+        self.codes = list(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.data = np.full((len(self.codes), len(QUOTE_FIELDS)), np.nan)
+        self.updated = np.zeros(len(self.codes))
+        self.lock = threading.Lock()
+
+    def on_tick(self, code, price, ask, bid, vol):
+        i = self.index.get(code)
+        if i is None:
+            return
+        with self.lock:
+            self.data[i] = (price, ask, bid, vol)
+            self.updated[i] = time.time()
+
+    def view(self):
+        """복사 없는 읽기 전용 뷰. 행 단위 갱신은 원자적이지만 행 간 시점은 다를 수 있음"""
+        v = self.data.view()
+        v.flags.writeable = False
+        return v
+
+    def has(self, codes, max_age=None):
+        """모든 종목에 틱이 있고, max_age를 주면 마지막 틱이 max_age초 이내인지"""
+        oldest = 0.0 if max_age is None else time.time() - max_age
+        for code in codes:
+            i = self.index.get(code)
+            if i is None or not self.updated[i] or self.updated[i] < oldest:
+                return False
+        return True
+
+    def snapshot(self, codes, fields=('price',)):
+        """codes x fields의 일관된 복사본"""
+        rows = [self.index[code] for code in codes]
+        cols = [QUOTE_FIELDS.index(f) for f in fields]
+        with self.lock:
+            return self.data[np.ix_(rows, cols)]
+
+
+class _StockCurEvent:
+    def set_params(self, client, on_tick):
+        self.client = client
+        self.on_tick = on_tick
+
+    def OnReceived(self):
+        c = self.client
+        # 0: 종목코드, 7: 매도호가, 8: 매수호가, 9: 누적거래량, 13: 현재가
+        self.on_tick(c.GetHeaderValue(0), c.GetHeaderValue(13), c.GetHeaderValue(7),
+                     c.GetHeaderValue(8), c.GetHeaderValue(9))
+
+
+class CreonQuoteSource(QuoteSource):
+    """DsCbo1.StockCur 실시간 구독.
+
+    이벤트는 구독한 스레드의 메시지 펌프에서만 전달되므로, 전용 STA 스레드에서 구독하고 계속 펌프한다.
+    """
+
+    def __init__(self, pump_interval=0.01):
+        self.pump_interval = pump_interval
+        self.th = None
+        self.running = False
+
+    def subscribe(self, codes, on_tick):
+        ready = threading.Event()
+        errors = []
+        self.running = True
+        self.th = threading.Thread(target=self._run, args=(list(codes), on_tick, ready, errors), daemon=True)
+        self.th.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+
+    def _run(self, codes, on_tick, ready, errors):
+        import pythoncom
+        import win32com.client
+        pythoncom.CoInitialize()
+        clients = []
+        try:
+            try:
+                for code in codes:
+                    client = win32com.client.Dispatch('DsCbo1.StockCur')
+                    handler = win32com.client.WithEvents(client, _StockCurEvent)
+                    handler.set_params(client, on_tick)
+                    client.SetInputValue(0, code)
+                    client.Subscribe()
+                    clients.append(client)
+            except Exception as e:
+                errors.append(e)
+                self.running = False
+            finally:
+                ready.set()
+            while self.running:
+                pythoncom.PumpWaitingMessages()
+                time.sleep(self.pump_interval)
+        finally:
+            for client in clients:
+                client.Unsubscribe()
+            pythoncom.CoUninitialize()
+
+    def unsubscribe(self):
+        self.running = False
+        if self.th is not None:
+            self.th.join(timeout=5.0)
+            self.th = None
+
+
+class ReplayQuoteSource(QuoteSource):
+    """(code, price, ask, bid, vol) 틱 목록을 재생하는 합성 시세원 (테스트/리눅스용)"""
+
+    def __init__(self, ticks, interval=0.0):
+        self.ticks = ticks
+        self.interval = interval
+        self.running = False
+        self.done = threading.Event()
+
+    def subscribe(self, codes, on_tick):
+        codes = set(codes)
+        self.running = True
+
+        def _run():
+            for tick in self.ticks:
+                if not self.running:
+                    break
+                if tick[0] in codes:
+                    on_tick(*tick)
+                if self.interval:
+                    time.sleep(self.interval)
+            self.done.set()
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def unsubscribe(self):
+        self.running = False
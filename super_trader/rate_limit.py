@@ -0,0 +1,69 @@
+import collections
+import threading
+import time
+
+from .metrics import REGISTRY
+
+
+class TokenBucket:
+    """스레드 간 공유되는 토큰 버킷. rate: 초당 충전 토큰 수, capacity: 최대 버스트"""
+
+    def __init__(self, rate, capacity, name=''):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.wait_hist = REGISTRY.histogram('rate_limit_wait', name)
+        self.waits = REGISTRY.counter('rate_limit_waits', name)
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, n=1):
+        """토큰이 있으면 소비 후 0, 없으면 필요한 대기 시간(초) 반환"""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= n:
+                self.tokens -= n
+                return 0.0
+            return (n - self.tokens) / self.rate
+
+    def acquire(self, n=1):
+        """토큰을 얻을 때까지 대기하고, 대기한 시간(초) 반환"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(n)
+            if wait == 0.0:
+                if waited:
+                    self.waits.inc()
+                    self.wait_hist.record(int(waited * 1e9))
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+class WindowLimiter:
+    """최근 period초 동안 count회까지 허용하는 sliding window 제한.
+
+    토큰 버킷은 버스트 직후에도 충전분만큼 더 보내므로 'period초에 count회' 제한을 넘길 수 있다.
+    try_acquire()는 TokenBucket과 같은 규약 (허용되면 0, 아니면 대기할 초).
+    서버는 요청을 받은 시점부터 세므로 margin초만큼 창을 늘려 잡는다.
+    """
+
+    def __init__(self, count, period, margin=0.0):
+        self.count = count
+        self.period = float(period) + margin
+        self.sent = collections.deque()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, n=1):
+        with self.lock:
+            now = time.monotonic()
+            while self.sent and now - self.sent[0] >= self.period:
+                self.sent.popleft()
+            if len(self.sent) + n <= self.count:
+                self.sent.extend([now] * n)
+                return 0.0
+            return self.sent[len(self.sent) + n - self.count - 1] + self.period - now
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+PLAN_COLS = ['cur_qty', 'target_qty', 'order_qty', 'price', 'notional']
+
+
+def round_step(qty, step):
+    """qty를 step 단위로 0 쪽으로 내림 (부동소수 오차 보정)"""
+    units = np.trunc(np.round(qty / step, 9))
+    return np.round(units * step, 12)
+
+
+def _filter_small(delta, price, min_qty, min_notional):
+    """최소 수량/최소 주문금액 미만 주문은 0"""
+    ok = (np.abs(delta) >= min_qty) & (np.abs(delta) * price >= min_notional)
+    return np.where(ok, delta, 0.0)
+
+
+def plan_rebalance(symbols, cur_qty, price, weights, equity, cash=None, lot_step=1.0, min_qty=0.0,
+                   min_notional=0.0, fee_rate=0.0, cash_buffer=0.0, allow_short=False):
+    """목표 비중 -> 거래소에 낼 수 있는 주문 수량.
+
+    모든 인자는 symbols와 같은 길이의 배열(또는 스칼라). 목표 수량은 lot_step 단위로 내리고,
+    min_qty/min_notional 미만 주문은 버린다. 목표가 0이면 보유 수량을 lot_step 단위로 내려 정리한다 (자투리는 남음).
+    cash를 주면 매도 대금(수수료 제외)을 더한 금액 안에서 매수 수량을 비율대로 줄인다 (선물 등은 None).
+    매도 먼저, 그 다음 매수 순서의 DataFrame(PLAN_COLS, index=symbol) 반환. 주문이 없는 종목은 제외
+    """
+    symbols = np.asarray(symbols, dtype=object)
+    cur_qty = np.asarray(cur_qty, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    lot_step = np.broadcast_to(np.asarray(lot_step, dtype=np.float64), price.shape)
+    min_qty = np.broadcast_to(np.asarray(min_qty, dtype=np.float64), price.shape)
+    min_notional = np.broadcast_to(np.asarray(min_notional, dtype=np.float64), price.shape)
+    if not allow_short and (weights < 0).any():
+        raise ValueError('negative target weight without allow_short')
+
+    valid = np.isfinite(price) & (price > 0)  # 가격이 없는 종목은 주문하지 않음
+    safe_price = np.where(valid, price, 1.0)
+    target_qty = round_step(weights * equity * (1 - cash_buffer) / safe_price, lot_step)
+    delta = np.where(target_qty == 0, round_step(-cur_qty, lot_step), round_step(target_qty - cur_qty, lot_step))
+    delta = np.where(valid, _filter_small(delta, safe_price, min_qty, min_notional), 0.0)
+
+    if cash is not None:
+        sells, buys = delta < 0, delta > 0
+        budget = cash + float(np.sum(-delta[sells] * price[sells])) * (1 - fee_rate)
+        cost = float(np.sum(delta[buys] * price[buys])) * (1 + fee_rate)
+        if cost > budget:
+            scale = max(budget, 0.0) / cost
+            scaled = _filter_small(round_step(delta * scale, lot_step), safe_price, min_qty, min_notional)
+            delta = np.where(buys, scaled, delta)
+
+    notional = np.abs(delta) * np.where(valid, price, 0.0)
+    # 매도 먼저, 같은 방향 안에서는 금액이 큰 순서
+    order = np.lexsort((-notional, delta > 0))
+    order = order[delta[order] != 0]
+    return pd.DataFrame({
+        'cur_qty': cur_qty[order], 'target_qty': (cur_qty + delta)[order], 'order_qty': delta[order],
+        'price': price[order], 'notional': notional[order],
+    }, index=pd.Index(symbols[order], name='symbol'), columns=PLAN_COLS)
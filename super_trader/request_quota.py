@@ -0,0 +1,90 @@
+import heapq
+import itertools
+import threading
+import time
+
+from .metrics import REGISTRY
+from .rate_limit import WindowLimiter
+
+TRADE = 'trade'  # 주문 및 계좌 조회 TR
+QUOTE = 'quote'  # 시세 조회 TR
+
+PRIORITY_ORDER = 0
+PRIORITY_LOOKUP = 1
+
+LIMIT_EXCEEDED = 4  # BlockRequest 반환값: 요청 제한 초과
+WINDOW_MARGIN = 0.1  # 요청이 서버에 닿는 지연 여유(초)
+
+
+class QuotaScheduler:
+    """TR 요청 제한 스케줄러.
+
+    요청 종류(kind)별 sliding window로 제한하고, 같은 종류 안에서는 우선순위(작을수록 먼저) 순으로 처리한다.
+    COM 객체는 호출한 스레드에서 그대로 실행된다.
+    """
+
+    def __init__(self, limits=None, remain_time=None, max_retries=5):
+        # kind: (요청 수, 기간(초))
+        limits = limits or {TRADE: (20, 15), QUOTE: (60, 15)}
+        self.buckets = {kind: WindowLimiter(cnt, period, WINDOW_MARGIN) for kind, (cnt, period) in limits.items()}
+        self.queues = {kind: [] for kind in limits}
+        self.remain_time = remain_time  # () -> 남은 제한 시간(ms)
+        self.max_retries = max_retries
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.started = time.monotonic()
+        self.metrics = {kind: {'requests': 0, 'retries': 0, 'wait_sec': 0.0, 'max_wait_sec': 0.0}
+                        for kind in limits}
+
+    def _wait_turn(self, kind, priority):
+        bucket = self.buckets[kind]
+        queue = self.queues[kind]
+        entry = (priority, next(self.seq))
+        with self.cond:
+            heapq.heappush(queue, entry)
+            self.cond.notify_all()
+            while True:
+                if queue[0] == entry:
+                    wait = bucket.try_acquire()
+                    if wait == 0.0:
+                        heapq.heappop(queue)
+                        self.cond.notify_all()
+                        return
+                    self.cond.wait(wait)
+                else:
+                    self.cond.wait()
+
+    def request(self, kind, block_request, priority=PRIORITY_LOOKUP):
+        """순서가 오면 block_request()를 실행하고 반환값을 돌려준다. 제한 초과(4)면 대기 후 다시 순서를 받아 재시도"""
+        start = time.monotonic()
+        self._wait_turn(kind, priority)
+        metric = self.metrics[kind]
+        REGISTRY.histogram('quota_wait', kind).record(int((time.monotonic() - start) * 1e9))
+        request_hist = REGISTRY.histogram('block_request', kind)
+        t0 = time.perf_counter_ns()
+        rq = block_request()
+        request_hist.record(time.perf_counter_ns() - t0)
+        retries = 0
+        while rq == LIMIT_EXCEEDED and retries < self.max_retries:
+            retries += 1
+            REGISTRY.counter('quota_retries', kind).inc()
+            remain_ms = self.remain_time() if self.remain_time is not None else 1000
+            time.sleep(remain_ms / 1000)
+            self._wait_turn(kind, priority)  # 재시도도 서버에는 한 번의 요청이므로 창에서 한 칸을 씀
+            t0 = time.perf_counter_ns()
+            rq = block_request()
+            request_hist.record(time.perf_counter_ns() - t0)
+
+        waited = time.monotonic() - start
+        with self.cond:
+            metric['requests'] += 1
+            metric['retries'] += retries
+            metric['wait_sec'] += waited
+            metric['max_wait_sec'] = max(metric['max_wait_sec'], waited)
+        return rq
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started
+        with self.cond:
+            return {kind: dict(m, per_sec=m['requests'] / elapsed if elapsed else 0.0)
+                    for kind, m in self.metrics.items()}
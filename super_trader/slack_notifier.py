@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from datetime import datetime as dt
+
+import requests
+
+from .metrics import REGISTRY
+
+SLACK_URL = 'https://slack.com/api/chat.postMessage'
+
+
+class SlackNotifier:
+    """슬랙 전송 스레드.
+
+    크기가 제한된 큐에 메시지를 쌓고, batch_window 안에 들어온 메시지는 하나로 합쳐 전송한다.
+    큐가 가득 차면 policy에 따라 가장 오래된 메시지('drop_oldest') 또는 새 메시지('drop_new')를 버린다.
+    429는 Retry-After만큼, 연결 오류와 5xx는 backoff * 2^시도 초만큼 기다린 뒤 재시도한다.
+    """
+
+    def __init__(self, token, channel, url=SLACK_URL, maxsize=1000, policy='drop_oldest',
+                 batch_window=0.5, max_batch=50, timeout=5.0, max_retries=3, backoff=1.0, log=None):
+        self.token = token
+        self.channel = channel
+        self.url = url
+        self.policy = policy
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.log = log
+        self.dropped = 0
+
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": "Bearer " + self.token})
+        self.closed = False
+        self.th = threading.Thread(target=self._run, daemon=True)
+        self.th.start()
+
+    def put(self, msg):
+        cur_time = dt.now().strftime('%Y-%m-%d %H:%M:%S')
+        item = f'[{cur_time}] {msg}'
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                self.dropped += 1
+                REGISTRY.counter('slack_dropped').inc()
+                if self.policy == 'drop_new':
+                    return False
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remain = deadline - time.monotonic()
+                if remain <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remain)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._post('\n'.join(batch))
+                    return
+                batch.append(item)
+            self._post('\n'.join(batch))
+
+    def _post(self, text):
+        post_hist = REGISTRY.histogram('slack_post')
+        for attempt in range(self.max_retries + 1):
+            t0 = time.perf_counter_ns()
+            try:
+                res = self.session.post(self.url, data={"channel": self.channel, "text": text},
+                                        timeout=self.timeout)
+                post_hist.record(time.perf_counter_ns() - t0)
+            except requests.RequestException as e:
+                wait = self.backoff * 2 ** attempt
+                err = str(e)
+            else:
+                if res.status_code == 429:
+                    wait = float(res.headers.get('Retry-After', 1))
+                    err = 'rate limited (429)'
+                    REGISTRY.counter('slack_rate_limited').inc()
+                elif res.status_code >= 500:
+                    wait = self.backoff * 2 ** attempt
+                    err = f'server error ({res.status_code})'
+                else:
+                    return True
+            if attempt < self.max_retries:
+                time.sleep(wait)
+        if self.log is not None:
+            self.log(f'Slack message sending failed ({err}). Please check info_slack.', log_level='warning')
+        return False
+
+    def close(self, timeout=10.0):
+        """남은 메시지를 전송하고 스레드 종료"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.queue.put(None, timeout=timeout)  # 큐에 자리가 나면 남은 메시지를 모두 보냄
+        except queue.Full:
+            while True:  # 전송이 멈춰 있으면 오래된 메시지를 버리고 종료 신호를 넣음
+                try:
+                    self.queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+        self.th.join(timeout)
+        self.session.close()
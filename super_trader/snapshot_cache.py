@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+class SnapshotCache:
+    """load()로 받은 전체 스냅샷을 ttl초 동안 재사용. 주문 뒤에는 invalidate()로 다음 조회를 새로 받게 함"""
+
+    def __init__(self, load, ttl=1.0):
+        self.load = load
+        self.ttl = ttl
+        self.cur = None
+        self.updated = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            if self.updated is not None and time.monotonic() - self.updated < self.ttl:
+                self.hits += 1
+                return self.cur
+            self.misses += 1
+            self.cur = self.load()
+            self.updated = time.monotonic()
+            return self.cur
+
+    def invalidate(self):
+        with self.lock:
+            self.updated = None
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
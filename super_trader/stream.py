@@ -0,0 +1,78 @@
+import json
+import queue
+import threading
+from abc import ABCMeta, abstractmethod
+
+
+class StreamTransport(metaclass=ABCMeta):
+    """푸시 메시지 수신 통로 (user-data stream, market-data stream 등)"""
+
+    @abstractmethod
+    def start(self, on_message):
+        """수신한 메시지(dict)마다 on_message(msg) 호출"""
+        pass
+
+    @abstractmethod
+    def stop(self):
+        pass
+
+
+class QueueTransport(StreamTransport):
+    """로컬 큐 기반 transport. put()으로 넣은 메시지를 그대로 전달 (테스트/리플레이용)"""
+
+    def __init__(self):
+        self.q = queue.Queue()
+        self.th = None
+        self.running = False
+
+    def put(self, msg):
+        self.q.put(msg)
+
+    def start(self, on_message):
+        self.running = True
+        self.th = threading.Thread(target=self._run, args=(on_message,), daemon=True)
+        self.th.start()
+
+    def _run(self, on_message):
+        while self.running:
+            try:
+                msg = self.q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            on_message(msg)
+
+    def stop(self):
+        self.running = False
+
+
+class WebSocketTransport(StreamTransport):
+    """websocket-client 기반 transport. url은 로컬 stand-in 서버로 바꿀 수 있음"""
+
+    def __init__(self, url, reconnect_delay=1.0):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.ws = None
+        self.th = None
+        self.running = False
+
+    def start(self, on_message):
+        import websocket  # optional dependency: websocket-client
+
+        def _on_message(ws, raw):
+            on_message(json.loads(raw))
+
+        def _run():
+            while self.running:
+                self.ws = websocket.WebSocketApp(self.url, on_message=_on_message)
+                self.ws.run_forever()
+                if self.running:
+                    threading.Event().wait(self.reconnect_delay)
+
+        self.running = True
+        self.th = threading.Thread(target=_run, daemon=True)
+        self.th.start()
+
+    def stop(self):
+        self.running = False
+        if self.ws is not None:
+            self.ws.close()
@@ -1,15 +1,27 @@
-import json
+import os
 import sys
-import threading
 from datetime import datetime as dt
-from queue import Queue
 from abc import ABCMeta, abstractmethod
 
-import requests
+import numpy as np
 from sl4p import *
 
+from .async_log import binlog_name, shared_logger
+from .config import get_config
+from .metrics import REGISTRY, instrument_class
+from .rebalance import plan_rebalance
+from .slack_notifier import SlackNotifier
+from .trading_calendar import krx_calendar
+
 
 class SuperTrader(metaclass=ABCMeta):
+    fee_rate = 0.0  # rebalance 매수 가능 금액 계산용 수수료율
+
+    def __init_subclass__(cls, **kwargs):
+        """하위 클래스(브로커)의 public 메서드는 자동으로 지연시간/에러 수 계측"""
+        super().__init_subclass__(**kwargs)
+        instrument_class(cls)
+
     def __init__(self):
         self.log = self.get_logger()
         self.set_slack()
@@ -33,73 +45,66 @@ class SuperTrader(metaclass=ABCMeta):
         logger = sl4p.getLogger(__file__, cfg=log_cfg)
         logger.info("Start Trading with SL4P Logging!")
 
-        log = dict()
-        log['debug'] = logger.debug
-        log['info'] = logger.info
-        log['warning'] = logger.warning
-        log['error'] = logger.error
-        log['critical'] = logger.critical
-        return log
+        sinks = dict()
+        sinks['debug'] = logger.debug
+        sinks['info'] = logger.info
+        sinks['warning'] = logger.warning
+        sinks['error'] = logger.error
+        sinks['critical'] = logger.critical
+        # 포맷팅과 파일 쓰기는 백그라운드 스레드에서 처리. 같은 binlog를 쓰는 trader끼리는 logger를 공유
+        os.makedirs('logs', exist_ok=True)
+        binlog_path = os.path.join('logs', binlog_name(dt.now().strftime('%Y%m%d')))
+        return shared_logger(sinks, binlog_path)
     
     def set_slack(self):
-        with open('config.json', 'r') as json_file:
-            _config = json.load(json_file)
-        slack_info = _config['slack']
-        self.token = slack_info['token']
-        self.channel = slack_info['channel']
-
-        self.slack_queue = Queue()
-        self.evt = threading.Event()
-        self.slack_th = threading.Thread(target=self.slack_sender, daemon=True)
-        self.slack_th.start()
+        slack_info = get_config().require('slack')
+        self.token = slack_info.token
+        self.channel = slack_info.channel
+
+        self.notifier = SlackNotifier(self.token, self.channel, log=self.send_msg)
         self.send_msg('set_slack...OK')
         return True
 
-    def send_msg(self, msg, log_level='info', slack=False):
-        self.log[log_level](msg)
-        if slack:
-            self.slack_queue.put(msg)
-            self.evt.set()
-
-    def slack_sender(self):
-        self.evt.wait()
-        while True:
-            msg = self.slack_queue.get(timeout=1)
-            self.send_slack(msg)
-            if self.slack_queue.empty():
-                self.evt.clear()
-                self.evt.wait()
-
-    def send_slack(self, msg):
-        cur_time = dt.now().strftime('%Y-%m-%d %H:%M:%S')
-        try:
-            slack_res = requests.post(
-                url="https://slack.com/api/chat.postMessage",
-                headers={"Authorization": "Bearer " + self.token},
-                data={"channel": self.channel, "text": f'[{cur_time}] {msg}'}
-            )
-        except:
-            msg = 'Slack message sending failed. Please check info_slack.'
-            self.send_msg(msg, log_level='warning', slack=False)
+    def send_msg(self, msg, *args, log_level='info', slack=False):
+        """args가 있으면 msg.format(*args)를 로그 스레드에서 지연 포맷팅"""
+        self.log.log(log_level, msg, args)
+        if slack and self.notifier is not None:
+            self.notifier.put(msg.format(*args) if args else msg)
 
     def exit_system(self):
         self.send_msg('Exit the program.', log_level='info', slack=True)
-        del self.slack_th
+        journal = getattr(self, 'journal', None)
+        if journal is not None:
+            journal.close()
+        self.log.flush()
+        if self.notifier is not None:
+            self.notifier.close()
         sys.exit(0)
         
+    def export_metrics(self, path='metrics.prom'):
+        """지연시간/호출/에러/rate-limit 지표를 Prometheus text 형식으로 저장"""
+        REGISTRY.write_prometheus(path)
+        return path
+
+    def serve_metrics(self, port=9108):
+        """http://127.0.0.1:{port}/metrics 로 지표 제공"""
+        return REGISTRY.serve(port)
+
+    def get_calendar(self):
+        """거래소 영업일 캘린더 (기본: KRX)"""
+        return krx_calendar(get_config().holidays)
+
+    @property
+    def calendar(self):
+        """get_calendar() 결과. config.json이 다시 읽히면(휴일 변경) 새로 만든다"""
+        config = get_config()
+        if getattr(self, '_calendar_config', None) is not config:
+            self._calendar = self.get_calendar()
+            self._calendar_config = config
+        return self._calendar
+
     def check_market_open(self):
-        today = dt.now()
-        is_weekend = today.weekday() in [5, 6]
-        
-        year = str(today.year)
-        with open("config.json", "r") as json_file:
-            _config = json.load(json_file)
-        holidays = _config['holiday']    
-        this_year_holidays = holidays[year]
-        today = int(today.strftime('%Y%m%d'))
-        is_holiday = today in this_year_holidays
-        
-        if is_weekend or is_holiday:
+        if not self.calendar.is_session(dt.now().date()):
             self.send_msg('Today is Closed day.')
             self.exit_system()
         else:
@@ -135,4 +140,26 @@ class SuperTrader(metaclass=ABCMeta):
     
     def sell_all(self):
         """보유 종목 전량 매도"""
-        pass
\ No newline at end of file
+        pass
+
+    def rebalance(self, target_weights, cash_buffer=0.0, dry_run=False, **order_opts):
+        """target_weights {code: 총자산 대비 비중}에 맞춰 주문. 목표에 없는 보유 종목은 전량 정리.
+
+        잔고와 가격은 한 번만 조회하고 주문 수량은 plan_rebalance로 한꺼번에 계산한 뒤 매도 -> 매수 순으로 보낸다.
+        order_opts는 send_rebalance_orders로 전달. (plan DataFrame, 주문 결과) 반환. dry_run이면 주문 결과는 None
+        """
+        state = self.get_rebalance_state(list(target_weights))
+        weights = np.array([target_weights.get(symbol, 0.0) for symbol in state['symbols']], dtype=np.float64)
+        plan = plan_rebalance(weights=weights, fee_rate=self.fee_rate, cash_buffer=cash_buffer, **state)
+        self.send_msg('rebalance -> {} orders ({} sells)', len(plan), int((plan['order_qty'] < 0).sum()))
+        if dry_run:
+            return plan, None
+        return plan, self.send_rebalance_orders(plan, **order_opts)
+
+    def get_rebalance_state(self, codes):
+        """plan_rebalance 인자 dict (symbols, cur_qty, price, equity, cash, lot_step, ...). 보유 종목 포함"""
+        pass
+
+    def send_rebalance_orders(self, plan):
+        """plan의 order_qty(음수 매도)를 매도 먼저 전송하고 종목별 결과 반환"""
+        pass
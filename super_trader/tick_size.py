@@ -0,0 +1,63 @@
+import datetime
+
+import numpy as np
+
+# KRX 호가가격단위: (시행일, {시장: (가격대 경계, 호가단위)})
+KRX_TICK_HISTORY = [
+    (20100101, {
+        'KOSPI': ([1000, 5000, 10000, 50000, 100000, 500000], [1, 5, 10, 50, 100, 500, 1000]),
+        'KOSDAQ': ([1000, 5000, 10000, 50000], [1, 5, 10, 50, 100]),
+    }),
+    (20230125, {
+        'KOSPI': ([2000, 5000, 20000, 50000, 200000, 500000], [1, 5, 10, 50, 100, 500, 1000]),
+        'KOSDAQ': ([2000, 5000, 20000, 50000, 200000, 500000], [1, 5, 10, 50, 100, 500, 1000]),
+    }),
+]
+
+_tables = {}
+
+
+class TickSizeTable:
+    def __init__(self, edges, units):
+        self.edges = np.asarray(edges, dtype=np.int64)
+        self.units = np.asarray(units, dtype=np.int64)
+
+    def unit(self, prices, up=True):
+        """가격별 호가단위. up=False면 한 호가 아래로 내려갈 때의 단위(경계가격은 아래 구간 단위)"""
+        side = 'right' if up else 'left'
+        return self.units[np.searchsorted(self.edges, prices, side=side)]
+
+    def shift(self, prices, tic):
+        """prices를 tic 호가만큼 이동 (tic < 0 이면 아래로)"""
+        prices = np.asarray(prices, dtype=np.int64).copy()
+        up = tic > 0
+        for _ in range(abs(tic)):
+            step = self.unit(prices, up=up)
+            prices += step if up else -step
+        return prices
+
+    def validate(self, cpStockCode, code):
+        """COM GetPriceUnit과 경계 가격에서 비교. 불일치 목록 [(price, up, table, com)] 반환"""
+        mismatches = []
+        for edge in self.edges:
+            for price in (int(edge) - 1, int(edge)):
+                for up in (True, False):
+                    table_unit = int(self.unit([price], up=up)[0])
+                    com_unit = cpStockCode.GetPriceUnit(code, price, up)
+                    if table_unit != com_unit:
+                        mismatches.append((price, up, table_unit, com_unit))
+        return mismatches
+
+
+def get_tick_table(market='KOSPI', date=None):
+    """date(YYYYMMDD, 기본 오늘) 기준 호가단위 테이블. 시장/일자별로 한 번만 생성"""
+    if date is None:
+        date = int(datetime.date.today().strftime('%Y%m%d'))
+    key = (market, date)
+    if key not in _tables:
+        bands = None
+        for start, tables in KRX_TICK_HISTORY:
+            if date >= start:
+                bands = tables[market]
+        _tables[key] = TickSizeTable(*bands)
+    return _tables[key]
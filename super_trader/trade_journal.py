@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+ORDER, FILL = 0, 1
+BUY, SELL = 1, -1
+
+JOURNAL_DTYPE = np.dtype([
+    ('ts', '<i8'),  # epoch ns
+    ('broker', 'S8'),
+    ('kind', 'u1'),  # 0: 주문, 1: 체결
+    ('side', 'i1'),  # 1: 매수, -1: 매도
+    ('symbol', 'S24'),
+    ('order_id', 'S32'),
+    ('qty', '<f8'),
+    ('price', '<f8'),  # 0: 시장가
+    ('exec_qty', '<f8'),
+    ('exec_price', '<f8'),
+])
+
+
+class TradeJournal:
+    """주문/체결 기록을 고정 길이 레코드로 일별 파일(YYYYMMDD.bin)에 append.
+
+    record()는 큐에 넣기만 하고, 파일 쓰기는 백그라운드 스레드가 모아서 처리한다.
+    한 root에는 writer가 하나여야 하므로 trader들은 shared_journal()로 받아 쓴다.
+    """
+
+    def __init__(self, root='journal', flush_interval=0.2, log=None):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.log = log
+        self.errors = 0
+        self.users = 1
+        self.lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self.utc_offset_ns = time.localtime().tm_gmtoff * 10**9  # 파일은 현지 날짜 기준
+        self.queue = queue.Queue()
+        self.day = None
+        self.file = None
+        self.th = threading.Thread(target=self._run, daemon=True)
+        self.th.start()
+
+    def record(self, broker, kind, side, symbol, qty, price=0.0, order_id='',
+               exec_qty=0.0, exec_price=0.0, ts=None):
+        ts = time.time_ns() if ts is None else ts
+        self.queue.put((ts, broker, kind, side, symbol, str(order_id), qty, price, exec_qty, exec_price))
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            time.sleep(self.flush_interval)
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in items
+            try:
+                self._write([item for item in items if item is not None])
+            except Exception as e:  # 기록 스레드가 죽으면 flush()가 영원히 기다림
+                self.errors += 1
+                self._reopen()
+                if self.log is not None:
+                    self.log(f'trade journal write failed, {len(items) - closing} records lost ({e})',
+                             log_level='error')
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+            if closing:
+                return
+
+    def _reopen(self):
+        """쓰기 실패 후 다음 기록 때 파일을 다시 열도록"""
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+        self.file = None
+        self.day = None
+
+    def _write(self, items):
+        if not items:
+            return
+        records = np.array(items, dtype=JOURNAL_DTYPE)
+        days = (records['ts'] + self.utc_offset_ns).astype('datetime64[ns]').astype('datetime64[D]').astype(str)
+        for day in np.unique(days):
+            if day != self.day:  # 일별 rollover
+                if self.file is not None:
+                    self.file.close()
+                self.day = day
+                self.file = open(os.path.join(self.root, day.replace('-', '') + '.bin'), 'ab')
+            self.file.write(records[days == day].tobytes())
+        self.file.flush()
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        """shared_journal로 여럿이 쓰는 경우 마지막 사용자가 닫을 때 기록 스레드를 끝냄"""
+        with self.lock:
+            self.users -= 1
+            if self.users > 0:
+                self.flush()
+                return
+            if not self.th.is_alive():
+                return
+            self.queue.put(None)
+            self.th.join()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_journal(root='journal', **kwargs):
+    """root별로 프로세스에 하나인 TradeJournal.
+
+    Binance/Creon trader가 한 프로세스에서 같은 일별 파일에 따로 append하면 레코드가 섞일 수 있다.
+    """
+    key = os.path.abspath(root)
+    with _SHARED_LOCK:
+        journal = _SHARED.get(key)
+        if journal is None or not journal.th.is_alive():
+            journal = _SHARED[key] = TradeJournal(root, **kwargs)
+        else:
+            with journal.lock:
+                journal.users += 1
+        return journal
+
+
+def load_journal(root='journal', start=None, end=None):
+    """start ~ end(YYYYMMDD, 포함) 일별 파일을 memory-map으로 읽어 하나의 배열로 반환"""
+    files = sorted(f for f in os.listdir(root) if f.endswith('.bin'))
+    parts = []
+    for f in files:
+        day = int(f[:8])
+        if (start is not None and day < int(start)) or (end is not None and day > int(end)):
+            continue
+        path = os.path.join(root, f)
+        n = os.path.getsize(path) // JOURNAL_DTYPE.itemsize  # 쓰다 만 레코드는 무시
+        if n:
+            parts.append(np.memmap(path, dtype=JOURNAL_DTYPE, mode='r', shape=(n,)))
+    if not parts:
+        return np.empty(0, dtype=JOURNAL_DTYPE)
+    return np.concatenate(parts)
+
+
+def journal_to_frame(records):
+    df = pd.DataFrame({name: records[name] for name in JOURNAL_DTYPE.names})
+    for col in ('broker', 'symbol', 'order_id'):
+        df[col] = df[col].str.decode('utf-8')
+    df['ts'] = pd.to_datetime(df['ts'], unit='ns')
+    return df
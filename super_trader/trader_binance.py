@@ -1,24 +1,58 @@
-import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import ccxt
+import numpy as np
 
-from super_trader import SuperTrader
+from .config import get_config
+from .market_cache import load_markets_cached
+from .market_data import MarketDataCache, market_data_url, to_levels
+from .ohlcv_store import OHLCVStore, to_ms
+from .order_tracker import OrderTracker
+from .position_cache import PositionCache
+from .rate_limit import TokenBucket
+from .stream import WebSocketTransport
+from .super_trader import SuperTrader
+from .trade_journal import BUY, FILL, ORDER, SELL, shared_journal
+from .trading_calendar import crypto_calendar
 
 
 class BinanceTrader(SuperTrader):
-    def __init__(self, is_future=False):
-        super().__init__()
+    info_col = ['time', 'updateTime', 'orderId', 'type', 'side', 'symbol',
+                'price', 'avgPrice', 'origQty', 'executedQty']
+    fee_rate = 0.001
+
+    def __init__(self, is_future=False, transport=None, order_timeout=30.0, position_ttl=1.0,
+                 market_cache_ttl=24 * 60 * 60):
         self.is_future = is_future
-        self.exchange = self.get_binance_broker()
+        self.market_cache_ttl = market_cache_ttl
+        self._exchange = None
+        super().__init__()
         self.send_msg(f'set_binance_broker(is_future={self.is_future})...OK', slack=True)
+        # ccxt의 throttle은 스레드 간 공유되지 않으므로 동시 주문/체결 조회는 이 버킷으로 제한
+        self.rate_limiter = TokenBucket(rate=1000 / self.exchange.rateLimit, capacity=10, name='binance')
+        self.order_tracker = OrderTracker(self.exchange, transport=transport, timeout=order_timeout,
+                                          log=self.send_msg, rate_limiter=self.rate_limiter)
+        self.position_cache = PositionCache(self.exchange.fetch_positions, ttl=position_ttl)
+        self.journal = shared_journal(log=self.send_msg)
+        self.ohlcv_store = OHLCVStore(os.path.join('ohlcv', 'binance_future' if is_future else 'binance'))
+        self.market_data = None
+        self.lot_filters = {}
+
+    @property
+    def exchange(self):
+        """ccxt client는 처음 사용할 때 생성"""
+        if self._exchange is None:
+            self._exchange = self.get_binance_broker()
+        return self._exchange
 
     def get_binance_broker(self):
+        import ccxt  # import에 수백 ms가 걸리므로 처음 사용할 때 로드
         binance_info = self.read_api_key()
         exchange = ccxt.binance(config={
-            'apiKey': binance_info["api_key"],
-            'secret': binance_info["secret"],
+            'apiKey': binance_info.api_key,
+            'secret': binance_info.secret,
             'enableRateLimit': True,
             'options': {
                 'defaultType': 'future' if self.is_future else 'spot'
@@ -26,73 +60,192 @@ class BinanceTrader(SuperTrader):
         })
         return exchange
 
-    def check_market_open(self):
-        self.send_msg('check_market_open...OK', slack=True)  # The binance market is always open.
+    def get_calendar(self):
+        return crypto_calendar()  # The binance market is always open.
+
+    def warm_up(self):
+        """첫 주문 전에 market 정보를 로드 (디스크 캐시 우선)"""
+        start = time.perf_counter()
+        market_type = 'future' if self.is_future else 'spot'
+        path = os.path.join('.cache', f'binance_{market_type}_markets.json')
+        source = load_markets_cached(self.exchange, path, ttl=self.market_cache_ttl)
+        self.send_msg(f'warm_up(markets from {source}, {time.perf_counter() - start:.2f}s)...OK')
         return True
 
     def check_system(self):
         try:
-            ccxt.binance().fetch_ticker('BTC/USDT')
+            self.warm_up()
+            self.exchange.fetch_ticker('BTC/USDT')
             self.send_msg('check_system...OK', slack=True)
             return True
         except Exception as e:
             self.send_msg('check_system...FAILED', log_level='warning', slack=True)
             raise Exception(str(e))
 
+    def start_market_data(self, symbols, transport=None, max_age=5.0):
+        """symbols의 ticker/호가를 stream으로 받아 메모리에 유지. transport를 주면 그걸로 수신 (리플레이 등)"""
+        market_ids = [self.exchange.market_id(symbol) for symbol in symbols]
+        id_to_symbol = dict(zip(market_ids, symbols))
+
+        def fetch_snapshot(market_id):
+            self.rate_limiter.acquire()
+            book = self.exchange.fetch_order_book(id_to_symbol[market_id], limit=1000)
+            return book['nonce'], book['bids'], book['asks']
+
+        if transport is None:
+            transport = WebSocketTransport(market_data_url(market_ids, self.is_future))
+        self.market_data_max_age = max_age
+        self.market_data = MarketDataCache(market_ids, fetch_snapshot, transport, log=self.send_msg)
+        self.market_data.start()
+        self.send_msg(f'start_market_data({len(symbols)} symbols)...OK')
+        return True
+
+    def stop_market_data(self):
+        if self.market_data is not None:
+            self.market_data.stop()
+            self.market_data = None
+
     def get_cur_price(self, symbol):
+        """stream 캐시에 최근 가격이 있으면 메모리에서, 없으면 REST로 조회"""
+        if self.market_data is not None:
+            price = self.market_data.get_price(self.exchange.market_id(symbol), self.market_data_max_age)
+            if price is not None:
+                return price
         symbol_price = self.exchange.fetch_ticker(symbol)
         cur_price = symbol_price['last']
         return cur_price
 
+    def get_book(self, symbol, depth=10):
+        """상위 depth 호가 {'bids', 'asks'} ((depth, 2) [price, qty] 배열). stream 동기화 전이면 REST로 조회"""
+        if self.market_data is not None:
+            book = self.market_data.get_book(self.exchange.market_id(symbol), depth)
+            if book is not None:
+                return book
+        limit = next((n for n in (5, 10, 20, 50, 100, 500, 1000) if n >= depth), 1000)  # binance 허용 값
+        book = self.exchange.fetch_order_book(symbol, limit=limit)
+        return {'bids': to_levels(book['bids'][:depth]), 'asks': to_levels(book['asks'][:depth]),
+                'update_id': book['nonce']}
+
+    def get_ohlcv(self, symbol, start, end, timeframe='1d'):
+        """[start, end) OHLCV. 로컬 저장소에 없는 구간만 거래소에서 받음"""
+        bar_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        fetch = lambda s, e: self._fetch_ohlcv_range(symbol, timeframe, s, e, bar_ms)
+        return self.ohlcv_store.get(symbol, timeframe, to_ms(start), to_ms(end), fetch, bar_ms)
+
+    def _fetch_ohlcv_range(self, symbol, timeframe, start_ms, end_ms, bar_ms, limit=1000):
+        rows = []
+        since = start_ms
+        while since < end_ms:
+            batch = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            if not batch:
+                break
+            rows.extend(row for row in batch if row[0] < end_ms)
+            since = batch[-1][0] + bar_ms
+        return rows
+
     def get_total_usdt(self):
         balance = self.exchange.fetch_balance(params={'type': 'future' if self.is_future else 'spot'})
         balance_usdt = balance['USDT']
         total_usdt = balance_usdt['total']
         return float(total_usdt)
 
+    def get_position(self, symbol):
+        """전체 포지션 스냅샷(캐시)에서 symbol 포지션 조회. 없으면 None"""
+        return self.position_cache.get(self.exchange.market_id(symbol))
+
     def get_holding_position(self, symbol):
-        positions = self.exchange.fetch_positions(symbols=[symbol])
-        amount = positions[0]['info']['positionAmt']  # 추후 여러 자산 투자 시 변경
-        return float(amount)
+        position = self.get_position(symbol)
+        if position is None:
+            return 0.0
+        return float(position['info']['positionAmt'])
 
     def get_unrealized_profit(self, symbol):
-        positions = self.exchange.fetch_positions(symbols=[symbol])
-        unrealized_profit = positions[0]['info']['unRealizedProfit']
-        return float(unrealized_profit)
+        position = self.get_position(symbol)
+        if position is None:
+            return 0.0
+        return float(position['info']['unRealizedProfit'])
 
     def send_market_order(self, symbol, qty):
+        return self._send_market_order(symbol, qty)[0]
+
+    def _send_market_order(self, symbol, qty):
+        """(order_id, 전송 직전 perf_counter_ns) 반환"""
         side = 'buy' if qty > 0 else 'sell'
         qty = abs(qty)
-        self.send_msg(f'send_market_order -> symbol: {symbol}, side: {side}, qty: {qty}')
+        self.send_msg('send_market_order -> symbol: {}, side: {}, qty: {}', symbol, side, qty)
+        self.rate_limiter.acquire()
+        sent_ns = time.perf_counter_ns()
         order = self.exchange.create_order(
             symbol=symbol,
             type='market',
             side=side,
             amount=qty
         )
-        return order['id']
+        self.position_cache.invalidate()
+        self.journal.record('binance', ORDER, BUY if side == 'buy' else SELL, symbol, qty, order_id=order['id'])
+        return order['id'], sent_ns
+
+    def track_order(self, symbol, order_id, timeout=None, sent_ns=None):
+        """체결 시 order info를 결과로 갖는 Future 반환"""
+        return self.order_tracker.track(symbol, order_id, timeout, sent_ns)
+
+    def check_order_completion(self, symbol, order_id, timeout=None, sent_ns=None):
+        order_info = self.track_order(symbol, order_id, timeout, sent_ns).result()
+        self.send_msg('check_order_completion...OK')
+        return order_info
+
+    def execute_order(self, symbol, qty):
+        order_id, sent_ns = self._send_market_order(symbol, qty)
+        order_info = self.check_order_completion(symbol, order_id, sent_ns=sent_ns)
+        self.position_cache.invalidate()
+        self.journal_fill(order_info)
+
+        info_lst = [order_info[col] for col in self.info_col]
+        self.send_msg('execute_order: {}', info_lst)
+        return info_lst
+
+    def execute_orders(self, orders, max_workers=8, timeout=None):
+        """{symbol: qty} 주문을 동시에 전송/체결 확인.
 
-    def check_order_completion(self, symbol, order_id):
-        while True:
+        symbol별 {'ok', 'info', 'error'} 반환. 일부 주문이 실패해도 나머지 결과는 그대로 반환한다.
+        """
+        orders = {symbol: qty for symbol, qty in orders.items() if qty != 0}
+        self.send_msg('execute_orders -> {} symbols', len(orders))
+
+        def _send_and_track(symbol, qty):
+            order_id, sent_ns = self._send_market_order(symbol, qty)
+            return self.track_order(symbol, order_id, timeout, sent_ns)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            sent = {symbol: pool.submit(_send_and_track, symbol, qty) for symbol, qty in orders.items()}
+
+        results = {}
+        for symbol, fut in sent.items():
             try:
-                order = self.exchange.fetchOrder(symbol=symbol, id=order_id)
+                order_info = fut.result().result()
             except Exception as e:
-                self.send_msg(str(e), log_level='error')
+                self.send_msg('execute_orders: {} failed -> {}', symbol, e, log_level='error')
+                results[symbol] = {'ok': False, 'info': None, 'error': str(e)}
             else:
-                if order['info']['status'] == 'FILLED':
-                    self.send_msg(f'check_order_completion...OK')
-                    return order['info']
-            time.sleep(0.01)
+                self.journal_fill(order_info)
+                info_lst = [order_info[col] for col in self.info_col]
+                self.send_msg('execute_order: {}', info_lst)
+                results[symbol] = {'ok': True, 'info': info_lst, 'error': None}
+        self.position_cache.invalidate()
 
-    def execute_order(self, symbol, qty):
-        order_id = self.send_market_order(symbol, qty)
-        order_info = self.check_order_completion(symbol, order_id)
+        failed = [symbol for symbol, res in results.items() if not res['ok']]
+        if failed:
+            self.send_msg(f'execute_orders...PARTIAL FAILED: {failed}', log_level='warning', slack=True)
+        else:
+            self.send_msg('execute_orders...OK')
+        return results
 
-        info_col = ['time', 'updateTime', 'orderId', 'type', 'side', 'symbol',
-                    'price', 'avgPrice', 'origQty', 'executedQty']
-        info_lst = [order_info[col] for col in info_col]
-        self.send_msg(f'execute_order: {info_lst}')
-        return info_lst
+    def journal_fill(self, order_info):
+        self.journal.record(
+            'binance', FILL, BUY if order_info['side'] == 'BUY' else SELL, order_info['symbol'],
+            float(order_info['origQty']), float(order_info['price']), order_info['orderId'],
+            float(order_info['executedQty']), float(order_info['avgPrice']),
+            ts=int(order_info['updateTime']) * 10**6)
 
     def end_all_position(self, symbol):
         prev_qty = self.get_holding_position(symbol)
@@ -102,10 +255,16 @@ class BinanceTrader(SuperTrader):
             self.send_msg(f'end_all_position...OK')
         return True
 
+    def end_all_positions(self, symbols, max_workers=8):
+        orders = {symbol: -self.get_holding_position(symbol) for symbol in symbols}
+        self.send_msg(f'end_all_positions -> {orders}')
+        return self.execute_orders(orders, max_workers=max_workers)
+
     def cancel_open_order(self, symbol, order_id=None, all_order=False):
         self.send_msg(
             f"cancel_open_order -> {'all_order: ' + str(all_order) if all_order else 'order_id: ' + order_id}",
             slack=True)
+        self.position_cache.invalidate()
         if all_order:
             resp = self.exchange.cancel_all_orders(symbol=symbol)
             if resp['code'] == '200':
@@ -118,13 +277,15 @@ class BinanceTrader(SuperTrader):
     def set_leverage(self, symbol, leverage):
         self.send_msg(f"set_leverage -> symbol: {symbol}, leverage: {leverage}")
         self.exchange.set_leverage(leverage, symbol)
+        self.position_cache.invalidate()
         self.send_msg("set_leverage...OK")
         return True
 
     def get_leverage(self, symbol):
-        positions = self.exchange.fetch_positions(symbols=[symbol])
-        leverage = positions[0]['leverage']
-        return leverage
+        position = self.get_position(symbol)
+        if position is None:
+            return None
+        return position['leverage']
 
     def set_margin_mode(self, symbol, margin_mode):
         self.send_msg(f"set_margin_mode -> symbol: {symbol}, margin_mode: {margin_mode}")
@@ -136,20 +297,108 @@ class BinanceTrader(SuperTrader):
             self.send_msg(f"margin_mode is already {margin_mode}")
             return False
 
-    @staticmethod
-    def read_api_key():
-        config_path = os.path.join(os.getcwd(), "config.json")
-        if os.path.exists(config_path):
-            with open('config.json', 'r') as json_file:
-                _config = json.load(json_file)
-            if 'binance' in _config:
-                binance_info = _config['binance']
-                required_keys = ["api_key", "secret"]
-                if all(key in binance_info for key in required_keys):
-                    return binance_info
-                else:
-                    raise ValueError("binance in config.json must contain 'api_key', and 'secret' key.")
+    def get_user_data_transport(self, keepalive_sec=1800):
+        """user-data stream(listenKey) transport 생성. OrderTracker에 넘겨 체결 푸시를 받는다."""
+        if self.is_future:
+            listen_key = self.exchange.fapiPrivatePostListenKey()['listenKey']
+            url = f'wss://fstream.binance.com/ws/{listen_key}'
+            keepalive = lambda: self.exchange.fapiPrivatePutListenKey()
+        else:
+            listen_key = self.exchange.publicPostUserDataStream()['listenKey']
+            url = f'wss://stream.binance.com:9443/ws/{listen_key}'
+            keepalive = lambda: self.exchange.publicPutUserDataStream({'listenKey': listen_key})
+
+        def _keepalive():
+            while True:
+                threading.Event().wait(keepalive_sec)
+                try:
+                    keepalive()
+                except Exception as e:
+                    self.send_msg(f'listenKey keepalive failed: {e}', log_level='warning')
+
+        threading.Thread(target=_keepalive, daemon=True).start()
+        return WebSocketTransport(url)
+
+    def start_user_stream(self):
+        transport = self.get_user_data_transport()
+        self.order_tracker.transport = transport
+        self.order_tracker.poll_interval = 0.5
+        transport.start(self.order_tracker.on_report)
+        self.send_msg('start_user_stream...OK', slack=True)
+        return True
+
+    def get_prices(self, symbols):
+        """여러 symbol의 현재가 배열. stream 캐시에 없는 것만 fetch_tickers 한 번으로 조회"""
+        prices = np.full(len(symbols), np.nan)
+        missing = []
+        for i, symbol in enumerate(symbols):
+            price = None
+            if self.market_data is not None:
+                price = self.market_data.get_price(self.exchange.market_id(symbol), self.market_data_max_age)
+            if price is None:
+                missing.append(i)
             else:
-                raise ValueError("config.json must contain 'binance' key.")
+                prices[i] = price
+        if missing:
+            tickers = self.exchange.fetch_tickers([symbols[i] for i in missing])
+            for i in missing:
+                last = tickers.get(symbols[i], {}).get('last')
+                prices[i] = np.nan if last is None else last
+        return prices
+
+    def get_lot_filter(self, symbol):
+        """(수량 단위, 최소 수량, 최소 주문금액). 시장가 주문 기준 market filter (MARKET_LOT_SIZE 우선)"""
+        if symbol not in self.lot_filters:
+            filters = {f['filterType']: f for f in self.exchange.market(symbol)['info'].get('filters', [])}
+            lot = filters.get('LOT_SIZE', {})
+            market_lot = filters.get('MARKET_LOT_SIZE', {})
+            if float(market_lot.get('stepSize', 0)) > 0:
+                lot = market_lot
+            notional = filters.get('MIN_NOTIONAL') or filters.get('NOTIONAL') or {}
+            min_notional = notional.get('minNotional', notional.get('notional', 0))
+            self.lot_filters[symbol] = (float(lot.get('stepSize', 0)) or 1e-8, float(lot.get('minQty', 0)),
+                                        float(min_notional))
+        return self.lot_filters[symbol]
+
+    def get_rebalance_state(self, symbols):
+        symbols = list(symbols)
+        if self.is_future:
+            # 목표에 없는 보유 포지션도 정리 대상
+            targets = {self.exchange.market_id(symbol) for symbol in symbols}
+            for market_id, position in self.position_cache.snapshot().items():
+                if market_id not in targets and float(position['info']['positionAmt']) != 0:
+                    symbols.append(position['symbol'])
+            cur_qty = np.array([self.get_holding_position(symbol) for symbol in symbols], dtype=np.float64)
+            price = self.get_prices(symbols)
+            equity = self.get_total_usdt()
+            cash = None  # 증거금은 레버리지별로 달라 현금 제약은 적용하지 않음
         else:
-            raise FileNotFoundError("config.json must exist in the path. ")
+            balance = self.exchange.fetch_balance(params={'type': 'spot'})
+            targets = set(symbols)
+            for asset, qty in balance['total'].items():
+                symbol = f'{asset}/USDT'
+                if qty and asset != 'USDT' and symbol in self.exchange.markets and symbol not in targets:
+                    symbols.append(symbol)
+            bases = [self.exchange.market(symbol)['base'] for symbol in symbols]
+            # 미체결 주문에 묶인 수량은 팔 수 없으므로 주문 수량은 free 기준, 평가금액은 total 기준
+            cur_qty = np.array([balance['free'].get(base) or 0.0 for base in bases], dtype=np.float64)
+            total_qty = np.array([balance['total'].get(base) or 0.0 for base in bases], dtype=np.float64)
+            price = self.get_prices(symbols)
+            cash = float(balance['free'].get('USDT') or 0.0)
+            equity = float(balance['total'].get('USDT') or 0.0) + float(np.nansum(total_qty * price))
+        lot_step, min_qty, min_notional = np.array([self.get_lot_filter(symbol) for symbol in symbols]).T
+        return {'symbols': symbols, 'cur_qty': cur_qty, 'price': price, 'equity': equity, 'cash': cash,
+                'lot_step': lot_step, 'min_qty': min_qty, 'min_notional': min_notional,
+                'allow_short': self.is_future}
+
+    def send_rebalance_orders(self, plan):
+        """매도 묶음이 체결된 뒤 매수 묶음 전송 (execute_orders 결과를 합쳐 반환)"""
+        qty = plan['order_qty']
+        results = self.execute_orders(qty[qty < 0].to_dict()) if (qty < 0).any() else {}
+        if (qty > 0).any():
+            results.update(self.execute_orders(qty[qty > 0].to_dict()))
+        return results
+
+    @staticmethod
+    def read_api_key():
+        return get_config().require('binance')
@@ -1,27 +1,45 @@
 import ctypes
-import win32com.client
+import os
 import time
 
 import numpy as np
 import pandas as pd
 
+from .balance_snapshot import BALANCE_FIELDS, BALANCE_HEADER, BalanceCache, BalanceSnapshot
+from .lazy import LazyDispatch
+from .liquidation import CreonConclusionSource, FillWaiter, Liquidator
+from .ohlcv_store import OHLCVStore, to_ms
+from .quote_feed import CreonQuoteSource, QuoteBook
+from .request_quota import (LIMIT_EXCEEDED, PRIORITY_LOOKUP, PRIORITY_ORDER, QUOTE, TRADE,
+                            QuotaScheduler)
 from .super_trader import SuperTrader
+from .tick_size import get_tick_table
+from .trade_journal import BUY, FILL, ORDER, SELL, load_journal, shared_journal
 
 
 class CreonPlusTrader(SuperTrader):
-    cpCybos = win32com.client.Dispatch('CpUtil.CpCybos')
-    cpTdUtil = win32com.client.Dispatch('CpTrade.CpTdUtil')
-    cpStockMstM = win32com.client.Dispatch("DsCbo1.StockMstM")
-    cpStockCode = win32com.client.Dispatch("CpUtil.CpStockCode")
-    cpBalance = win32com.client.Dispatch('CpTrade.CpTd6033')
-    cpCash = win32com.client.Dispatch('CpTrade.CpTdNew5331A')
-    cpOrder = win32com.client.Dispatch('CpTrade.CpTd0311')
-    cpOrderHist = win32com.client.Dispatch('CpTrade.CpTd5341')
+    cpCybos = LazyDispatch('CpUtil.CpCybos')
+    cpTdUtil = LazyDispatch('CpTrade.CpTdUtil')
+    cpStockMstM = LazyDispatch("DsCbo1.StockMstM")
+    cpStockCode = LazyDispatch("CpUtil.CpStockCode")
+    cpBalance = LazyDispatch('CpTrade.CpTd6033')
+    cpCash = LazyDispatch('CpTrade.CpTdNew5331A')
+    cpOrder = LazyDispatch('CpTrade.CpTd0311')
+    cpOrderHist = LazyDispatch('CpTrade.CpTd5341')
+    cpStockChart = LazyDispatch('CpSysDib.StockChart')
+    fee_rate = 0.002  # 수수료 + 매도 거래세 여유
     
-    def __init__(self):
+    def __init__(self, balance_ttl=1.0):
         self.cpTdUtil.TradeInit()
         self.acc = self.cpTdUtil.AccountNumber[0]
         self.accFlag = self.cpTdUtil.GoodsList(self.acc, 1)
+        self.quote_source = None
+        self.quote_book = None
+        self.quote_max_age = None
+        self.quota = QuotaScheduler(remain_time=lambda: self.cpCybos.LimitRequestRemainTime)
+        self.ohlcv_store = OHLCVStore(os.path.join('ohlcv', 'creon'))
+        self.balance_cache = BalanceCache(self.load_balance, ttl=balance_ttl)
+        self.journal = shared_journal(log=self.send_msg)
         super().__init__()
         
     def check_system(self):
@@ -33,75 +51,82 @@ class CreonPlusTrader(SuperTrader):
             raise Exception('check_creon_system() : init trade -> FAILED')
         self.send_msg('check_creon_system...OK')
 
-    def get_stock_balance(self, code, acc_display=False):
+    def load_balance(self):
+        """CpTd6033 연속 조회로 전체 잔고를 받아 BalanceSnapshot 생성"""
         self.cpTdUtil.TradeInit()
         self.cpBalance.SetInputValue(0, self.acc)
         self.cpBalance.SetInputValue(1, self.accFlag[0])
         self.cpBalance.SetInputValue(2, 50)
         self.cpBalance.SetInputValue(3, '2')
-        self.cpBalance.BlockRequest()
-        
-        stocks_cnt = self.cpBalance.GetHeaderValue(7)
-        if (code == 'all') and acc_display:
-            acc_name = self.cpBalance.GetHeaderValue(0)
-            total_asset = self.cpBalance.GetHeaderValue(3)
-            total_profit = self.cpBalance.GetHeaderValue(4)
-            total_rtn = self.cpBalance.GetHeaderValue(8)
-            cash = self.cpBalance.GetHeaderValue(9)
-            stock_asset = self.cpBalance.GetHeaderValue(11)
-
-            self.send_msg(f'계좌명       : {acc_name}', log_level='info', slack=True)
-            self.send_msg(f'총 자산      : {total_asset:,}원', log_level='info', slack=True)
-            self.send_msg(f'총 수익금    : {total_profit:,}원', log_level='info', slack=True)
-            self.send_msg(f'총 수익률    : {total_rtn:.2f}%', log_level='info', slack=True)
-            self.send_msg(f'보유 주식 수 : {stocks_cnt}종목', log_level='info', slack=True)
-            self.send_msg(f'주식 평가금액: {stock_asset}', log_level='info', slack=True)
-            self.send_msg(f'예수금       : {cash:,}원', log_level='info', slack=True)
-        
-        stocks = []
-        for i in range(stocks_cnt):
-            stock_name = self.cpBalance.GetDataValue(0, i)#
-            today_buy_cnt = self.cpBalance.GetDataValue(6, i)
-            e_stock_qty = self.cpBalance.GetDataValue(7, i)#
-            e_stock_asset = self.cpBalance.GetDataValue(9, i)#
-            e_stock_profit = self.cpBalance.GetDataValue(10, i)#
-            e_stock_rtn = self.cpBalance.GetDataValue(11, i)
-            stock_code = self.cpBalance.GetDataValue(12, i)#
-            avg_buy_price = self.cpBalance.GetDataValue(18, i)#
-            
-            if code == 'all':
-                if acc_display:
-                    print_info1 = f'{i+1} {stock_code}({stock_name}): '
-                    print_info2 = f'{e_stock_qty:,}주 * {avg_buy_price:,}원 + {e_stock_profit:,}원 = {e_stock_asset:,}원'
-                    print_info3 = f' | {e_stock_rtn:.2f}% | 금일 체결: {today_buy_cnt}'
-                    self.send_msg(print_info1 + print_info2 + print_info3, log_level='info', slack=True)
-                stocks.append({'code': stock_code, 'qty': e_stock_qty})
-            
-            if code == stock_code:
-                return stock_code, e_stock_qty
-        if code == 'all':
-            return stocks
-        else:
-            return code, 0
+        header = None
+        rows = []
+        while True:
+            self.quota.request(TRADE, self.cpBalance.BlockRequest, PRIORITY_LOOKUP)
+            if header is None:
+                header = {name: self.cpBalance.GetHeaderValue(i) for name, i in BALANCE_HEADER.items()}
+            cnt = self.cpBalance.GetHeaderValue(7)
+            for i in range(cnt):
+                rows.append([self.cpBalance.GetDataValue(f, i) for f in BALANCE_FIELDS.values()])
+            if not self.cpBalance.Continue:
+                break
+        return BalanceSnapshot(header, rows)
+
+    def get_stock_balance(self, code, acc_display=False):
+        balance = self.balance_cache.snapshot()
+        if code != 'all':
+            return code, balance.get_qty(code)
+
+        if acc_display:
+            h = balance.header
+            lines = [
+                f'계좌명       : {h["acc_name"]}',
+                f'총 자산      : {h["total_asset"]:,}원',
+                f'총 수익금    : {h["total_profit"]:,}원',
+                f'총 수익률    : {h["total_rtn"]:.2f}%',
+                f'보유 주식 수 : {len(balance)}종목',
+                f'주식 평가금액: {h["stock_asset"]}',
+                f'예수금       : {h["cash"]:,}원',
+            ]
+            for i in range(len(balance)):
+                print_info1 = f'{i+1} {balance.codes[i]}({balance.names[i]}): '
+                print_info2 = (f'{balance.qty[i]:,}주 * {balance.avg_price[i]:,}원 + '
+                               f'{balance.profit[i]:,}원 = {balance.asset[i]:,}원')
+                print_info3 = f' | {balance.rtn[i]:.2f}% | 금일 체결: {balance.today_buy_cnt[i]}'
+                lines.append(print_info1 + print_info2 + print_info3)
+            self.send_msg('\n'.join(lines), log_level='info', slack=True)
+        return balance.to_list()
     
     def get_cur_cash(self):
         self.cpTdUtil.TradeInit()
         self.cpCash.SetInputValue(0, self.acc)
         self.cpCash.SetInputValue(1, self.accFlag[0])
-        self.cpCash.BlockRequest()
+        self.quota.request(TRADE, self.cpCash.BlockRequest, PRIORITY_LOOKUP)
         return self.cpCash.GetHeaderValue(9)
     
     def get_cur_total_asset(self):
-        self.cpTdUtil.TradeInit()
-        self.cpBalance.SetInputValue(0, self.acc)
-        self.cpBalance.SetInputValue(1, self.accFlag[0])
-        self.cpBalance.SetInputValue(2, 50)
-        self.cpBalance.SetInputValue(3, '2')
-        self.cpBalance.BlockRequest()
-        total_asset = self.cpBalance.GetHeaderValue(3)
-        return total_asset
+        return self.balance_cache.snapshot().total_asset
     
+    def subscribe_quotes(self, codes, source=None, max_age=60.0):
+        """실시간 시세 구독. 구독한 종목은 get_cur_price가 요청 없이 메모리에서 응답 (max_age초 지난 틱은 무시)"""
+        self.unsubscribe_quotes()
+        self.quote_max_age = max_age
+        self.quote_source = source or CreonQuoteSource()
+        self.quote_book = QuoteBook(codes)
+        self.quote_source.subscribe(codes, self.quote_book.on_tick)
+        self.send_msg(f'subscribe_quotes({len(codes)} codes)...OK')
+        return self.quote_book
+
+    def unsubscribe_quotes(self):
+        if self.quote_source is not None:
+            self.quote_source.unsubscribe()
+        self.quote_source = None
+        self.quote_book = None
+
     def get_cur_price(self, codes, price_type=['price']):
+        if self.quote_book is not None and self.quote_book.has(codes, self.quote_max_age):
+            data = self.quote_book.snapshot(codes, price_type)
+            return pd.DataFrame(data, index=codes, columns=price_type)
+
         codes = codes.copy()
         type_dict = {'price':4,'ask':5,'bid':6,'vol':7}
         cur_info_dict = {}
@@ -110,7 +135,7 @@ class CreonPlusTrader(SuperTrader):
             codes = codes[110:]
 
             self.cpStockMstM.SetInputValue(0, codes_str)  # max: 110
-            self.cpStockMstM.BlockRequest()
+            self.quota.request(QUOTE, self.cpStockMstM.BlockRequest, PRIORITY_LOOKUP)
 
             data_len = self.cpStockMstM.GetHeaderValue(0)
             for i in range(data_len):
@@ -121,12 +146,50 @@ class CreonPlusTrader(SuperTrader):
                     cur_info_dict[code].update({pt:cur_data})
         return pd.DataFrame(cur_info_dict).T
     
-    def get_trad_price(self, cur_price_df, td_type, tic=1):
-        if td_type == 'buy':
-            df = cur_price_df.apply(lambda p: p - (self.cpStockCode.GetPriceUnit(p.index, p) * tic), axis=1)
-        elif td_type == 'sell':
-            df = cur_price_df.apply(lambda p: p + (self.cpStockCode.GetPriceUnit(p.index, p) * tic), axis=1)
-        return df
+    def get_ohlcv(self, code, start, end):
+        """[start, end) 일봉 OHLCV(수정주가). 로컬 저장소에 없는 구간만 요청"""
+        bar_ms = 24 * 60 * 60 * 1000
+        fetch = lambda s, e: self._fetch_daily_chart(code, s, e - bar_ms)
+        return self.ohlcv_store.get(code, '1d', to_ms(start), to_ms(end), fetch, bar_ms)
+
+    def _fetch_daily_chart(self, code, start_ms, last_ms):
+        to_date = lambda ms: int(pd.Timestamp(ms, unit='ms').strftime('%Y%m%d'))
+        self.cpStockChart.SetInputValue(0, code)
+        self.cpStockChart.SetInputValue(1, ord('1'))  # 기간 요청
+        self.cpStockChart.SetInputValue(2, to_date(last_ms))  # 종료일
+        self.cpStockChart.SetInputValue(3, to_date(start_ms))  # 시작일
+        self.cpStockChart.SetInputValue(5, [0, 2, 3, 4, 5, 8])  # 날짜, 시가, 고가, 저가, 종가, 거래량
+        self.cpStockChart.SetInputValue(6, ord('D'))
+        self.cpStockChart.SetInputValue(9, ord('1'))  # 수정주가
+        rows = []
+        while True:
+            self.quota.request(QUOTE, self.cpStockChart.BlockRequest, PRIORITY_LOOKUP)
+            cnt = self.cpStockChart.GetHeaderValue(3)
+            for i in range(cnt):
+                rows.append([self.cpStockChart.GetDataValue(j, i) for j in range(6)])
+            if not self.cpStockChart.Continue:
+                break
+        if not rows:
+            return []
+        rows = np.array(rows, dtype=np.float64)
+        dates = pd.to_datetime(rows[:, 0].astype(np.int64).astype(str), format='%Y%m%d')
+        rows[:, 0] = dates.values.astype('datetime64[ms]').astype(np.int64)
+        return rows
+
+    def get_trad_price(self, cur_price_df, td_type, tic=1, market='KOSPI'):
+        """매수는 tic 호가 아래, 매도는 tic 호가 위 가격"""
+        table = get_tick_table(market)
+        shift = -tic if td_type == 'buy' else tic
+        prices = table.shift(cur_price_df.to_numpy(), shift)
+        return pd.DataFrame(prices, index=cur_price_df.index, columns=cur_price_df.columns)
+
+    def validate_tick_table(self, code='005930', market='KOSPI'):
+        mismatches = get_tick_table(market).validate(self.cpStockCode, code)
+        if mismatches:
+            self.send_msg(f'validate_tick_table...FAILED: {mismatches}', log_level='warning', slack=True)
+            return False
+        self.send_msg('validate_tick_table...OK')
+        return True
     
     def buy(self, code, price, qty):
         try:
@@ -143,19 +206,19 @@ class CreonPlusTrader(SuperTrader):
                 self.cpOrder.SetInputValue(5, price)  # 매수 가격
                 self.cpOrder.SetInputValue(8, "01")  # 주문호가 1: 보통, 3: 시장가, 5:조건부, 12: 최유리, 13: 최우선
             
-            rq = self.cpOrder.BlockRequest()
-            self.send_msg(f'매수 주문 요청: [{code}, {price}, {qty}]-> {rq}', log_level='info', slack=True)
+            rq = self.quota.request(TRADE, self.cpOrder.BlockRequest, PRIORITY_ORDER)
+            self.balance_cache.invalidate()
+            self.send_msg('매수 주문 요청: [{}, {}, {}]-> {}', code, price, qty, rq, log_level='info', slack=True)
             dibstatus = self.cpOrder.GetDibStatus()
-            self.send_msg(f'통신상태: {dibstatus} {self.cpOrder.GetDibMsg1()}')
+            self.send_msg('통신상태: {} {}', dibstatus, self.cpOrder.GetDibMsg1())
             
             if (rq == 0) and (dibstatus == 0):
-                self.send_msg(f'매수 주문 정상 처리: [{code}, {price}, {qty}]-> {rq}', log_level='debug', slack=False)
+                self.send_msg('매수 주문 정상 처리: [{}, {}, {}]-> {}', code, price, qty, rq, log_level='debug')
+                self.journal.record('creon', ORDER, BUY, code, qty, 0 if price == 'market' else price)
                 return True
-            elif rq == 4: # 주문요청제한초과
-                self.send_msg(f'매수 주문 제한: [{code}, {price}, {qty}]-> {rq}', log_level='debug', slack=False)
-                remain_time = self.cpCybos.LimitRequestRemainTime
-                time.sleep(remain_time/1000)
-                return self.buy(code, price, qty)
+            elif rq == LIMIT_EXCEEDED:  # 재시도 후에도 주문요청제한초과
+                self.send_msg(f'매수 주문 제한: [{code}, {price}, {qty}]-> {rq}', log_level='warning', slack=True)
+                return False
             else:
                 return False
                 
@@ -177,50 +240,147 @@ class CreonPlusTrader(SuperTrader):
                 self.cpOrder.SetInputValue(5, price)
                 self.cpOrder.SetInputValue(8, "01")
             
-            rq = self.cpOrder.BlockRequest()
-            self.send_msg(f'매도 주문 요청: [{code}, {price}, {qty}]-> {rq}', log_level='info', slack=True)
+            rq = self.quota.request(TRADE, self.cpOrder.BlockRequest, PRIORITY_ORDER)
+            self.balance_cache.invalidate()
+            self.send_msg('매도 주문 요청: [{}, {}, {}]-> {}', code, price, qty, rq, log_level='info', slack=True)
             dibstatus = self.cpOrder.GetDibStatus()
-            self.send_msg(f'통신상태: {dibstatus} {self.cpOrder.GetDibMsg1()}')
+            self.send_msg('통신상태: {} {}', dibstatus, self.cpOrder.GetDibMsg1())
             
             if (rq == 0) and (dibstatus == 0):
-                self.send_msg(f'매도 주문 정상 처리: [{code}, {price}, {qty}]-> {rq}', log_level='debug', slack=False)
+                self.send_msg('매도 주문 정상 처리: [{}, {}, {}]-> {}', code, price, qty, rq, log_level='debug')
+                self.journal.record('creon', ORDER, SELL, code, qty, 0 if price == 'market' else price)
                 return True
-            elif rq == 4: # 주문요청제한초과
-                self.send_msg(f'매도 주문 제한: [{code}, {price}, {qty}]-> {rq}', log_level='debug', slack=False)
-                remain_time = self.cpCybos.LimitRequestRemainTime
-                time.sleep(remain_time/1000)
-                return self.sell(code, price, qty)
+            elif rq == LIMIT_EXCEEDED:  # 재시도 후에도 주문요청제한초과
+                self.send_msg(f'매도 주문 제한: [{code}, {price}, {qty}]-> {rq}', log_level='warning', slack=True)
+                return False
             else:
                 return False
                 
         except Exception as e:
             self.send_msg(f'sell({code}, {price}, {qty}) exception! -> {e}', log_level='error', slack=True)
 
-    def sell_all(self):
+    def sell_all(self, source=None, order_timeout=30.0, max_resubmit=3):
         holding_stocks = self.get_stock_balance('all')
-        for stock in holding_stocks:
-            self.sell(stock['code'], 'market', stock['qty'])
-        while self.get_stock_balance('all'):
-            time.sleep(1)
-        self.send_msg('Sell all holding stocks...OK', slack=True)
+        liquidator = Liquidator(self, source or CreonConclusionSource(),
+                                order_timeout=order_timeout, max_resubmit=max_resubmit)
+        summary = liquidator.run(holding_stocks)
+        self.balance_cache.invalidate()
+        if summary['failed']:
+            self.send_msg(f"Sell all holding stocks...FAILED: {summary['failed']}", log_level='warning', slack=True)
+        else:
+            self.send_msg(f"Sell all holding stocks...OK ({len(summary['sold'])} stocks, "
+                          f"{summary['elapsed']:.1f}s)", slack=True)
+        return summary
+
+    def get_rebalance_state(self, codes):
+        balance = self.balance_cache.snapshot()
+        codes = list(codes)
+        targets = set(codes)
+        codes += [code for code in balance.codes if code not in targets]
+        price = self.get_cur_price(codes)['price'].reindex(codes).to_numpy(dtype=np.float64)
+        cur_qty = np.array([balance.get_qty(code) for code in codes], dtype=np.float64)
+        return {'symbols': codes, 'cur_qty': cur_qty, 'price': price, 'equity': balance.total_asset,
+                'cash': self.get_cur_cash(), 'lot_step': 1.0}
+
+    def send_rebalance_orders(self, plan, tic=None, market='KOSPI', source=None, fill_timeout=30.0):
+        """매도 주문이 체결된 뒤 매수 주문. tic이 없으면 시장가, 있으면 현재가에서 tic 호가 불리한 쪽 지정가(매수 위, 매도 아래).
+
+        Creon 주문은 접수되면 바로 반환하므로 체결 이벤트(source)로 매도 체결을 fill_timeout초까지 기다린다.
+        매수 수량은 매도 후 주문가능금액 안에서 실제 주문 가격(지정가면 tic만큼 올린 가격) 기준으로 줄인다.
+        """
+        qty = plan['order_qty'].to_numpy()
+        ref_price = plan['price'].to_numpy(dtype=np.float64)
+        if tic is None:
+            prices = ['market'] * len(plan)
+            cost_price = ref_price
+        else:
+            table = get_tick_table(market)
+            limit = np.where(qty > 0, table.shift(ref_price, tic), table.shift(ref_price, -tic))
+            prices = limit.tolist()
+            cost_price = limit.astype(np.float64)
+        sells, buys = np.flatnonzero(qty < 0), np.flatnonzero(qty > 0)
+
+        results = {}
+        if len(sells):
+            waiter = FillWaiter(source or CreonConclusionSource())
+            waiter.start({plan.index[i]: int(-qty[i]) for i in sells})
+            for i in sells:
+                code = plan.index[i]
+                results[code] = bool(self.sell(code, prices[i], int(-qty[i])))
+                if not results[code]:
+                    waiter.cancel(code)
+            unfilled = waiter.wait(fill_timeout)
+            if unfilled:
+                self.send_msg(f'rebalance: sells not filled in {fill_timeout}s: {unfilled}', log_level='warning')
+            self.balance_cache.invalidate()
+
+        if len(buys):
+            buy_qty = qty[buys].astype(np.int64)
+            cash = float(self.get_cur_cash())
+            cost = float(np.sum(buy_qty * cost_price[buys])) * (1 + self.fee_rate)
+            if cost > cash:
+                buy_qty = np.floor(buy_qty * max(cash, 0.0) / cost).astype(np.int64)
+                self.send_msg('rebalance: buys scaled to cash {:,.0f} (needed {:,.0f})', cash, cost)
+            for i, q in zip(buys, buy_qty):
+                code = plan.index[i]
+                results[code] = bool(q > 0 and self.buy(code, prices[i], int(q)))
+        failed = [code for code, ok in results.items() if not ok]
+        if failed:
+            self.send_msg(f'rebalance...PARTIAL FAILED: {failed}', log_level='warning', slack=True)
+        else:
+            self.send_msg(f'rebalance...OK ({len(results)} orders)', slack=True)
+        return results
+
+    def get_quota_stats(self, display=False):
+        stats = self.quota.stats()
+        if display:
+            for kind, m in stats.items():
+                self.send_msg(f"quota[{kind}] requests: {m['requests']}, retries: {m['retries']}, "
+                              f"wait: {m['wait_sec']:.3f}s (max {m['max_wait_sec']:.3f}s), {m['per_sec']:.2f}/s")
+        return stats
 
     def get_today_order_history(self):
+        """금일 주문/체결 내역 전체 (연속 조회)"""
         self.cpTdUtil.TradeInit()
         self.cpOrderHist.SetInputValue(0, self.acc)
         self.cpOrderHist.SetInputValue(1, self.accFlag[0])
         self.cpOrderHist.SetInputValue(4, '0')
-        self.cpOrderHist.SetInputValue(5, 20)
-        self.cpOrderHist.BlockRequest()
+        self.cpOrderHist.SetInputValue(5, 20)  # max: 20
 
-        cnt = self.cpOrderHist.GetHeaderValue(6)
+        history = []
+        while True:
+            self.quota.request(TRADE, self.cpOrderHist.BlockRequest, PRIORITY_LOOKUP)
+            cnt = self.cpOrderHist.GetHeaderValue(6)
+            for i in range(cnt):
+                order_no = self.cpOrderHist.GetDataValue(1, i)
+                code = self.cpOrderHist.GetDataValue(3, i)
+                prc_type = self.cpOrderHist.GetDataValue(6, i)  # 01: 보통, 03: 시장가
+                order_qty = self.cpOrderHist.GetDataValue(7, i)
+                exec_qty = self.cpOrderHist.GetDataValue(10, i)
+                order_prc = self.cpOrderHist.GetDataValue(8, i)  # 0: 시장가
+                exec_prc = self.cpOrderHist.GetDataValue(11, i)
+                order_type = self.cpOrderHist.GetDataValue(35, i)  # 1:매도, 2: 매수
 
-        for i in range(cnt):
-            code = self.cpOrderHist.GetDataValue(3, i)
-            prc_type = self.cpOrderHist.GetDataValue(6, i)  # 01: 보통, 03: 시장가
-            order_qty = self.cpOrderHist.GetDataValue(7, i)
-            exec_qty = self.cpOrderHist.GetDataValue(10, i)
-            order_prc = self.cpOrderHist.GetDataValue(8, i)  # 0: 시장가
-            exec_prc = self.cpOrderHist.GetDataValue(11, i)
-            order_type = self.cpOrderHist.GetDataValue(35, i)  # 1:매도, 2: 매수
+                self.send_msg(f"{code}, {prc_type}, {order_qty}, {exec_qty}, {order_prc}, {exec_prc}, {order_type}")
+                history.append([order_no, code, prc_type, order_qty, exec_qty, order_prc, exec_prc, order_type])
+            if not self.cpOrderHist.Continue:
+                break
+        return pd.DataFrame(history, columns=['order_no', 'code', 'prc_type', 'order_qty', 'exec_qty',
+                                              'order_prc', 'exec_prc', 'order_type'])
 
-            self.send_msg(f"{code}, {prc_type}, {order_qty}, {exec_qty}, {order_prc}, {exec_prc}, {order_type}")
\ No newline at end of file
+    def save_today_fills(self):
+        """금일 체결 내역을 trade journal에 기록. 장 마감 후 호출. 이미 기록된 주문번호는 건너뜀"""
+        history = self.get_today_order_history()
+        self.journal.flush()
+        today = time.strftime('%Y%m%d')
+        saved = load_journal(self.journal.root, today, today)
+        saved = saved[(saved['kind'] == FILL) & (saved['broker'] == b'creon')]
+        saved_ids = set(saved['order_id'].astype(str))
+        fills = history[(history['exec_qty'] > 0) & ~history['order_no'].astype(str).isin(saved_ids)]
+        for row in fills.itertuples():
+            side = SELL if str(row.order_type) == '1' else BUY
+            self.journal.record('creon', FILL, side, row.code, row.order_qty, row.order_prc,
+                                row.order_no, row.exec_qty, row.exec_prc)
+        self.journal.flush()
+        self.send_msg(f'save_today_fills({len(fills)} fills)...OK')
+        return len(fills)
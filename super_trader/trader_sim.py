@@ -0,0 +1,174 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .super_trader import SuperTrader
+from .tick_size import get_tick_table
+from .trading_calendar import crypto_calendar
+
+
+class SimTrader(SuperTrader):
+    """과거 봉 데이터 위에서 동작하는 모의 브로커.
+
+    bars: {code: DataFrame(open, high, low, close, volume)}. step()으로 한 봉씩 진행하며,
+    시장가는 현재 봉 종가에 slippage를 더해(매도는 빼서) 체결하고 지정가는 봉의 고가/저가 범위 안이면 체결한다.
+    tick_market('KOSPI' 등)을 주면 체결가를 KRX 호가단위로 맞춘다.
+    """
+
+    def __init__(self, bars, cash=10_000_000, fee_rate=0.00015, slippage=0.0005, tick_market=None):
+        self.codes = list(bars)
+        self.code_idx = {code: i for i, code in enumerate(self.codes)}
+        self.bars = bars
+        aligned = {col: pd.DataFrame({code: df[col] for code, df in bars.items()}).sort_index()
+                   for col in ('open', 'high', 'low', 'close')}
+        self.dates = aligned['close'].index
+        # 거래 정지 등 빈 봉은 직전 종가로 채움
+        close = aligned['close'].ffill()
+        self.close = close.to_numpy(dtype=np.float64)
+        self.high = aligned['high'].fillna(close).to_numpy(dtype=np.float64)
+        self.low = aligned['low'].fillna(close).to_numpy(dtype=np.float64)
+
+        self.t = 0
+        self.cash = float(cash)
+        self.qty = np.zeros(len(self.codes), dtype=np.float64)
+        self.avg_price = np.zeros(len(self.codes), dtype=np.float64)
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.tick_table = get_tick_table(tick_market) if tick_market else None
+        self.order_ids = itertools.count(1)
+        self.fills = []
+        super().__init__()
+
+    def set_slack(self):
+        self.notifier = None  # 오프라인 실행
+        return True
+
+    def get_calendar(self):
+        return crypto_calendar()
+
+    def check_market_open(self):
+        return True
+
+    def check_system(self):
+        return True
+
+    @property
+    def now(self):
+        return self.dates[self.t]
+
+    def step(self, n=1):
+        """n봉 진행. 마지막 봉이면 False"""
+        if self.t + n >= len(self.dates):
+            self.t = len(self.dates) - 1
+            return False
+        self.t += n
+        return True
+
+    def _round_tick(self, price, up):
+        if self.tick_table is None:
+            return price
+        unit = float(self.tick_table.unit([price], up=up)[0])
+        return (np.ceil(price / unit) if up else np.floor(price / unit)) * unit
+
+    def _fill(self, code, price, qty, side):
+        """체결 가능하면 체결가, 아니면 None"""
+        i = self.code_idx[code]
+        if price == 'market':
+            close = self.close[self.t, i]
+            return self._round_tick(close * (1 + side * self.slippage), up=side > 0)
+        if self.low[self.t, i] <= price <= self.high[self.t, i]:
+            return float(price)
+        return None
+
+    def _order(self, code, price, qty, side):
+        fill_price = self._fill(code, price, qty, side)
+        if fill_price is None or qty <= 0:
+            return False
+        i = self.code_idx[code]
+        amount = fill_price * qty
+        fee = amount * self.fee_rate
+        if side > 0:
+            if amount + fee > self.cash:
+                self.send_msg(f'sim buy rejected (cash): [{code}, {price}, {qty}]', log_level='debug')
+                return False
+            self.avg_price[i] = (self.avg_price[i] * self.qty[i] + amount) / (self.qty[i] + qty)
+            self.cash -= amount + fee
+            self.qty[i] += qty
+        else:
+            if qty > self.qty[i]:
+                self.send_msg(f'sim sell rejected (qty): [{code}, {price}, {qty}]', log_level='debug')
+                return False
+            self.cash += amount - fee
+            self.qty[i] -= qty
+            if self.qty[i] == 0:
+                self.avg_price[i] = 0.0
+        order_id = next(self.order_ids)
+        self.fills.append((self.now, order_id, code, side, qty, fill_price, fee))
+        return order_id
+
+    def buy(self, code, price, qty):
+        return bool(self._order(code, price, qty, 1))
+
+    def sell(self, code, price, qty):
+        return bool(self._order(code, price, qty, -1))
+
+    def execute_order(self, symbol, qty):
+        """Binance 방식 시장가 주문 (qty > 0 매수, < 0 매도)"""
+        side = 1 if qty > 0 else -1
+        order_id = self._order(symbol, 'market', abs(qty), side)
+        if not order_id:
+            raise Exception(f'execute_order({symbol}, {qty}) rejected')
+        _, _, _, _, fill_qty, fill_price, _ = self.fills[-1]
+        ts = int(self.now.timestamp() * 1000)
+        return [ts, ts, order_id, 'MARKET', 'BUY' if side > 0 else 'SELL', symbol,
+                fill_price, fill_price, fill_qty, fill_qty]
+
+    def get_cur_price(self, code):
+        if isinstance(code, str):
+            return float(self.close[self.t, self.code_idx[code]])
+        idx = [self.code_idx[c] for c in code]
+        return pd.DataFrame({'price': self.close[self.t, idx]}, index=code)
+
+    def get_ohlcv(self, code, start, end):
+        """[start, end) 중 현재 시점까지의 봉 (미래 데이터 제외)"""
+        df = self.bars[code]
+        df = df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+        return df[df.index <= self.now]
+
+    def get_stock_balance(self, code, acc_display=False):
+        if code != 'all':
+            return code, float(self.qty[self.code_idx[code]])
+        holding = np.flatnonzero(self.qty)
+        if acc_display:
+            self.send_msg(f'총 자산      : {self.get_cur_total_asset():,.0f}원\n'
+                          f'예수금       : {self.cash:,.0f}원\n'
+                          f'보유 주식 수 : {len(holding)}종목')
+        return [{'code': self.codes[i], 'qty': float(self.qty[i])} for i in holding]
+
+    def get_cur_cash(self):
+        return self.cash
+
+    def get_cur_total_asset(self):
+        return self.cash + float(np.nansum(self.qty * self.close[self.t]))
+
+    def sell_all(self):
+        for stock in self.get_stock_balance('all'):
+            self.sell(stock['code'], 'market', stock['qty'])
+        return True
+
+    def get_rebalance_state(self, codes):
+        codes = list(codes)
+        targets = set(codes)
+        codes += [self.codes[i] for i in np.flatnonzero(self.qty) if self.codes[i] not in targets]
+        idx = [self.code_idx[code] for code in codes]
+        return {'symbols': codes, 'cur_qty': self.qty[idx], 'price': self.close[self.t, idx],
+                'equity': self.get_cur_total_asset(), 'cash': self.cash,
+                'lot_step': 1.0 if self.tick_table is not None else 1e-8}
+
+    def send_rebalance_orders(self, plan):
+        return {code: self._order(code, 'market', abs(q), 1 if q > 0 else -1) is not False
+                for code, q in plan['order_qty'].items()}
+
+    def get_fills(self):
+        return pd.DataFrame(self.fills, columns=['date', 'order_id', 'code', 'side', 'qty', 'price', 'fee'])
@@ -0,0 +1,80 @@
+import datetime
+
+import numpy as np
+
+# zoneinfo는 Windows에서 tzdata 패키지가 있어야 하므로 고정 오프셋 사용 (KST는 서머타임 없음)
+KST = datetime.timezone(datetime.timedelta(hours=9), 'KST')
+
+
+def to_days(dates):
+    """YYYYMMDD(int/str), date/datetime, datetime64 (스칼라 또는 배열) -> datetime64[D] 배열"""
+    arr = np.asarray(dates)
+    if arr.dtype.kind in 'US':
+        arr = arr.astype(np.int64)
+    if arr.dtype.kind in 'iu':
+        y, m, d = arr // 10000, arr // 100 % 100, arr % 100
+        months = (y - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (m - 1)
+        return months.astype('datetime64[D]') + (d - 1)
+    return arr.astype('datetime64[D]')
+
+
+class TradingCalendar:
+    """영업일/장 운영시간 계산. np.busdaycalendar에 휴일을 미리 넣어 두고 배열 단위로 계산한다"""
+
+    def __init__(self, holidays=(), weekmask='1111100', open_time=datetime.time(0, 0),
+                 close_time=None, tz=datetime.timezone.utc):
+        holidays = to_days(np.array(sorted(holidays), dtype=np.int64))
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=holidays)
+        self.open_time = open_time
+        self.close_time = close_time  # None이면 다음 날 0시(24시간 운영)
+        self.tz = tz
+
+    def is_session(self, dates):
+        """dates가 영업일인지 (배열 입력이면 bool 배열)"""
+        result = np.is_busday(to_days(dates), busdaycal=self.busdaycal)
+        return bool(result) if np.ndim(result) == 0 else result
+
+    def next_session(self, dates):
+        """dates 이후(당일 제외) 첫 영업일"""
+        return np.busday_offset(to_days(dates), 1, roll='backward', busdaycal=self.busdaycal)
+
+    def prev_session(self, dates):
+        """dates 이전(당일 제외) 마지막 영업일"""
+        return np.busday_offset(to_days(dates), -1, roll='forward', busdaycal=self.busdaycal)
+
+    def sessions_between(self, start, end):
+        """start ~ end(포함) 영업일 배열"""
+        days = np.arange(to_days(start), to_days(end) + 1)
+        return days[np.is_busday(days, busdaycal=self.busdaycal)]
+
+    def count_sessions(self, start, end):
+        """start ~ end(포함) 영업일 수"""
+        return np.busday_count(to_days(start), to_days(end) + 1, busdaycal=self.busdaycal)
+
+    def session_times(self, date):
+        """date 장 시작/종료 시각 (tz-aware datetime)"""
+        day = to_days(date).item()
+        open_dt = datetime.datetime.combine(day, self.open_time, tzinfo=self.tz)
+        if self.close_time is None:
+            close_dt = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time(0, 0),
+                                                 tzinfo=self.tz)
+        else:
+            close_dt = datetime.datetime.combine(day, self.close_time, tzinfo=self.tz)
+        return open_dt, close_dt
+
+    def is_open(self, now=None):
+        now = now or datetime.datetime.now(self.tz)
+        now = now.astimezone(self.tz)
+        if not self.is_session(now.date()):
+            return False
+        open_dt, close_dt = self.session_times(now.date())
+        return open_dt <= now < close_dt
+
+
+def krx_calendar(holidays):
+    return TradingCalendar(holidays, weekmask='1111100', open_time=datetime.time(9, 0),
+                           close_time=datetime.time(15, 30), tz=KST)
+
+
+def crypto_calendar():
+    return TradingCalendar(weekmask='1111111', tz=datetime.timezone.utc)
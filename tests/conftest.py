@@ -0,0 +1,34 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', help='@pytest.mark.benchmark 테스트(벽시계 측정)도 실행')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: 벽시계 시간을 재는 벤치마크. --benchmark를 줄 때만 실행')
+    config.bench_lines = []
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmark: --benchmark로 실행')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def bench_report(request):
+    """bench_report(name, fmt, *args): 결과를 모아 테스트가 끝난 뒤 요약에 출력"""
+    def report(name, fmt, *args):
+        request.config.bench_lines.append(f'{name}: ' + fmt.format(*args))
+    return report
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if config.bench_lines:
+        terminalreporter.section('benchmark')
+        for line in config.bench_lines:
+            terminalreporter.write_line(line)
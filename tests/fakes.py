@@ -0,0 +1,63 @@
+import itertools
+import threading
+import time
+
+from super_trader.async_log import LEVELS, AsyncLogger
+from super_trader.order_tracker import OrderTracker
+from super_trader.position_cache import PositionCache
+from super_trader.rate_limit import TokenBucket
+from super_trader.trade_journal import TradeJournal
+
+
+class FakeExchange:
+    """지연시간을 주입한 ccxt binance 대역. 시장가 주문은 즉시 체결된 것으로 본다"""
+
+    rateLimit = 1
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.ids = itertools.count(1)
+        self.orders = {}
+        self.lock = threading.Lock()
+        self.fetch_calls = 0
+
+    def market_id(self, symbol):
+        return symbol.replace('/', '')
+
+    def create_order(self, symbol, type, side, amount):
+        time.sleep(self.latency)
+        order_id = str(next(self.ids))
+        now = int(time.time() * 1000)
+        with self.lock:
+            self.orders[order_id] = {
+                'time': now, 'updateTime': now, 'orderId': order_id, 'status': 'FILLED', 'type': 'MARKET',
+                'side': side.upper(), 'symbol': self.market_id(symbol), 'price': '0', 'avgPrice': '100',
+                'origQty': str(amount), 'executedQty': str(amount),
+            }
+        return {'id': order_id}
+
+    def fetchOrder(self, symbol, id):
+        time.sleep(self.latency)
+        with self.lock:
+            self.fetch_calls += 1
+            return {'info': self.orders[id]}
+
+
+def null_logger():
+    return AsyncLogger({level: (lambda msg: None) for level in LEVELS})
+
+
+def make_binance_trader(exchange, journal_root, poll_interval=0.02):
+    """거래소/설정 파일 없이 BinanceTrader의 주문 경로만 조립"""
+    from super_trader.trader_binance import BinanceTrader
+
+    trader = object.__new__(BinanceTrader)
+    trader.is_future = True
+    trader._exchange = exchange
+    trader.log = null_logger()
+    trader.notifier = None
+    trader.rate_limiter = TokenBucket(rate=10000, capacity=1000)
+    trader.order_tracker = OrderTracker(exchange, poll_interval=poll_interval, rate_limiter=trader.rate_limiter)
+    trader.position_cache = PositionCache(lambda: [], ttl=1.0)
+    trader.journal = TradeJournal(root=str(journal_root))
+    return trader
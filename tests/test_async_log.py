@@ -0,0 +1,68 @@
+import os
+
+from super_trader.async_log import LEVELS, AsyncLogger, binlog_name, read_binlog, shared_logger
+
+
+def _logger(path, out):
+    return AsyncLogger({level: out.append for level in LEVELS}, binlog_path=str(path), flush_interval=0.01)
+
+
+def test_bad_record_does_not_kill_writer(tmp_path):
+    out = []
+    log = _logger(tmp_path / 'a.binlog', out)
+    log.log('info', 'a {} {}', (1,))  # 인자 부족 -> IndexError
+    log.log('info', 'b {}', (2,))
+    log.flush(timeout=1.0)
+
+    assert log.th.is_alive()
+    assert out[0].startswith('log record failed')
+    assert out[1] == 'b 2'
+    msgs = [msg for _, _, msg in read_binlog(tmp_path / 'a.binlog')]
+    assert msgs[0].startswith('log record failed') and msgs[1] == 'b 2'
+
+
+def test_preformatted_messages_are_not_interned(tmp_path):
+    out = []
+    log = _logger(tmp_path / 'b.binlog', out)
+    for i in range(70000):  # u16 id 범위를 넘는 서로 다른 메시지
+        log.log('debug', f'tick {i}')
+    log.log('info', 'lazy {}', ('x',))
+    log.flush(timeout=5.0)
+
+    assert log.th.is_alive()
+    assert len(log.event_ids) == 1
+    records = list(read_binlog(tmp_path / 'b.binlog'))
+    assert len(records) == 70001
+    assert records[69999][1:] == ('debug', 'tick 69999')
+    assert records[-1][1:] == ('info', 'lazy x')
+
+
+def test_shared_logger_per_binlog(tmp_path):
+    path = str(tmp_path / 'c.binlog')
+    first = shared_logger({level: [].append for level in LEVELS}, path)
+    second = shared_logger({level: [].append for level in LEVELS}, path)
+    assert first is second
+    first.log('info', 'one {}', (1,))
+    second.log('info', 'two {}', (2,))
+    first.flush(timeout=1.0)
+
+    assert [msg for _, _, msg in read_binlog(path)] == ['one 1', 'two 2']
+    assert sorted(first.event_ids.values()) == [0, 1]
+
+
+def test_ring_overflow_is_counted_and_reported(tmp_path):
+    out = []
+    log = AsyncLogger({level: out.append for level in LEVELS}, binlog_path=str(tmp_path / 'd.binlog'),
+                      capacity=10, flush_interval=60.0)
+    for i in range(25):
+        log.log('info', 'msg {}', (i,))
+    assert log.dropped == 15
+    log.flush(timeout=1.0)
+
+    assert out[0] == 'log buffer full: dropped 15 records (total 15)'
+    assert out[1:] == [f'msg {i}' for i in range(15, 25)]
+    assert next(read_binlog(tmp_path / 'd.binlog'))[1:] == ('warning', out[0])
+
+
+def test_binlog_name_is_per_process():
+    assert binlog_name('20240102') == f'20240102_{os.getpid()}.binlog'
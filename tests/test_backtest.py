@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from super_trader.backtest import STAT_COLS, ma_cross_strategy, run_grid
+from super_trader.rebalance import plan_rebalance
+from super_trader.trader_sim import SimTrader
+
+from .fakes import null_logger
+
+DATES = pd.date_range('2024-01-02', periods=4, freq='D')
+
+
+def bars(close, spread=2.0):
+    close = np.asarray(close, dtype=np.float64)
+    return pd.DataFrame({'open': close, 'high': close + spread, 'low': close - spread, 'close': close,
+                         'volume': 1.0}, index=DATES[:len(close)])
+
+
+@pytest.fixture
+def sim(monkeypatch):
+    monkeypatch.setattr(SimTrader, 'get_logger', lambda self: null_logger())
+    trader = SimTrader({'A': bars([100, 110, 120, 130]), 'B': bars([50, 50, np.nan, 40])},
+                       cash=10_000, fee_rate=0.001, slippage=0.01)
+    return trader
+
+
+def test_market_and_limit_fills_with_fees(sim):
+    assert sim.buy('A', 'market', 10)  # 100 * 1.01
+    assert sim.cash == pytest.approx(10_000 - 1010 - 1.01)
+    assert sim.buy('B', 49, 20)  # 저가 48 ~ 고가 52 안
+    assert not sim.buy('B', 47, 1)  # 범위 밖 지정가
+    assert not sim.sell('A', 'market', 11)  # 보유 수량 초과
+    assert not sim.buy('A', 'market', 1000)  # 현금 부족
+
+    assert sim.step()
+    assert sim.sell('A', 'market', 10)  # 110 * 0.99
+    fills = sim.get_fills()
+    assert fills[['code', 'side', 'qty']].values.tolist() == [['A', 1, 10], ['B', 1, 20], ['A', -1, 10]]
+    np.testing.assert_allclose(fills['price'], [101.0, 49.0, 108.9])
+    np.testing.assert_allclose(fills['fee'], [1.01, 0.98, 1.089])
+    assert sim.cash == pytest.approx(10_000 - 1011.01 - 980.98 + 1089 - 1.089)
+    assert sim.get_stock_balance('all') == [{'code': 'B', 'qty': 20.0}]
+
+
+def test_missing_bar_uses_previous_close_and_no_lookahead(sim):
+    sim.step(2)
+    assert sim.get_cur_price('B') == 50.0  # 거래 정지 봉은 직전 종가
+    assert not sim.buy('B', 45, 1)  # 빈 봉은 고가/저가도 직전 종가
+    assert len(sim.get_ohlcv('A', '2024-01-01', '2024-02-01')) == 3
+    assert not sim.step(5)
+    assert sim.now == DATES[-1]
+
+
+def test_rebalance_on_sim(sim):
+    state = sim.get_rebalance_state(['A', 'B'])
+    # 계획은 종가 기준이므로 slippage와 수수료만큼 현금을 남겨 둠
+    plan = plan_rebalance(weights=[0.5, 0.5], fee_rate=sim.fee_rate, cash_buffer=sim.slippage + sim.fee_rate,
+                          **state)
+    assert sim.send_rebalance_orders(plan) == {'A': True, 'B': True}
+    assert sim.cash >= 0
+    assert sim.get_cur_total_asset() == pytest.approx(10_000 - sim.get_fills()['fee'].sum()
+                                                      - 0.01 * (sim.get_fills()['qty'] * sim.close[0]).sum())
+
+
+def test_ma_cross_on_trending_prices():
+    t = np.arange(10)
+    close = np.column_stack([100 * 1.01 ** t, 100 * 0.99 ** t])
+    stats = ma_cross_strategy(close[:, :1], np.array([[1, 2]]), fee_rate=0.001)
+    # 첫 신호는 t=1, 보유는 t=2부터 (진입 봉에 수수료)
+    assert stats[0, 0] == pytest.approx((1.01 - 0.001) * 1.01 ** 7 - 1)
+    assert stats[0, 2] == 0.0
+    falling = ma_cross_strategy(close[:, 1:], np.array([[1, 2]]))
+    np.testing.assert_array_equal(falling, [[0.0, 0.0, 0.0]])  # 한 번도 보유하지 않음
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_run_grid_matches_direct_evaluation(n_workers):
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, size=(120, 3)), axis=0)
+    params = np.array([[f, s] for f in (2, 5, 10) for s in (20, 30)])
+    grid = run_grid(close, params, n_workers=n_workers, chunk_size=4)
+    assert list(grid.columns) == ['params'] + STAT_COLS
+    assert grid['params'].tolist() == [tuple(p) for p in params]
+    np.testing.assert_allclose(grid[STAT_COLS].to_numpy(), ma_cross_strategy(close, params))
@@ -0,0 +1,73 @@
+from super_trader.balance_snapshot import BALANCE_FIELDS, BALANCE_HEADER
+from super_trader.request_quota import TRADE, QuotaScheduler
+from super_trader.trader_creonplus import CreonPlusTrader
+
+
+class FakeCpTd6033:
+    """요청 개수(입력 2)만큼씩 나눠 주고, 남은 행이 있으면 Continue가 참인 CpTd6033 대역"""
+
+    def __init__(self, holdings):
+        self.holdings = holdings
+        self.inputs = {}
+        self.page = None
+        self.pos = 0
+        self.requests = 0
+
+    def SetInputValue(self, i, value):
+        self.inputs[i] = value
+        self.pos = 0  # 입력을 다시 주면 처음부터
+
+    def BlockRequest(self):
+        self.requests += 1
+        size = self.inputs[2]
+        self.page = self.holdings[self.pos:self.pos + size]
+        self.pos += len(self.page)
+        return 0
+
+    def GetHeaderValue(self, i):
+        if i == 7:
+            return len(self.page)
+        return {BALANCE_HEADER['acc_name']: 'test', BALANCE_HEADER['total_asset']: 10 ** 8,
+                BALANCE_HEADER['cash']: 10 ** 7}.get(i, 0)
+
+    def GetDataValue(self, field, i):
+        code, qty, sellable = self.page[i]
+        values = {BALANCE_FIELDS['code']: code, BALANCE_FIELDS['name']: code, BALANCE_FIELDS['qty']: qty,
+                  BALANCE_FIELDS['sellable']: sellable}
+        return values.get(field, 0)
+
+    @property
+    def Continue(self):
+        return self.pos < len(self.holdings)
+
+
+class FakeTdUtil:
+    def TradeInit(self, *args):
+        return 0
+
+
+def make_trader(holdings):
+    trader = object.__new__(CreonPlusTrader)
+    trader.acc, trader.accFlag = '12345678', ['01']
+    trader.cpTdUtil = FakeTdUtil()
+    trader.cpBalance = FakeCpTd6033(holdings)
+    trader.quota = QuotaScheduler(limits={TRADE: (100, 1.0)}, remain_time=lambda: 0)
+    return trader
+
+
+def test_balance_pages_past_first_50_rows():
+    holdings = [(f'A{i:06d}', i + 1, i) for i in range(120)]
+    trader = make_trader(holdings)
+    balance = trader.load_balance()
+    assert trader.cpBalance.requests == 3  # 50 + 50 + 20
+    assert len(balance) == 120
+    assert balance.get_qty('A000119') == 120
+    assert balance.get_sellable('A000119') == 119
+    assert balance.get_qty('A999999') == 0
+    assert balance.total_asset == 10 ** 8 and balance.cash == 10 ** 7
+
+
+def test_balance_exactly_one_page():
+    trader = make_trader([(f'A{i:06d}', 1, 1) for i in range(50)])
+    assert len(trader.load_balance()) == 50
+    assert trader.cpBalance.requests == 1
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from super_trader.config import get_config, parse_config
+
+RAW = {
+    'slack': {'token': 'xoxb-1', 'channel': '#trade'},
+    'binance': {'api_key': 'key', 'secret': 'secret'},
+    'holiday': {'2024': [20240101, '20240209'], '2025': [20250101]},
+    'db': {'host': 'localhost'},
+}
+
+
+def write_config(path, raw, mtime=None):
+    path.write_text(json.dumps(raw))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_parse_sections_and_holidays():
+    config = parse_config(RAW)
+    assert config.slack.channel == '#trade'
+    assert config.binance.secret == 'secret'
+    assert config.creon is None
+    assert config.holidays == {20240101, 20240209, 20250101}
+    assert config.is_holiday('20240209') and not config.is_holiday(20240102)
+    with pytest.raises(TypeError):
+        config.db['host'] = 'remote'  # 공유 설정은 읽기 전용
+
+
+def test_require_reports_missing_section():
+    config = parse_config(RAW)
+    assert config.require('binance').api_key == 'key'
+    with pytest.raises(ValueError, match="config.json must contain 'creon' key."):
+        config.require('creon')
+
+
+def test_section_with_missing_keys_is_rejected():
+    with pytest.raises(ValueError, match="creon in config.json must contain 'id', 'pwd', 'pwdcert' key."):
+        parse_config({'creon': {'id': 'user', 'pwd': 'pw'}})
+
+
+def test_config_is_reloaded_only_when_mtime_changes(tmp_path):
+    path = tmp_path / 'config.json'
+    write_config(path, RAW, mtime=1_700_000_000)
+    config = get_config(str(path))
+    assert get_config(str(path)) is config
+
+    changed = dict(RAW, binance={'api_key': 'key2', 'secret': 'secret2'})
+    write_config(path, changed, mtime=1_700_000_000)  # 내용이 바뀌어도 mtime이 같으면 캐시 유지
+    assert get_config(str(path)) is config
+
+    os.utime(path, (1_700_000_010, 1_700_000_010))
+    reloaded = get_config(str(path))
+    assert reloaded is not config
+    assert reloaded.binance.api_key == 'key2'
+    assert reloaded.mtime == 1_700_000_010
+
+
+def test_missing_config_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        get_config(str(tmp_path / 'config.json'))
@@ -0,0 +1,195 @@
+import pickle
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from super_trader.gateway import _REQ, METHOD_IDS, FairQueue, Gateway, GatewayClient
+from super_trader.request_quota import PRIORITY_LOOKUP, PRIORITY_ORDER
+
+
+class FakeCreon:
+    """종목 리스트를 받아 DataFrame을 반환하는 Creon식 get_cur_price"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_cur_price(self, codes, price_type=['price']):
+        assert isinstance(codes, list)
+        self.calls.append(list(codes))
+        return pd.DataFrame({'price': [1000.0 + i for i in range(len(codes))]}, index=codes)
+
+
+@pytest.fixture
+def gateway(tmp_path):
+    broker = FakeCreon()
+    gw = Gateway(lambda: broker, str(tmp_path / 'gw.sock'), price_symbols=['A005930', 'A000660'],
+                 publish_interval=60.0, log=lambda *args, **kwargs: None, list_prices=True)
+    gw.start()
+    yield gw, broker
+    gw.stop()
+
+
+def test_creon_prices_published_in_one_list_call(gateway):
+    gw, broker = gateway
+    client = GatewayClient(gw.address)
+    try:
+        assert client.get_cur_price('A005930') == 1000.0  # shared memory
+        assert client.get_cur_price('A000660') == 1001.0
+        assert client.get_cur_price('A035720') == 1000.0  # 게시하지 않는 종목은 리스트로 조회
+    finally:
+        client.close()
+    assert broker.calls == [['A005930', 'A000660'], ['A035720']]
+
+
+def test_client_without_token_is_rejected(gateway):
+    gw, broker = gateway
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5.0)
+    sock.connect(gw.address)
+    payload = pickle.dumps(((['A035720'],), {}))
+    sock.sendall(b'\0' * 32 + _REQ.pack(len(payload), 1, METHOD_IDS['get_cur_price']) + payload)
+    try:
+        assert sock.recv(1) == b''  # 토큰이 틀리면 요청을 읽지 않고 끊음
+    except ConnectionResetError:
+        pass
+    sock.close()
+    assert broker.calls == [['A005930', 'A000660']]
+    assert not gw.stats
+
+
+class FakeBroker:
+    """호출 순서를 기록하는 broker. block이 걸린 메서드는 release될 때까지 멈춘다"""
+
+    def __init__(self):
+        self.calls = []
+        self.blocked = {}
+        self.entered = threading.Event()
+
+    def block(self, method):
+        self.blocked[method] = threading.Event()
+
+    def _enter(self, method, value):
+        self.calls.append((method, value))
+        if method in self.blocked:
+            self.entered.set()
+            self.blocked[method].wait(5.0)
+        return value
+
+    def get_trad_price(self, value):
+        return self._enter('get_trad_price', value)
+
+    def get_quota_stats(self, value=None):
+        return self._enter('get_quota_stats', value)
+
+    def buy(self, value):
+        return self._enter('buy', value)
+
+    def execute_order(self, value):
+        return self._enter('execute_order', value)
+
+
+def start_gateway(tmp_path, broker, **kwargs):
+    gw = Gateway(lambda: broker, str(tmp_path / 'gw.sock'), log=lambda *args, **kw: None, **kwargs)
+    gw.start()
+    return gw
+
+
+def test_fair_queue_priority_and_round_robin():
+    q = FairQueue()
+    for i in range(3):
+        q.put('a', PRIORITY_LOOKUP, f'a{i}')
+    q.put('b', PRIORITY_LOOKUP, 'b0')
+    q.put('c', PRIORITY_LOOKUP, 'c0')
+    q.put('b', PRIORITY_ORDER, 'b-order')
+    got = [q.get(0)[1] for _ in range(6)]
+    assert got == ['b-order', 'a0', 'b0', 'c0', 'a1', 'a2']
+    assert q.get(0) is None
+
+
+def test_pipelined_requests_resolve_in_order(tmp_path):
+    gw = start_gateway(tmp_path, FakeBroker())
+    client = GatewayClient(gw.address)
+    try:
+        futures = [client.submit('get_trad_price', i) for i in range(200)]  # 응답을 기다리지 않고 연달아 전송
+        assert [fut.result(5.0) for fut in futures] == list(range(200))
+    finally:
+        client.close()
+        gw.stop()
+
+
+def test_orders_run_before_queued_lookups(tmp_path):
+    broker = FakeBroker()
+    broker.block('get_quota_stats')
+    gw = start_gateway(tmp_path, broker)
+    client = GatewayClient(gw.address)
+    try:
+        first = client.submit('get_quota_stats')
+        assert broker.entered.wait(5.0)  # dispatcher가 첫 요청에서 멈춘 동안 나머지가 큐에 쌓임
+        lookups = [client.submit('get_trad_price', i) for i in range(3)]
+        order = client.submit('buy', 'X')
+        time.sleep(0.1)
+        broker.blocked['get_quota_stats'].set()
+        for fut in [first, order] + lookups:
+            fut.result(5.0)
+    finally:
+        client.close()
+        gw.stop()
+    assert [method for method, _ in broker.calls] == ['get_quota_stats', 'buy'] + ['get_trad_price'] * 3
+
+
+def test_long_call_does_not_block_lookups(tmp_path):
+    broker = FakeBroker()
+    broker.block('execute_order')
+    gw = start_gateway(tmp_path, broker, thread_safe=True)
+    slow, fast = GatewayClient(gw.address), GatewayClient(gw.address)
+    try:
+        pending = slow.submit('execute_order', 'BTC/USDT')
+        assert broker.entered.wait(5.0)
+        assert fast.call('get_trad_price', 7) == 7  # 체결 대기 중에도 조회는 바로 처리
+        assert not pending.done()
+        broker.blocked['execute_order'].set()
+        assert pending.result(5.0) == 'BTC/USDT'
+    finally:
+        slow.close()
+        fast.close()
+        gw.stop()
+
+
+@pytest.mark.benchmark
+def test_gateway_round_trip_and_throughput(tmp_path, bench_report):
+    gw = start_gateway(tmp_path, FakeBroker())
+    try:
+        client = GatewayClient(gw.address)
+        for _ in range(200):  # warm-up
+            client.call('get_trad_price', 1)
+        n = 2000
+        start = time.perf_counter()
+        for i in range(n):
+            client.call('get_trad_price', i)
+        rtt = (time.perf_counter() - start) / n
+        bench_report('gateway round trip', '{:.1f} us/call', rtt * 1e6)
+        client.close()
+
+        for n_clients in (1, 4, 16):
+            clients = [GatewayClient(gw.address) for _ in range(n_clients)]
+            per_client = 1000
+
+            def run(c):
+                futures = [c.submit('get_trad_price', i) for i in range(per_client)]
+                return [fut.result(30.0) for fut in futures]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=n_clients) as pool:
+                results = list(pool.map(run, clients))
+            elapsed = time.perf_counter() - start
+            assert all(r == list(range(per_client)) for r in results)
+            bench_report('gateway throughput', '{:2d} clients, pipelined: {:.0f} calls/s',
+                         n_clients, n_clients * per_client / elapsed)
+            for c in clients:
+                c.close()
+    finally:
+        gw.stop()
@@ -0,0 +1,115 @@
+from super_trader.balance_snapshot import BALANCE_FIELDS, BalanceCache, BalanceSnapshot
+from super_trader.liquidation import FILLED, REJECTED, Liquidator, ManualConclusionSource
+
+
+class FakeBroker:
+    """미체결 매도 주문을 들고 있는 가짜 계좌. 보유 수량은 체결돼야 줄고, 매도가능수량은 주문 즉시 줄어든다"""
+
+    def __init__(self, holdings):
+        self.qty = dict(holdings)
+        self.pending = {code: 0 for code in holdings}
+        self.orders = []
+        self.balance_cache = BalanceCache(self.load_balance, ttl=0)
+
+    def load_balance(self):
+        rows = []
+        for code, qty in self.qty.items():
+            row = [None] * (max(BALANCE_FIELDS.values()) + 1)
+            values = {'name': code, 'today_buy_cnt': 0, 'qty': qty, 'asset': 0, 'profit': 0, 'rtn': 0.0,
+                      'code': code, 'sellable': qty - self.pending[code], 'avg_price': 0.0}
+            rows.append([values[k] for k in BALANCE_FIELDS])
+        return BalanceSnapshot({'total_asset': 0, 'cash': 0}, rows)
+
+    def sell(self, code, price, qty):
+        if qty > self.qty[code] - self.pending[code]:
+            return False  # 매도가능수량 초과
+        self.orders.append((code, qty))
+        self.pending[code] += qty
+        return True
+
+    def fill(self, source, code, qty):
+        self.pending[code] -= qty
+        self.qty[code] -= qty
+        source.emit(code, FILLED, qty)
+
+
+def test_timeout_does_not_resend_pending_sell():
+    broker = FakeBroker({'A005930': 5})
+    source = ManualConclusionSource()
+    liq = Liquidator(broker, source, order_timeout=0.05, max_resubmit=3, poll_interval=0.01)
+    result = liq.run([{'code': 'A005930', 'qty': 5}])
+
+    assert broker.orders == [('A005930', 5)]  # 미체결 주문이 남아 있으면 다시 보내지 않음
+    assert result['failed'] == {'A005930': 5}
+    assert result['resubmits'] == {'A005930': 0}
+
+
+def test_timeout_resubmits_only_sellable_remainder():
+    broker = FakeBroker({'A005930': 5})
+    source = ManualConclusionSource()
+
+    orig_sell = broker.sell
+
+    def sell(code, price, qty):
+        ok = orig_sell(code, price, qty)
+        if len(broker.orders) == 1:
+            # 2주 체결, 나머지 3주는 거래소에서 취소됐지만 이벤트를 놓침
+            broker.pending[code] = 0
+            broker.qty[code] -= 2
+        else:
+            broker.fill(source, code, qty)
+        return ok
+
+    broker.sell = sell
+    liq = Liquidator(broker, source, order_timeout=0.05, max_resubmit=3, poll_interval=0.01)
+    result = liq.run([{'code': 'A005930', 'qty': 5}])
+
+    assert broker.orders == [('A005930', 5), ('A005930', 3)]
+    assert broker.qty['A005930'] == 0
+    assert result['failed'] == {}
+    assert result['resubmits'] == {'A005930': 1}
+
+
+def test_initial_sell_excludes_pending_orders():
+    broker = FakeBroker({'A005930': 5, 'A000660': 3})
+    broker.pending['A005930'] = 2  # 이전에 낸 매도 주문이 미체결로 남아 있음
+    source = ManualConclusionSource()
+    orig_sell = broker.sell
+
+    def sell(code, price, qty):
+        ok = orig_sell(code, price, qty)
+        broker.fill(source, code, broker.pending[code])  # 이전 주문까지 체결
+        return ok
+
+    broker.sell = sell
+    liq = Liquidator(broker, source, order_timeout=1.0, poll_interval=0.01)
+    result = liq.run([{'code': 'A005930', 'qty': 5}, {'code': 'A000660', 'qty': 3}])
+
+    assert broker.orders == [('A005930', 3), ('A000660', 3)]
+    assert result['failed'] == {}
+    assert broker.qty == {'A005930': 0, 'A000660': 0}
+
+
+def test_rejected_order_is_resubmitted_for_sellable_quantity():
+    broker = FakeBroker({'A005930': 5})
+    source = ManualConclusionSource()
+    orig_sell = broker.sell
+
+    def sell(code, price, qty):
+        ok = orig_sell(code, price, qty)
+        if len(broker.orders) == 1:
+            # 2주 체결(이벤트 유실) 후 나머지 3주 거부
+            broker.pending[code] = 0
+            broker.qty[code] -= 2
+            source.emit(code, REJECTED, 3)
+        else:
+            broker.fill(source, code, qty)
+        return ok
+
+    broker.sell = sell
+    liq = Liquidator(broker, source, order_timeout=1.0, max_resubmit=3, poll_interval=0.01)
+    result = liq.run([{'code': 'A005930', 'qty': 5}])
+
+    assert broker.orders == [('A005930', 5), ('A005930', 3)]  # 처음 수량 5주가 아닌 매도가능수량 3주
+    assert result['failed'] == {}
+    assert result['resubmits'] == {'A005930': 1}
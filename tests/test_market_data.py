@@ -0,0 +1,164 @@
+import threading
+import time
+
+import numpy as np
+
+from super_trader.market_data import MarketDataCache
+from super_trader.stream import QueueTransport
+
+from .fakes import FakeExchange, make_binance_trader
+
+
+def wait_until(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class Snapshots:
+    """market_id별로 미리 정한 REST snapshot을 순서대로 반환. gate가 열릴 때까지 응답을 막는다"""
+
+    def __init__(self, snapshots):
+        self.snapshots = {k: list(v) for k, v in snapshots.items()}
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, market_id):
+        self.gate.wait()
+        self.calls.append(market_id)
+        queue = self.snapshots[market_id]
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+
+
+def depth(market_id, first, last, bids=(), asks=(), prev=None):
+    msg = {'e': 'depthUpdate', 's': market_id, 'U': first, 'u': last, 'b': list(bids), 'a': list(asks)}
+    if prev is not None:
+        msg['pu'] = prev
+    return {'stream': f'{market_id.lower()}@depth', 'data': msg}
+
+
+def make_cache(snapshots):
+    transport = QueueTransport()
+    cache = MarketDataCache(list(snapshots.snapshots), snapshots, transport, resync_delay=0.01)
+    return cache, transport
+
+
+def test_events_before_snapshot_are_buffered_and_bridged():
+    snapshots = Snapshots({'BTCUSDT': [(100, [['99', '1']], [['101', '1']])]})
+    snapshots.gate.clear()
+    cache, transport = make_cache(snapshots)
+    cache.start()
+    transport.put(depth('BTCUSDT', 90, 95, bids=[['98', '5']]))  # snapshot보다 오래됨 -> 버림
+    transport.put(depth('BTCUSDT', 96, 102, bids=[['99', '2']]))  # snapshot을 가로지르는 첫 이벤트
+    transport.put(depth('BTCUSDT', 103, 105, asks=[['101', '0'], ['102', '3']]))
+    assert wait_until(lambda: len(cache.buffers['BTCUSDT']) == 3)
+    assert not cache.is_synced('BTCUSDT')
+
+    snapshots.gate.set()
+    assert wait_until(lambda: cache.is_synced('BTCUSDT'))
+    book = cache.get_book('BTCUSDT')
+    cache.stop()
+    assert book['update_id'] == 105
+    np.testing.assert_array_equal(book['bids'], [[99.0, 2.0]])
+    np.testing.assert_array_equal(book['asks'], [[102.0, 3.0]])
+
+
+def test_spot_gap_forces_resync():
+    snapshots = Snapshots({'BTCUSDT': [(100, [['99', '1']], []), (120, [['97', '4']], [])]})
+    cache, transport = make_cache(snapshots)
+    cache.start()
+    assert wait_until(lambda: cache.is_synced('BTCUSDT'))
+    transport.put(depth('BTCUSDT', 101, 105, bids=[['98', '1']]))
+    assert wait_until(lambda: cache.books['BTCUSDT'].update_id == 105)
+
+    transport.put(depth('BTCUSDT', 110, 112))  # 106~109 누락
+    assert wait_until(lambda: len(snapshots.calls) == 2 and cache.is_synced('BTCUSDT'))
+    transport.put(depth('BTCUSDT', 118, 125, bids=[['96', '1']]))
+    assert wait_until(lambda: cache.books['BTCUSDT'].update_id == 125)
+    book = cache.get_book('BTCUSDT')
+    cache.stop()
+    assert cache.gaps.value() >= 1
+    np.testing.assert_array_equal(book['bids'], [[97.0, 4.0], [96.0, 1.0]])
+
+
+def test_futures_pu_mismatch_forces_resync():
+    snapshots = Snapshots({'BTCUSDT': [(100, [], []), (200, [], [])]})
+    cache, transport = make_cache(snapshots)
+    cache.start()
+    assert wait_until(lambda: cache.is_synced('BTCUSDT'))
+    transport.put(depth('BTCUSDT', 95, 105, prev=90))  # 첫 이벤트는 U/u로 이어 붙임
+    transport.put(depth('BTCUSDT', 106, 110, prev=105))
+    assert wait_until(lambda: cache.books['BTCUSDT'].update_id == 110)
+
+    transport.put(depth('BTCUSDT', 115, 120, prev=112))  # pu가 직전 u(110)와 다름
+    assert wait_until(lambda: len(snapshots.calls) == 2 and cache.is_synced('BTCUSDT'))
+    cache.stop()
+    assert cache.books['BTCUSDT'].update_id == 200
+
+
+def test_book_ticker_and_agg_trade():
+    snapshots = Snapshots({'BTCUSDT': [(1, [], [])], 'ETHUSDT': [(1, [], [])]})
+    cache, transport = make_cache(snapshots)
+    cache.start()
+    # spot bookTicker에는 'e'가 없음
+    transport.put({'data': {'u': 5, 's': 'BTCUSDT', 'b': '100', 'B': '1', 'a': '102', 'A': '2'}})
+    assert wait_until(lambda: cache.get_price('BTCUSDT') is not None)
+    assert cache.get_price('BTCUSDT') == 101.0  # 체결가가 없으면 중간값
+
+    transport.put({'data': {'e': 'bookTicker', 'u': 4, 's': 'BTCUSDT', 'b': '1', 'B': '1', 'a': '1', 'A': '1'}})
+    transport.put({'data': {'e': 'aggTrade', 's': 'BTCUSDT', 'p': '101.5'}})
+    assert wait_until(lambda: cache.get_price('BTCUSDT') == 101.5)
+    ticker = cache.get_ticker('BTCUSDT')
+    cache.stop()
+    assert (ticker['bid'], ticker['ask'], ticker['last']) == (100.0, 102.0, 101.5)  # 오래된 bookTicker 무시
+    assert cache.get_price('ETHUSDT') is None
+
+
+def test_get_book_depth():
+    bids = [[str(100 - i), '1'] for i in range(20)]
+    asks = [[str(101 + i), '1'] for i in range(20)]
+    snapshots = Snapshots({'BTCUSDT': [(1, bids, asks)]})
+    cache, transport = make_cache(snapshots)
+    assert cache.get_book('BTCUSDT') is None  # 동기화 전
+    cache.start()
+    assert wait_until(lambda: cache.is_synced('BTCUSDT'))
+    book = cache.get_book('BTCUSDT', depth=5)
+    cache.stop()
+    assert book['bids'].shape == book['asks'].shape == (5, 2)
+    np.testing.assert_array_equal(book['bids'][:, 0], [100, 99, 98, 97, 96])
+    np.testing.assert_array_equal(book['asks'][:, 0], [101, 102, 103, 104, 105])
+
+
+class FakeMarketExchange(FakeExchange):
+    def __init__(self):
+        super().__init__()
+        self.ticker_calls = 0
+
+    def fetch_order_book(self, symbol, limit=None):
+        return {'nonce': 1, 'bids': [], 'asks': []}
+
+    def fetch_ticker(self, symbol):
+        self.ticker_calls += 1
+        return {'last': 50.0}
+
+
+def test_cur_price_falls_back_to_rest_when_stale(tmp_path):
+    exchange = FakeMarketExchange()
+    trader = make_binance_trader(exchange, tmp_path)
+    trader.market_data = None
+    transport = QueueTransport()
+    trader.start_market_data(['BTC/USDT'], transport=transport, max_age=0.2)
+    transport.put({'data': {'e': 'aggTrade', 's': 'BTCUSDT', 'p': '100'}})
+    assert wait_until(lambda: trader.market_data.get_price('BTCUSDT') is not None)
+
+    assert trader.get_cur_price('BTC/USDT') == 100.0
+    assert exchange.ticker_calls == 0
+    time.sleep(0.3)
+    assert trader.get_cur_price('BTC/USDT') == 50.0  # max_age가 지나면 REST
+    assert exchange.ticker_calls == 1
+    trader.stop_market_data()
+    trader.journal.close()
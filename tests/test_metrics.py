@@ -0,0 +1,60 @@
+import threading
+import timeit
+
+import pytest
+
+from super_trader.metrics import FOLD_SIZE, LatencyHistogram, Registry, bucket_index, timed
+
+
+def test_histogram_folds_records_from_all_threads():
+    hist = LatencyHistogram()
+
+    def work():
+        for ns in range(1, FOLD_SIZE * 3 + 7):
+            hist.record(ns)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    assert len(hist.pending.all()) == 4  # 스레드별 버퍼
+    counts, total_ns = hist.snapshot()
+    n = FOLD_SIZE * 3 + 6
+    assert sum(counts) == 4 * n
+    assert total_ns == 4 * n * (n + 1) // 2
+    assert counts[bucket_index(1)] == 4
+    assert hist.snapshot()[0] == counts  # 다시 읽어도 두 번 세지 않음
+
+
+def test_timed_records_latency_and_errors():
+    registry = Registry()
+
+    @timed('fail', registry)
+    def fail():
+        raise ValueError
+
+    ok = timed('ok', registry)(lambda: 1)
+    for _ in range(10):
+        assert ok() == 1
+    with pytest.raises(ValueError):
+        fail()
+
+    assert sum(registry.histogram('call_latency', 'ok').snapshot()[0]) == 10
+    assert sum(registry.histogram('call_latency', 'fail').snapshot()[0]) == 1
+    assert registry.counter('call_errors', 'fail').value() == 1
+
+
+@pytest.mark.benchmark
+def test_timed_overhead(bench_report):
+    registry = Registry()
+
+    def noop():
+        return None
+
+    wrapped = timed('noop', registry)(noop)
+    number = 50000
+    base = min(timeit.repeat(noop, number=number, repeat=9)) / number
+    cost = min(timeit.repeat(wrapped, number=number, repeat=9)) / number
+    bench_report('timed overhead', '{:.0f} ns/call', (cost - base) * 1e9)
@@ -0,0 +1,135 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from super_trader import ohlcv_store
+from super_trader.ohlcv_store import OHLCVStore, bar_start, to_ms, to_records
+
+DAY = 24 * 60 * 60 * 1000
+
+
+@pytest.mark.parametrize('now, timeframe, bar_ms, expected', [
+    ('2026-10-15 13:00', '1w', 7 * DAY, '2026-10-12'),  # 목요일 -> 그 주 월요일
+    ('2026-10-12 00:00', '1w', 7 * DAY, '2026-10-12'),
+    ('2026-10-11 23:59', '1w', 7 * DAY, '2026-10-05'),
+    ('2026-10-31 12:00', '1M', 30 * DAY, '2026-10-01'),
+    ('2026-02-28 12:00', '1M', 30 * DAY, '2026-02-01'),
+    ('2026-10-15 13:47', '1h', 60 * 60 * 1000, '2026-10-15 13:00'),
+    ('2026-10-15 13:47', '1d', DAY, '2026-10-15'),
+])
+def test_bar_start(now, timeframe, bar_ms, expected):
+    assert bar_start(to_ms(now), timeframe, bar_ms) == to_ms(expected)
+
+
+def test_in_progress_weekly_bar_is_not_stored(tmp_path, monkeypatch):
+    now = to_ms('2026-10-15 13:00') / 1000  # 목요일
+    monkeypatch.setattr(ohlcv_store.time, 'time', lambda: now)
+    mondays = [to_ms(d) for d in ('2026-09-28', '2026-10-05', '2026-10-12')]
+    calls = []
+
+    def fetch(start, end):
+        calls.append((start, end))
+        return [[ts, 1, 2, 0.5, 1.5, 10] for ts in mondays if start <= ts]  # 거래소는 진행 중인 봉도 반환
+
+    store = OHLCVStore(str(tmp_path))
+    df = store.get('BTC/USDT', '1w', mondays[0], to_ms('2026-10-19'), fetch, 7 * DAY)
+    assert list(df.index) == list(pd.to_datetime(mondays[:2], unit='ms'))
+    assert calls == [(mondays[0], mondays[2])]
+
+    # 다음 주가 되면 지난 봉을 받아 온다
+    monkeypatch.setattr(ohlcv_store.time, 'time', lambda: to_ms('2026-10-20') / 1000)
+    df = store.get('BTC/USDT', '1w', mondays[0], to_ms('2026-10-19'), fetch, 7 * DAY)
+    assert list(df.index) == list(pd.to_datetime(mondays, unit='ms'))
+
+
+def daily_bars(start, end, bar_ms=DAY):
+    return [[ts, 1.0, 2.0, 0.5, 1.5, float(ts // bar_ms % 100)] for ts in range(start, end, bar_ms)]
+
+
+class RecordingFetch:
+    def __init__(self, bar_ms=DAY):
+        self.bar_ms = bar_ms
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        return daily_bars(start, end, self.bar_ms)
+
+
+def test_only_missing_ranges_are_fetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(ohlcv_store.time, 'time', lambda: to_ms('2026-10-01') / 1000)
+    store = OHLCVStore(str(tmp_path))
+    fetch = RecordingFetch()
+    d = lambda day: to_ms('2026-01-01') + day * DAY
+    store.get('BTC/USDT', '1d', d(0), d(10), fetch, DAY)
+    store.get('BTC/USDT', '1d', d(20), d(30), fetch, DAY)
+    df = store.get('BTC/USDT', '1d', d(5), d(40), fetch, DAY)
+    assert fetch.calls == [(d(0), d(10)), (d(20), d(30)), (d(10), d(20)), (d(30), d(40))]
+    assert len(df) == 35 and df.index.is_monotonic_increasing
+    assert store.coverage('BTC/USDT', '1d') == [[d(0), d(40)]]
+
+    store.get('BTC/USDT', '1d', d(0), d(40), fetch, DAY)
+    assert len(fetch.calls) == 4  # 다 받은 구간은 다시 받지 않음
+
+
+def test_rewrite_is_idempotent_and_appends_in_place(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    jan = to_ms('2026-01-01')
+    records = to_records(daily_bars(jan, jan + 20 * DAY))
+    store.write('BTC/USDT', '1d', records[:10])
+    file = os.path.join(store._dir('BTC/USDT', '1d'), '2026-01.npy')
+    inode = os.stat(file).st_ino
+
+    store.write('BTC/USDT', '1d', records[10:])  # 끝에 이어 쓰기: 파일을 바꿔치기하지 않음
+    assert os.stat(file).st_ino == inode
+    np.testing.assert_array_equal(np.load(file), records)
+
+    before = os.stat(file).st_mtime_ns
+    time.sleep(0.01)
+    store.write('BTC/USDT', '1d', records[5:15])  # 이미 있는 봉뿐
+    assert os.stat(file).st_mtime_ns == before
+    np.testing.assert_array_equal(np.load(file), records)
+
+    late = records[[3]].copy()
+    store.write('BTC/USDT', '1d', np.concatenate([records[19:], late]))
+    np.testing.assert_array_equal(np.load(file), records)
+
+    store.write('BTC/USDT', '1d', to_records(daily_bars(jan - 3 * DAY, jan + 22 * DAY)))  # 앞뒤로 겹침
+    np.testing.assert_array_equal(store.read('BTC/USDT', '1d', jan - 3 * DAY, jan + 22 * DAY)['ts'],
+                                  np.arange(jan - 3 * DAY, jan + 22 * DAY, DAY))
+
+
+@pytest.mark.benchmark
+def test_range_read_cold_and_warm(tmp_path, monkeypatch, bench_report):
+    monkeypatch.setattr(ohlcv_store.time, 'time', lambda: to_ms('2026-10-01') / 1000)
+    minute = 60 * 1000
+    start, end = to_ms('2026-01-01'), to_ms('2026-04-01')  # 1분봉 3개월, 약 13만 개
+    store = OHLCVStore(str(tmp_path))
+    fetch = RecordingFetch(minute)
+
+    t0 = time.perf_counter()
+    cold = store.get('BTC/USDT', '1m', start, end, fetch, minute)
+    t1 = time.perf_counter()
+    warm = store.get('BTC/USDT', '1m', start, end, fetch, minute)
+    t2 = time.perf_counter()
+    part = store.get('BTC/USDT', '1m', to_ms('2026-02-10'), to_ms('2026-02-11'), fetch, minute)
+    t3 = time.perf_counter()
+    assert len(cold) == len(warm) == (end - start) // minute and len(part) == 1440
+    assert len(fetch.calls) == 1
+    bench_report('ohlcv_store', '{} bars: cold {:.1f} ms, warm {:.1f} ms, 1-day slice {:.2f} ms',
+                 len(cold), (t1 - t0) * 1e3, (t2 - t1) * 1e3, (t3 - t2) * 1e3)
+
+    # 1월 파티션(약 4만 개)에 하루치 추가: 끝에 이어 쓰기 vs 중간에 빠진 봉이 있어 다시 쓰기
+    jan = to_records(daily_bars(start, to_ms('2026-02-01'), minute))
+    store.write('ETH/USDT', '1m', np.delete(jan[:-1440], 1000))
+    t0 = time.perf_counter()
+    store.write('ETH/USDT', '1m', jan[-1440:])
+    t1 = time.perf_counter()
+    store.write('ETH/USDT', '1m', jan[1000:1001])
+    t2 = time.perf_counter()
+    np.testing.assert_array_equal(store.read('ETH/USDT', '1m', start, to_ms('2026-02-01')), jan)
+    bench_report('ohlcv_store', 'write into {}-bar partition: append {:.2f} ms, rewrite {:.2f} ms',
+                 len(jan), (t1 - t0) * 1e3, (t2 - t1) * 1e3)
@@ -0,0 +1,149 @@
+import time
+
+import numpy as np
+import pytest
+
+from super_trader.metrics import REGISTRY
+from super_trader.order_tracker import OrderNotFilledError, OrderTracker
+from super_trader.stream import QueueTransport
+
+from .fakes import FakeExchange, make_binance_trader
+
+
+def _report(symbol, order_id):
+    return {'e': 'ORDER_TRADE_UPDATE', 'o': {
+        'T': 1, 'i': order_id, 'X': 'FILLED', 'o': 'MARKET', 'S': 'BUY', 's': symbol,
+        'p': '0', 'ap': '100', 'q': '1', 'z': '1'}}
+
+
+def test_report_resolves_only_matching_symbol():
+    tracker = OrderTracker(FakeExchange(), poll_interval=60)
+    btc = tracker.track('BTC/USDT', 7)
+    eth = tracker.track('ETH/USDT', 7)
+    tracker.on_report(_report('ETHUSDT', 7))
+    assert eth.result(1)['symbol'] == 'ETHUSDT'
+    assert not btc.done()
+
+
+def test_early_report_is_matched_by_symbol():
+    tracker = OrderTracker(FakeExchange(), poll_interval=60)
+    tracker.on_report(_report('ETHUSDT', 3))
+    assert not tracker.track('BTC/USDT', 3).done()
+    assert tracker.track('ETH/USDT', 3).result(1)['symbol'] == 'ETHUSDT'
+
+
+def _execute_time(n, latency, tmp_path):
+    trader = make_binance_trader(FakeExchange(latency), tmp_path / str(n))
+    orders = {f'S{i}/USDT': 1.0 for i in range(n)}
+    start = time.perf_counter()
+    results = trader.execute_orders(orders)
+    elapsed = time.perf_counter() - start
+    trader.journal.close()
+    assert all(res['ok'] for res in results.values())
+    return elapsed
+
+
+def test_execute_orders_scales_sublinearly(tmp_path):
+    """지연 0.1초 거래소에서 symbol 수가 32배가 돼도 벽시계 시간은 그보다 훨씬 적게 늘어야 함"""
+    latency = 0.1
+    times = {n: _execute_time(n, latency, tmp_path) for n in (1, 8, 32)}
+    print({n: round(t, 3) for n, t in times.items()})
+    assert times[8] < 3 * times[1]
+    assert times[32] < 8 * times[1]
+
+
+def test_order_to_fill_starts_at_send(tmp_path):
+    hist = REGISTRY.histogram('order_to_fill', 'binance')
+    counts, total_ns = hist.snapshot()
+    trader = make_binance_trader(FakeExchange(latency=0.05), tmp_path)
+    trader.execute_order('BTC/USDT', 1.0)
+    trader.journal.close()
+    new_counts, new_total_ns = hist.snapshot()
+    assert sum(new_counts) - sum(counts) == 1
+    # create_order 지연(50ms) + fetchOrder 지연(50ms)이 모두 포함돼야 함
+    assert new_total_ns - total_ns >= 0.1e9
+
+
+class ScriptedExchange(FakeExchange):
+    """fetchOrder가 statuses를 순서대로 반환 (마지막 값 반복). 호출 시각을 기록"""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.poll_times = []
+
+    def fetchOrder(self, symbol, id):
+        with self.lock:
+            self.poll_times.append(time.monotonic())
+            status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return {'info': {'orderId': id, 'status': status, 'symbol': self.market_id(symbol)}}
+
+
+def _status_report(symbol, order_id, status):
+    msg = _report(symbol, order_id)
+    msg['o']['X'] = status
+    return msg
+
+
+def test_fills_arrive_over_stream_without_polling():
+    exchange = ScriptedExchange(['NEW'])
+    transport = QueueTransport()
+    tracker = OrderTracker(exchange, transport=transport, poll_interval=60)
+    transport.put(_report('ETHUSDT', 2))  # track() 전에 도착한 보고
+    fut = tracker.track('BTC/USDT', 1)
+    transport.put(_report('BTCUSDT', 1))
+    assert fut.result(2)['orderId'] == 1
+    assert tracker.track('ETH/USDT', 2).result(2)['symbol'] == 'ETHUSDT'
+    assert exchange.poll_times == []
+    transport.stop()
+
+
+def test_polling_fallback_backs_off_exponentially():
+    exchange = ScriptedExchange(['NEW'] * 5 + ['FILLED'])
+    tracker = OrderTracker(exchange, poll_interval=0.02, max_poll_interval=0.16)
+    start = time.monotonic()
+    assert tracker.track('BTC/USDT', 1).result(5)['status'] == 'FILLED'
+    gaps = np.diff([start] + exchange.poll_times)
+    assert len(gaps) == 6
+    # 0.02, 0.04, 0.08, 0.16, 0.16(상한), 0.16
+    expected = [0.02, 0.04, 0.08, 0.16, 0.16, 0.16]
+    assert all(g >= e * 0.9 for g, e in zip(gaps, expected))
+    assert gaps[3] > gaps[0] * 4
+
+
+def test_deadline_raises_timeout():
+    tracker = OrderTracker(ScriptedExchange(['NEW']), poll_interval=0.02)
+    with pytest.raises(TimeoutError):
+        tracker.track('BTC/USDT', 1, timeout=0.15).result(2)
+    assert not tracker.orders
+
+
+@pytest.mark.parametrize('status', ['CANCELED', 'REJECTED', 'EXPIRED'])
+def test_failed_status_raises_order_not_filled(status):
+    transport = QueueTransport()
+    tracker = OrderTracker(ScriptedExchange(['NEW']), transport=transport, poll_interval=60)
+    fut = tracker.track('BTC/USDT', 1)
+    transport.put(_status_report('BTCUSDT', 1, status))
+    with pytest.raises(OrderNotFilledError, match=status):
+        fut.result(2)
+
+    polled = OrderTracker(ScriptedExchange(['NEW', status]), poll_interval=0.01)  # 폴링으로 확인한 경우
+    with pytest.raises(OrderNotFilledError):
+        polled.track('BTC/USDT', 2).result(2)
+    transport.stop()
+
+
+def test_wait_all_returns_results_and_errors_in_order():
+    transport = QueueTransport()
+    tracker = OrderTracker(ScriptedExchange(['NEW']), transport=transport, poll_interval=60)
+    futures = [tracker.track('BTC/USDT', i) for i in range(1, 4)]
+    transport.put(_report('BTCUSDT', 3))
+    transport.put(_status_report('BTCUSDT', 2, 'CANCELED'))
+    transport.put(_report('BTCUSDT', 1))
+    results = OrderTracker.wait_all(futures, timeout=2)
+    assert results[0]['orderId'] == 1 and results[2]['orderId'] == 3
+    assert isinstance(results[1], OrderNotFilledError)
+
+    late = tracker.track('BTC/USDT', 9)
+    assert isinstance(OrderTracker.wait_all([late], timeout=0.05)[0], Exception)  # 시간 안에 못 받으면 예외 객체
+    transport.stop()
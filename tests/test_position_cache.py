@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from super_trader.position_cache import PositionCache
+
+from .fakes import FakeExchange, make_binance_trader
+
+
+def position(market_id, amount, symbol=None):
+    return {'symbol': symbol or market_id, 'info': {'symbol': market_id, 'positionAmt': str(amount)}}
+
+
+class FakePositions:
+    def __init__(self, positions):
+        self.positions = positions
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.positions)
+
+
+def test_snapshot_is_reused_within_ttl_and_indexed_by_market_id():
+    fetch = FakePositions([position('BTCUSDT', 0.5), position('ETHUSDT', -2)])
+    cache = PositionCache(fetch, ttl=0.2)
+    assert cache.get('BTCUSDT')['info']['positionAmt'] == '0.5'
+    assert cache.get('ETHUSDT')['info']['positionAmt'] == '-2'
+    assert cache.get('XRPUSDT') is None
+    assert fetch.calls == 1
+    assert cache.stats() == {'hits': 2, 'misses': 1}
+
+    time.sleep(0.25)  # ttl 만료
+    fetch.positions = [position('BTCUSDT', 0.1)]
+    assert cache.get('BTCUSDT')['info']['positionAmt'] == '0.1'
+    assert cache.get('ETHUSDT') is None
+    assert fetch.calls == 2
+    assert cache.stats() == {'hits': 3, 'misses': 2}
+
+
+def test_invalidate_forces_refetch():
+    fetch = FakePositions([position('BTCUSDT', 0.5)])
+    cache = PositionCache(fetch, ttl=60)
+    cache.snapshot()
+    cache.invalidate()
+    fetch.positions = []
+    assert cache.get('BTCUSDT') is None
+    assert fetch.calls == 2
+
+
+class PositionExchange(FakeExchange):
+    """시장가 주문이 즉시 포지션에 반영되는 선물 거래소 대역"""
+
+    def __init__(self):
+        super().__init__()
+        self.amounts = {}
+        self.position_calls = 0
+
+    def create_order(self, symbol, type, side, amount):
+        market_id = self.market_id(symbol)
+        self.amounts[market_id] = self.amounts.get(market_id, 0.0) + (amount if side == 'buy' else -amount)
+        return super().create_order(symbol, type, side, amount)
+
+    def fetch_positions(self):
+        self.position_calls += 1
+        return [position(m, a, f'{m[:-4]}/USDT') for m, a in self.amounts.items()]
+
+
+def test_orders_invalidate_cached_positions(tmp_path):
+    exchange = PositionExchange()
+    trader = make_binance_trader(exchange, tmp_path)
+    trader.position_cache = PositionCache(exchange.fetch_positions, ttl=60)
+    assert trader.get_holding_position('BTC/USDT') == 0.0
+    assert trader.get_holding_position('BTC/USDT') == 0.0
+    assert exchange.position_calls == 1
+
+    trader.execute_order('BTC/USDT', 0.3)
+    assert trader.get_holding_position('BTC/USDT') == 0.3  # ttl이 남아 있어도 주문 뒤에는 새로 조회
+    trader.execute_orders({'BTC/USDT': -0.1, 'ETH/USDT': 1.0})
+    assert trader.get_holding_position('BTC/USDT') == pytest.approx(0.2)
+    assert trader.get_holding_position('ETH/USDT') == 1.0
+    assert exchange.position_calls == 3
+    trader.journal.close()
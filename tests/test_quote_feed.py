@@ -0,0 +1,23 @@
+import time
+
+from super_trader.quote_feed import QuoteBook, ReplayQuoteSource
+
+
+def test_replay_fills_book():
+    book = QuoteBook(['A', 'B'])
+    source = ReplayQuoteSource([('A', 100, 101, 99, 10), ('C', 1, 1, 1, 1), ('B', 200, 201, 199, 5)])
+    source.subscribe(book.codes, book.on_tick)
+    assert source.done.wait(1)
+    assert book.has(['A', 'B'])
+    assert book.snapshot(['B', 'A'], ('price', 'vol')).tolist() == [[200, 5], [100, 10]]
+
+
+def test_has_rejects_missing_and_stale_ticks():
+    book = QuoteBook(['A', 'B'])
+    book.on_tick('A', 100, 101, 99, 10)
+    assert not book.has(['A', 'B'])
+    assert not book.has(['Z'])
+    assert book.has(['A'], max_age=5.0)
+    book.updated[0] = time.time() - 10  # 구독이 끊겨 틱이 멈춘 경우
+    assert book.has(['A'])
+    assert not book.has(['A'], max_age=5.0)
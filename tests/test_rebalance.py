@@ -0,0 +1,207 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from super_trader.balance_snapshot import BALANCE_FIELDS, BalanceCache, BalanceSnapshot
+from super_trader.liquidation import FILLED, SIDE_SELL, ManualConclusionSource
+from super_trader.quote_feed import QuoteBook
+from super_trader.rebalance import plan_rebalance
+from super_trader.trader_creonplus import CreonPlusTrader
+
+from .fakes import FakeExchange, make_binance_trader, null_logger
+
+
+def test_close_qty_is_rounded_to_lot_step():
+    plan = plan_rebalance(['BTC/USDT', 'ETH/USDT'], cur_qty=[0.123456789, 1.0], price=[50000.0, 2000.0],
+                          weights=[0.0, 0.5], equity=10000.0, lot_step=[0.001, 0.01])
+    assert plan.loc['BTC/USDT', 'order_qty'] == pytest.approx(-0.123)
+    assert plan.loc['BTC/USDT', 'target_qty'] == pytest.approx(0.000456789)
+
+
+def test_dust_below_lot_step_is_not_ordered():
+    plan = plan_rebalance(['BTC/USDT'], cur_qty=[0.0004], price=[50000.0], weights=[0.0], equity=10000.0,
+                          lot_step=0.001)
+    assert plan.empty
+
+
+class FakeSpotExchange(FakeExchange):
+    markets = {'BTC/USDT': {'base': 'BTC'}, 'ETH/USDT': {'base': 'ETH'}}
+
+    def market(self, symbol):
+        return {'base': self.markets[symbol]['base'], 'info': {'filters': [
+            {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001'}]}}
+
+    def fetch_balance(self, params=None):
+        return {'free': {'USDT': 100.0, 'BTC': 0.3, 'ETH': 0.0},
+                'total': {'USDT': 100.0, 'BTC': 0.5, 'ETH': 2.0}}
+
+    def fetch_tickers(self, symbols):
+        prices = {'BTC/USDT': 50000.0, 'ETH/USDT': 2000.0}
+        return {symbol: {'last': prices[symbol]} for symbol in symbols}
+
+
+def test_spot_state_sells_only_free_balance(tmp_path):
+    trader = make_binance_trader(FakeSpotExchange(), tmp_path)
+    trader.is_future = False
+    trader.market_data = None
+    trader.lot_filters = {}
+    state = trader.get_rebalance_state(['BTC/USDT'])
+    trader.journal.close()
+
+    assert state['symbols'] == ['BTC/USDT', 'ETH/USDT']
+    np.testing.assert_allclose(state['cur_qty'], [0.3, 0.0])  # 미체결 주문에 묶인 수량 제외
+    assert state['equity'] == pytest.approx(100.0 + 0.5 * 50000.0 + 2.0 * 2000.0)
+
+
+def test_buys_are_scaled_to_cash_after_fees():
+    plan = plan_rebalance(['A', 'B', 'C'], cur_qty=[10, 0, 0], price=[100.0, 50.0, 20.0], weights=[0.0, 0.5, 0.5],
+                          equity=2000.0, cash=500.0, fee_rate=0.01)
+    sells = plan[plan['order_qty'] < 0]
+    buys = plan[plan['order_qty'] > 0]
+    assert list(sells.index) == ['A'] and set(buys.index) == {'B', 'C'}
+    assert list(plan.index[:1]) == ['A']  # 매도 먼저
+    budget = 500.0 + 1000.0 * (1 - 0.01)
+    cost = float((buys['order_qty'] * buys['price']).sum()) * (1 + 0.01)
+    assert cost <= budget
+    assert cost > budget * 0.95
+    np.testing.assert_array_equal(buys['order_qty'], np.floor(buys['order_qty']))
+
+
+def test_min_notional_and_min_qty_drop_small_orders():
+    plan = plan_rebalance(['A', 'B', 'C'], cur_qty=[0.0, 0.0, 1.0], price=[100.0, 100.0, 100.0],
+                          weights=[0.5, 0.0004, 0.0095], equity=10000.0, lot_step=0.01, min_qty=0.05,
+                          min_notional=10.0)
+    assert list(plan.index) == ['A']  # B는 0.04(min_qty 미만), C는 0.95 - 1 = -0.05, 5 USDT (min_notional 미만)
+    assert plan.loc['A', 'order_qty'] == pytest.approx(50.0)
+
+
+def test_missing_price_is_not_ordered():
+    plan = plan_rebalance(['A', 'B'], cur_qty=[1.0, 0.0], price=[np.nan, 10.0], weights=[0.0, 0.5],
+                          equity=100.0)
+    assert list(plan.index) == ['B']
+
+
+class FakeCreonAccount:
+    """접수 즉시 반환하고, 체결은 잠시 뒤 이벤트로 알리는 Creon 주문 대역"""
+
+    def __init__(self, source, cash=0):
+        self.source = source
+        self.cash = cash
+        self.events = []
+
+    def sell(self, code, price, qty):
+        self.events.append(('sell', code, price, qty))
+
+        def fill():
+            time.sleep(0.05)
+            self.cash += qty * 10000
+            self.events.append(('filled', code, qty))
+            self.source.emit(code, FILLED, qty, SIDE_SELL)
+
+        threading.Thread(target=fill, daemon=True).start()
+        return True
+
+    def buy(self, code, price, qty):
+        self.events.append(('buy', code, price, qty, self.cash))
+        return True
+
+
+def make_creon_trader(account):
+    trader = object.__new__(CreonPlusTrader)
+    trader.log = null_logger()
+    trader.notifier = None
+    trader.balance_cache = BalanceCache(lambda: None)
+    trader.sell = account.sell
+    trader.buy = account.buy
+    trader.get_cur_cash = lambda: account.cash
+    return trader
+
+
+def test_creon_buys_wait_for_sell_fills_and_use_limit_price():
+    source = ManualConclusionSource()
+    account = FakeCreonAccount(source)
+    trader = make_creon_trader(account)
+    plan = plan_rebalance(['A', 'B', 'C'], cur_qty=[100, 0, 0], price=[10000.0] * 3, weights=[0.0, 0.5, 0.5],
+                          equity=1_000_000, cash=0, fee_rate=0.0)
+    assert plan['order_qty'].tolist() == [-100, 50, 50]
+
+    results = trader.send_rebalance_orders(plan, tic=2, source=source, fill_timeout=2.0)
+    assert results == {'A': True, 'B': True, 'C': True}
+    kinds = [e[0] for e in account.events]
+    assert kinds == ['sell', 'filled', 'buy', 'buy']  # 매도 체결 뒤에 매수
+    sell, buys = account.events[0], account.events[2:]
+    assert sell[2] == 9980  # 매도는 2호가 아래
+    # 매수 지정가 10,020원 x 50주 x 2 > 1,000,000원 -> 수수료까지 포함해 49주로 줄임
+    assert [(b[2], b[3], b[4]) for b in buys] == [(10020, 49, 1_000_000)] * 2
+
+
+def test_creon_buys_proceed_after_fill_timeout():
+    source = ManualConclusionSource()
+    account = FakeCreonAccount(source, cash=500_000)
+    account.sell = lambda code, price, qty: account.events.append(('sell', code)) or True  # 체결 이벤트 없음
+    trader = make_creon_trader(account)
+    plan = plan_rebalance(['A', 'B'], cur_qty=[10, 0], price=[10000.0] * 2, weights=[0.0, 0.5],
+                          equity=1_000_000, cash=500_000, fee_rate=0.0)
+    start = time.monotonic()
+    trader.send_rebalance_orders(plan, source=source, fill_timeout=0.1)
+    assert time.monotonic() - start >= 0.1
+    assert [e[0] for e in account.events] == ['sell', 'buy']
+    assert account.events[1][3] == 49  # 시장가 기준 500,000원 / (10,000원 x 1.002)
+
+
+def _spot_universe(n):
+    class UniverseExchange(FakeSpotExchange):
+        markets = {f'C{i}/USDT': {'base': f'C{i}'} for i in range(n)}
+
+        def fetch_balance(self, params=None):
+            held = {f'C{i}': float(i % 7) for i in range(n)}
+            return {'free': dict(held, USDT=1e6), 'total': dict(held, USDT=1e6)}
+
+        def fetch_tickers(self, symbols):
+            return {symbol: {'last': 10.0 + int(symbol[1:-5]) % 90} for symbol in symbols}
+
+    return UniverseExchange()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('n', [2000, 5000])
+def test_rebalance_planning_scales(n, tmp_path, bench_report):
+    trader = make_binance_trader(_spot_universe(n), tmp_path)
+    trader.is_future = False
+    trader.market_data = None
+    trader.lot_filters = {}
+    symbols = [f'C{i}/USDT' for i in range(0, n, 2)]  # 절반은 목표에서 빠져 정리 대상
+    weights = {symbol: 1.0 / len(symbols) for symbol in symbols}
+
+    trader.get_rebalance_state(symbols)  # lot filter 캐시 warm-up
+    start = time.perf_counter()
+    state = trader.get_rebalance_state(symbols)
+    t_state = time.perf_counter() - start
+    w = np.array([weights.get(s, 0.0) for s in state['symbols']])
+    start = time.perf_counter()
+    plan = plan_rebalance(weights=w, fee_rate=trader.fee_rate, **state)
+    t_plan = time.perf_counter() - start
+    trader.journal.close()
+    assert len(plan) > 0
+    bench_report('binance rebalance', '{} symbols: state {:.1f} ms, plan {:.1f} ms', n, t_state * 1e3, t_plan * 1e3)
+
+    codes = [f'A{i:06d}' for i in range(n)]
+    rows = [[code, 0, i % 7, 0, 0, 0.0, code, i % 7, 0.0] for i, code in enumerate(codes)]
+    snapshot = BalanceSnapshot({'total_asset': 10 ** 9, 'cash': 10 ** 8},
+                               [[row[list(BALANCE_FIELDS).index(k)] for k in BALANCE_FIELDS] for row in rows])
+    creon = make_creon_trader(FakeCreonAccount(None, cash=10 ** 8))
+    creon.balance_cache = BalanceCache(lambda: snapshot, ttl=60)
+    creon.quote_book = QuoteBook(codes)
+    creon.quote_max_age = None
+    for i, code in enumerate(codes):
+        creon.quote_book.on_tick(code, 1000 + i % 500, 0, 0, 0)
+    targets = {code: 1.0 / (n // 2) for code in codes[::2]}
+    start = time.perf_counter()
+    state = creon.get_rebalance_state(list(targets))
+    w = np.array([targets.get(c, 0.0) for c in state['symbols']])
+    plan = plan_rebalance(weights=w, fee_rate=CreonPlusTrader.fee_rate, **state)
+    elapsed = time.perf_counter() - start
+    assert len(state['symbols']) == n and len(plan) > 0
+    bench_report('creon rebalance', '{} codes (quote book): state + plan {:.1f} ms', n, elapsed * 1e3)
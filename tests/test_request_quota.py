@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+
+from super_trader.request_quota import (LIMIT_EXCEEDED, PRIORITY_LOOKUP, PRIORITY_ORDER, QUOTE, TRADE,
+                                        QuotaScheduler)
+
+
+class FakeCom:
+    """N회/window초 제한을 거는 COM 대역. 초과하면 BlockRequest가 4를 반환"""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.calls = deque()
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def _expire(self, now):
+        while self.calls and now - self.calls[0] >= self.window:
+            self.calls.popleft()
+
+    def BlockRequest(self):
+        with self.lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self.calls) >= self.limit:
+                self.rejected += 1
+                return LIMIT_EXCEEDED
+            self.calls.append(now)
+            return 0
+
+    @property
+    def LimitRequestRemainTime(self):
+        with self.lock:
+            now = time.monotonic()
+            self._expire(now)
+            if len(self.calls) < self.limit:
+                return 0
+            return int((self.window - (now - self.calls[0])) * 1000) + 1
+
+
+def test_scheduler_stays_within_window_limit():
+    com = FakeCom(limit=5, window=0.5)
+    quota = QuotaScheduler(limits={TRADE: (5, 0.5)}, remain_time=lambda: com.LimitRequestRemainTime)
+    results = []
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda: results.append(quota.request(TRADE, com.BlockRequest)))
+               for _ in range(15)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.monotonic() - start
+    assert results == [0] * 15
+    assert com.rejected == 0
+    assert elapsed >= 0.9  # 창(0.5초 + WINDOW_MARGIN)마다 5회씩 세 번
+    assert quota.stats()[TRADE]['requests'] == 15
+
+
+def test_orders_go_before_queued_lookups():
+    quota = QuotaScheduler(limits={TRADE: (1, 0.1)})
+    quota.request(TRADE, lambda: 0)  # 버킷을 비워 다음 요청들이 줄을 서게 함
+    executed = []
+
+    def submit(name, priority):
+        quota.request(TRADE, lambda: executed.append(name) or 0, priority)
+
+    threads = []
+    for name, priority in [('lookup1', PRIORITY_LOOKUP), ('lookup2', PRIORITY_LOOKUP),
+                           ('order1', PRIORITY_ORDER), ('order2', PRIORITY_ORDER)]:
+        th = threading.Thread(target=submit, args=(name, priority))
+        th.start()
+        threads.append(th)
+        time.sleep(0.01)
+    for th in threads:
+        th.join()
+    assert executed == ['order1', 'order2', 'lookup1', 'lookup2']
+
+
+def test_kinds_are_limited_independently():
+    quota = QuotaScheduler(limits={TRADE: (1, 10), QUOTE: (1, 10)})
+    start = time.monotonic()
+    quota.request(TRADE, lambda: 0)
+    quota.request(QUOTE, lambda: 0)
+    assert time.monotonic() - start < 0.5
+
+
+def test_limit_exceeded_retries_are_bounded():
+    calls = []
+    waits = []
+
+    def block_request():
+        calls.append(1)
+        return LIMIT_EXCEEDED
+
+    def remain_time():
+        waits.append(1)
+        return 1
+
+    quota = QuotaScheduler(limits={TRADE: (100, 1)}, remain_time=remain_time, max_retries=3)
+    assert quota.request(TRADE, block_request) == LIMIT_EXCEEDED
+    assert len(calls) == 4  # 최초 1회 + 재시도 3회
+    assert len(waits) == 3
+    assert quota.stats()[TRADE]['retries'] == 3
+
+
+def test_retry_succeeds_after_window_expires():
+    com = FakeCom(limit=2, window=0.2)
+    com.BlockRequest()
+    com.BlockRequest()  # 다른 프로그램이 이미 한도를 다 쓴 상황
+    quota = QuotaScheduler(limits={TRADE: (10, 1)}, remain_time=lambda: com.LimitRequestRemainTime)
+    assert quota.request(TRADE, com.BlockRequest, PRIORITY_ORDER) == 0
+    assert com.rejected == 1
+    assert quota.stats()[TRADE]['retries'] == 1
+
+
+def test_retries_count_against_the_window():
+    results = iter([LIMIT_EXCEEDED, 0, 0])
+    quota = QuotaScheduler(limits={TRADE: (2, 0.3)}, remain_time=lambda: 0)
+    start = time.monotonic()
+    assert quota.request(TRADE, lambda: next(results)) == 0  # 최초 1회 + 재시도 1회로 창의 2칸을 씀
+    assert time.monotonic() - start < 0.2
+    assert quota.request(TRADE, lambda: next(results)) == 0
+    assert time.monotonic() - start >= 0.3  # 창이 빌 때까지 기다림
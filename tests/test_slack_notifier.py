@@ -0,0 +1,141 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from super_trader.slack_notifier import SlackNotifier
+
+
+class SlackStub:
+    """chat.postMessage 대역 HTTP 서버. responses에 (status, headers)를 넣으면 순서대로 응답"""
+
+    def __init__(self):
+        self.posts = []
+        self.times = []
+        self.responses = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                with stub.lock:
+                    stub.posts.append({'auth': self.headers['Authorization'], **{
+                        k: v[0] for k, v in parse_qs(body).items()}})
+                    stub.times.append(time.monotonic())
+                    status, headers = stub.responses.pop(0) if stub.responses else (200, {})
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/api/chat.postMessage'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def texts(self):
+        with self.lock:
+            return [p['text'] for p in self.posts]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    s = SlackStub()
+    yield s
+    s.close()
+
+
+def _notifier(stub, **kwargs):
+    kwargs.setdefault('batch_window', 0.2)
+    return SlackNotifier('xoxb-test', '#trader', url=stub.url, **kwargs)
+
+
+def _lines(texts):
+    return [line.split('] ', 1)[1] for text in texts for line in text.split('\n')]
+
+
+def test_messages_within_window_are_batched(stub):
+    notifier = _notifier(stub)
+    for i in range(5):
+        notifier.put(f'msg {i}')
+    notifier.close()
+    assert len(stub.posts) == 1
+    assert _lines(stub.texts()) == [f'msg {i}' for i in range(5)]
+    assert stub.posts[0]['channel'] == '#trader'
+    assert stub.posts[0]['auth'] == 'Bearer xoxb-test'
+
+
+def test_batch_is_split_at_max_batch(stub):
+    notifier = _notifier(stub, max_batch=3)
+    for i in range(7):
+        notifier.put(f'msg {i}')
+    notifier.close()
+    assert [len(text.split('\n')) for text in stub.texts()] == [3, 3, 1]
+
+
+def test_drop_policies(stub):
+    gate = threading.Event()
+    stub.responses = [(200, {})]
+    for policy, expected in [('drop_oldest', ['first', 'msg 2', 'msg 3']), ('drop_new', ['first', 'msg 0', 'msg 1'])]:
+        stub.posts.clear()
+        notifier = _notifier(stub, maxsize=2, batch_window=0.0, policy=policy)
+        # 전송 스레드가 첫 메시지를 보내는 동안 큐를 채움
+        orig_post = notifier._post
+        notifier._post = lambda text: (gate.wait(2), orig_post(text))[1]
+        notifier.put('first')
+        time.sleep(0.05)
+        results = [notifier.put(f'msg {i}') for i in range(4)]
+        gate.set()
+        notifier.close()
+        gate.clear()
+        assert _lines(stub.texts()) == expected
+        assert notifier.dropped == 2
+        assert results == ([True] * 4 if policy == 'drop_oldest' else [True, True, False, False])
+
+
+def test_429_honours_retry_after(stub):
+    stub.responses = [(429, {'Retry-After': '0.3'}), (200, {})]
+    notifier = _notifier(stub, batch_window=0.0)
+    notifier.put('hello')
+    notifier.close()
+    assert _lines(stub.texts()) == ['hello', 'hello']
+    assert stub.times[1] - stub.times[0] >= 0.3
+
+
+def test_5xx_is_retried_then_gives_up(stub):
+    warnings = []
+    stub.responses = [(503, {}), (500, {}), (502, {})]
+    notifier = _notifier(stub, batch_window=0.0, max_retries=2, backoff=0.01,
+                         log=lambda msg, log_level: warnings.append((log_level, msg)))
+    notifier.put('hello')
+    notifier.close()
+    assert len(stub.posts) == 3
+    assert warnings and warnings[0][0] == 'warning' and '502' in warnings[0][1]
+
+
+def test_5xx_then_success(stub):
+    stub.responses = [(500, {})]
+    notifier = _notifier(stub, batch_window=0.0, backoff=0.01)
+    notifier.put('hello')
+    notifier.close()
+    assert len(stub.posts) == 2
+
+
+def test_close_flushes_pending_messages(stub):
+    notifier = _notifier(stub, batch_window=5.0)
+    notifier.put('bye')
+    start = time.monotonic()
+    notifier.close()
+    assert time.monotonic() - start < 2.0
+    assert _lines(stub.texts()) == ['bye']
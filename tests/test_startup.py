@@ -0,0 +1,131 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from super_trader import market_cache
+from super_trader.lazy import LazyDispatch
+from super_trader.market_cache import load_markets_cached
+
+
+class FakeMarketsExchange:
+    id = 'binance'
+
+    def __init__(self, n=2, market_type='spot'):
+        self.options = {'defaultType': market_type}
+        self.n = n
+        self.loads = 0
+        self.markets = self.currencies = None
+
+    def load_markets(self):
+        self.loads += 1
+        self.set_markets({f'C{i}/USDT': {'symbol': f'C{i}/USDT', 'base': f'C{i}'} for i in range(self.n)},
+                         {'USDT': {'code': 'USDT'}})
+
+    def set_markets(self, markets, currencies=None):
+        self.markets, self.currencies = markets, currencies
+
+
+def test_markets_cache_hit_and_ttl(tmp_path, monkeypatch):
+    path = str(tmp_path / 'markets.json')
+    now = [1000.0]
+    monkeypatch.setattr(market_cache.time, 'time', lambda: now[0])
+    assert load_markets_cached(FakeMarketsExchange(), path, ttl=60, lib_version='4.0.0') == 'exchange'
+
+    exchange = FakeMarketsExchange()
+    now[0] += 59
+    assert load_markets_cached(exchange, path, ttl=60, lib_version='4.0.0') == 'cache'
+    assert exchange.loads == 0 and list(exchange.markets) == ['C0/USDT', 'C1/USDT']
+
+    now[0] += 2  # 저장 후 61초
+    assert load_markets_cached(exchange, path, ttl=60, lib_version='4.0.0') == 'exchange'
+    assert exchange.loads == 1
+
+
+@pytest.mark.parametrize('lib_version, market_type', [('4.0.1', 'spot'), ('4.0.0', 'future')])
+def test_markets_cache_invalidated_by_version_or_market_type(tmp_path, lib_version, market_type):
+    path = str(tmp_path / 'markets.json')
+    load_markets_cached(FakeMarketsExchange(), path, lib_version='4.0.0')
+    exchange = FakeMarketsExchange(market_type=market_type)
+    assert load_markets_cached(exchange, path, lib_version=lib_version) == 'exchange'
+    with open(path) as f:
+        assert json.load(f)['version'].endswith(f'{lib_version}:binance:{market_type}')
+
+
+def test_broken_markets_cache_is_reloaded(tmp_path):
+    path = tmp_path / 'markets.json'
+    path.write_text('{"version": ')
+    exchange = FakeMarketsExchange()
+    assert load_markets_cached(exchange, str(path), lib_version='4.0.0') == 'exchange'
+    assert load_markets_cached(exchange, str(path), lib_version='4.0.0') == 'cache'
+
+
+def test_lazy_dispatch_is_per_thread(monkeypatch):
+    created = []
+
+    def dispatch(prog_id):
+        created.append((prog_id, threading.get_ident()))
+        return object()
+
+    client = types.ModuleType('win32com.client')
+    client.Dispatch = dispatch
+    package = types.ModuleType('win32com')
+    package.client = client
+    monkeypatch.setitem(sys.modules, 'win32com', package)
+    monkeypatch.setitem(sys.modules, 'win32com.client', client)
+
+    class Holder:
+        com = LazyDispatch('CpUtil.CpCybos')
+
+    main = Holder().com
+    assert Holder().com is main  # 같은 스레드에서는 인스턴스끼리 공유
+    other = []
+    th = threading.Thread(target=lambda: other.extend([Holder().com, Holder().com]))
+    th.start()
+    th.join()
+    assert other[0] is other[1] and other[0] is not main
+    assert [prog_id for prog_id, _ in created] == ['CpUtil.CpCybos'] * 2
+    assert created[0][1] != created[1][1]
+
+
+def test_broker_sdks_are_not_imported_at_startup():
+    code = ('import sys, super_trader.trader_binance, super_trader.trader_creonplus; '
+            'print([m for m in ("ccxt", "win32com", "pythoncom") if m in sys.modules])')
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert out.stdout.strip() == '[]'
+
+
+def import_profile(module):
+    """python -X importtime 결과 -> (전체 ms, [(누적 ms, 모듈)] 큰 순서)"""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True,
+                         text=True, check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1000, name.strip()))
+    total = next(ms for ms, name in rows if name == module)
+    return total, sorted(rows, reverse=True)
+
+
+@pytest.mark.benchmark
+def test_startup_import_and_market_cache(tmp_path, bench_report):
+    for module in ('super_trader.trader_binance', 'super_trader.trader_creonplus'):
+        total, rows = import_profile(module)
+        top = [(ms, name) for ms, name in rows if '.' not in name and name != module][:3]
+        bench_report('startup', 'import {}: {:.0f} ms (largest: {})', module, total,
+                     ', '.join(f'{name} {ms:.0f} ms' for ms, name in top))
+
+    path = str(tmp_path / 'markets.json')
+    exchange = FakeMarketsExchange(n=3000)
+    load_markets_cached(exchange, path, lib_version='4.0.0')
+    start = time.perf_counter()
+    assert load_markets_cached(FakeMarketsExchange(), path, lib_version='4.0.0') == 'cache'
+    bench_report('startup', 'markets from disk cache (3000 markets): {:.1f} ms', (time.perf_counter() - start) * 1e3)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from super_trader.tick_size import KRX_TICK_HISTORY, TickSizeTable, get_tick_table
+
+
+class FakeStockCode:
+    """CpUtil.CpStockCode 대역. GetPriceUnit(code, price, up)을 주어진 테이블(또는 함수)로 응답"""
+
+    def __init__(self, unit):
+        self.unit = unit
+        self.calls = 0
+
+    def GetPriceUnit(self, code, price, up):
+        self.calls += 1
+        return self.unit(price, up)
+
+
+def _reference_unit(edges, units):
+    """가격대 경계를 직접 비교하는 느린 기준 구현"""
+    def unit(price, up):
+        for edge, u in zip(edges, units):
+            if price < edge or (not up and price == edge):
+                return u
+        return units[-1]
+    return unit
+
+
+KOSPI_2023 = get_tick_table('KOSPI', 20230125)
+
+
+@pytest.mark.parametrize('price, up, expected', [
+    (1999, True, 1), (2000, True, 5), (2005, True, 5),
+    (1999, False, 1), (2000, False, 1), (2005, False, 5),
+    (4995, True, 5), (5000, True, 10), (5000, False, 5),
+    (19990, True, 10), (20000, True, 50), (20000, False, 10),
+    (49950, True, 50), (50000, True, 100), (50000, False, 50),
+    (199900, True, 100), (200000, True, 500), (200000, False, 100),
+    (499500, True, 500), (500000, True, 1000), (500000, False, 500),
+])
+def test_unit_at_band_edges(price, up, expected):
+    assert KOSPI_2023.unit([price], up=up)[0] == expected
+
+
+@pytest.mark.parametrize('price, tic, expected', [
+    (1999, 1, 2000), (2000, 1, 2005), (2005, -1, 2000), (2000, -1, 1999),
+    (1998, 3, 2005), (2010, -3, 1999),
+    (4995, 1, 5000), (5000, -1, 4995), (19990, 1, 20000), (20000, -1, 19990),
+    (499500, 1, 500000), (500000, -1, 499500), (500000, 1, 501000),
+])
+def test_shift_across_band_edges(price, tic, expected):
+    assert KOSPI_2023.shift([price], tic)[0] == expected
+
+
+def test_shift_is_vectorized():
+    prices = np.array([[1999, 2000], [5000, 500000]])
+    np.testing.assert_array_equal(KOSPI_2023.shift(prices, 1), [[2000, 2005], [5010, 501000]])
+    np.testing.assert_array_equal(KOSPI_2023.shift(prices, -1), [[1998, 1999], [4995, 499500]])
+
+
+def test_table_follows_effective_date():
+    old = get_tick_table('KOSPI', 20221231)
+    assert old.unit([1500], up=True)[0] == 5  # 2023-01-25 이전: 1000원 이상 5원
+    assert KOSPI_2023.unit([1500], up=True)[0] == 1
+    assert get_tick_table('KOSPI', 20230125) is KOSPI_2023
+
+
+@pytest.mark.parametrize('start, market', [(start, market) for start, tables in KRX_TICK_HISTORY
+                                           for market in tables])
+def test_validate_matches_fake_com(start, market):
+    table = get_tick_table(market, start)
+    com = FakeStockCode(_reference_unit(table.edges.tolist(), table.units.tolist()))
+    assert table.validate(com, 'A005930') == []
+    assert com.calls == len(table.edges) * 4
+
+
+def test_validate_reports_mismatch():
+    table = TickSizeTable([2000, 5000], [1, 5, 10])
+    wrong = _reference_unit([2000, 5000], [1, 5, 50])  # 5000원 이상 단위가 다름
+    com = FakeStockCode(wrong)
+    result = table.validate(com, 'A005930')
+    assert (5000, True, 10, 50) in result
+    assert all(price >= 5000 for price, _, _, _ in result)
@@ -0,0 +1,88 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from super_trader.trade_journal import FILL, ORDER, TradeJournal, load_journal, shared_journal
+from super_trader.trader_creonplus import CreonPlusTrader
+
+from .fakes import null_logger
+
+HISTORY_COLS = ['order_no', 'code', 'prc_type', 'order_qty', 'exec_qty', 'order_prc', 'exec_prc', 'order_type']
+
+
+def make_creon_trader(journal_root, history):
+    trader = object.__new__(CreonPlusTrader)
+    trader.log = null_logger()
+    trader.notifier = None
+    trader.journal = TradeJournal(journal_root, flush_interval=0.0)
+    trader.get_today_order_history = lambda: pd.DataFrame(history, columns=HISTORY_COLS)
+    return trader
+
+
+def test_save_today_fills_is_idempotent(tmp_path):
+    history = [[1001, 'A005930', '03', 10, 10, 0, 70000, '2'],
+               [1002, 'A000660', '03', 5, 0, 0, 0, '1']]
+    trader = make_creon_trader(str(tmp_path), history)
+    assert trader.save_today_fills() == 1
+    assert trader.save_today_fills() == 0
+
+    history.append([1003, 'A000660', '03', 5, 5, 0, 120000, '1'])
+    assert trader.save_today_fills() == 1
+    trader.journal.close()
+
+    fills = load_journal(str(tmp_path))
+    assert (fills['kind'] == FILL).all()
+    assert sorted(fills['order_id'].astype(str)) == ['1001', '1003']
+
+
+def test_exit_system_closes_journal(tmp_path):
+    trader = make_creon_trader(str(tmp_path), [])
+    trader.journal.record('creon', FILL, 1, 'A005930', 1, order_id='1')
+    with pytest.raises(SystemExit):
+        trader.exit_system()
+    assert not trader.journal.th.is_alive()
+    assert len(load_journal(str(tmp_path))) == 1
+
+
+def test_write_error_does_not_block_flush(tmp_path):
+    logs = []
+    journal = TradeJournal(str(tmp_path), flush_interval=0.0, log=lambda msg, log_level: logs.append(log_level))
+    write = journal._write
+    failures = [OSError('disk full')]
+
+    def flaky_write(items):
+        if failures:
+            raise failures.pop()
+        write(items)
+
+    journal._write = flaky_write
+    journal.record('creon', FILL, 1, 'A005930', 1, order_id='1')
+    done = threading.Event()
+    threading.Thread(target=lambda: (journal.flush(), done.set()), daemon=True).start()
+    assert done.wait(2.0)
+    assert journal.errors == 1 and logs == ['error']
+
+    journal.record('creon', FILL, 1, 'A005930', 1, order_id='2')  # 기록 스레드는 살아 있음
+    journal.close()
+    assert load_journal(str(tmp_path))['order_id'].tolist() == [b'2']
+
+
+def test_shared_journal_has_one_writer_per_root(tmp_path):
+    binance = shared_journal(str(tmp_path), flush_interval=0.0)
+    creon = shared_journal(str(tmp_path))
+    assert binance is creon
+    other = shared_journal(str(tmp_path / 'other'), flush_interval=0.0)
+    assert other is not binance
+    other.close()
+
+    binance.record('binance', ORDER, 1, 'BTC/USDT', 0.1, order_id='b1')
+    binance.close()  # 다른 trader가 아직 쓰는 중
+    assert creon.th.is_alive()
+    creon.record('creon', ORDER, 1, 'A005930', 1, order_id='c1')
+    creon.close()
+    assert not creon.th.is_alive()
+    assert sorted(load_journal(str(tmp_path))['order_id'].tolist()) == [b'b1', b'c1']
+    reopened = shared_journal(str(tmp_path), flush_interval=0.0)
+    assert reopened is not creon  # 닫힌 뒤에는 새로 만듦
+    reopened.close()
@@ -0,0 +1,62 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+from super_trader.trader_creonplus import CreonPlusTrader
+from super_trader.trading_calendar import KST, crypto_calendar, krx_calendar, to_days
+
+HOLIDAYS = [20240101, 20240209, 20240212]
+
+
+def test_to_days_accepts_ints_strings_and_dates():
+    expected = np.array(['2024-01-02', '2024-02-29'], dtype='datetime64[D]')
+    np.testing.assert_array_equal(to_days([20240102, 20240229]), expected)
+    np.testing.assert_array_equal(to_days(['20240102', '20240229']), expected)
+    assert to_days(datetime.date(2024, 1, 2)) == expected[0]
+
+
+def test_krx_sessions_skip_weekends_and_holidays():
+    cal = krx_calendar(HOLIDAYS)
+    assert not cal.is_session(20240101)
+    assert cal.is_session(20240102)
+    assert not cal.is_session(20240106)  # 토요일
+    np.testing.assert_array_equal(cal.is_session([20240208, 20240209, 20240213]), [True, False, True])
+    assert cal.next_session(20240208) == np.datetime64('2024-02-13')  # 금/주말/월 연휴
+    assert cal.prev_session(20240213) == np.datetime64('2024-02-08')
+    assert cal.count_sessions(20240201, 20240229) == 19
+    assert len(cal.sessions_between(20240205, 20240213)) == 5
+
+
+def test_krx_open_hours_in_kst():
+    cal = krx_calendar(HOLIDAYS)
+    open_dt, close_dt = cal.session_times(20240102)
+    assert open_dt.utcoffset() == datetime.timedelta(hours=9)
+    assert (open_dt.hour, close_dt.hour, close_dt.minute) == (9, 15, 30)
+
+    utc = datetime.timezone.utc
+    assert cal.is_open(datetime.datetime(2024, 1, 2, 0, 0, tzinfo=utc))  # 09:00 KST
+    assert not cal.is_open(datetime.datetime(2024, 1, 1, 23, 59, tzinfo=utc))  # 08:59 KST
+    assert not cal.is_open(datetime.datetime(2024, 1, 2, 6, 30, tzinfo=utc))  # 15:30 KST
+    assert not cal.is_open(datetime.datetime(2024, 1, 1, 3, 0, tzinfo=KST))  # 휴일
+
+
+def test_crypto_calendar_is_always_open():
+    cal = crypto_calendar()
+    assert cal.is_session(20240106)
+    assert cal.is_open(datetime.datetime(2024, 1, 6, 23, 59, tzinfo=datetime.timezone.utc))
+
+
+def test_calendar_follows_reloaded_holidays(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'holiday': {'2024': [20240101]}}))
+    trader = object.__new__(CreonPlusTrader)
+    assert trader.calendar.is_session(20240102)
+    assert trader.calendar is trader.calendar  # 설정이 그대로면 다시 만들지 않음
+
+    path.write_text(json.dumps({'holiday': {'2024': [20240101, 20240102]}}))
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+    assert not trader.calendar.is_session(20240102)